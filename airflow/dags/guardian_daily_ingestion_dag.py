@@ -24,6 +24,7 @@ with DAG(
     schedule_interval="0 2 * * *",  # 2:00 AM UTC
     start_date=datetime(2025, 10, 21),
     catchup=False,
+    max_active_runs=1,  # the processed-id manifest has a single writer (load_data_to_postgres)
     tags=["guardian", "batch", "ingestion"],
 ) as dag:
 
@@ -1,5 +1,11 @@
+import os
 from datetime import datetime, timedelta
+from airflow.exceptions import AirflowSkipException
 from src.ingestion.ingest_job import run_guardian_ingestion
+from src.analytics.load_parquet_to_postgres import fetch_loaded_article_versions
+
+# Opt-in: headers first, bodies only for articles that are new or edited since they were loaded
+TWO_PHASE_FETCH = os.getenv("GUARDIAN_TWO_PHASE_FETCH", "false").lower() in ("1", "true", "yes")
 
 def fetch_articles(**context):
     execution_date = context["ds"]  # 'YYYY-MM-DD'
@@ -11,11 +17,14 @@ def fetch_articles(**context):
         from_date=prev_date,
         to_date=execution_date,
         page_size=50,
-        max_pages=100
+        max_pages=100,
+        two_phase=TWO_PHASE_FETCH,
+        loaded_versions_fn=fetch_loaded_article_versions if TWO_PHASE_FETCH else None
     )
 
+    # Fetch errors raise; None means nothing new (watermark reached or every id up to date)
     if not raw_s3_key:
-        raise ValueError("❌ Ingestion failed — no S3 key returned.")
+        raise AirflowSkipException("No new Guardian articles to ingest.")
 
     print(f"✅ Raw data uploaded to S3: {raw_s3_key}")
 
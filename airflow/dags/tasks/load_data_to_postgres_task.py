@@ -4,26 +4,36 @@ from datetime import datetime
 from sqlalchemy import create_engine, text
 from urllib.parse import quote_plus
 from src.analytics.load_parquet_to_postgres import load_parquet_to_postgres
+from src.processing.processed_manifest import commit_staged_updates
 
 logger = logging.getLogger(__name__)
 
 def load_data_to_postgres(**context):
     """
-    Load processed Guardian Parquet file from S3 into the data warehouse (guardian_dw).
+    Load the processed Guardian Parquet partition files of this run into the data warehouse (guardian_dw).
     """
     ti = context["ti"]
-    parquet_key = ti.xcom_pull(task_ids="upload_to_s3", key="parquet_key")
-    if not parquet_key:
-        raise ValueError("Missing parquet_key from previous task.")
+    parquet_keys = ti.xcom_pull(task_ids="upload_to_s3", key="parquet_keys")
+    if not parquet_keys:
+        raise ValueError("Missing parquet_keys from previous task.")
 
     bucket_name = os.getenv("S3_BUCKET", "the-guardian-data")
 
-    print(f"Loading parquet from S3 → guardian_dw: {parquet_key}")
-    rows_loaded = load_parquet_to_postgres(parquet_key, bucket_name)
-    print(f"✅ Data successfully loaded into guardian_dw ({rows_loaded} rows).")
+    print(f"Loading {len(parquet_keys)} parquet files from S3 → guardian_dw")
+    summary = load_parquet_to_postgres(parquet_keys, bucket_name)
+    print(f"✅ Data successfully loaded into guardian_dw ({summary['rows_loaded']} rows: "
+          f"{summary['inserted']} new, {summary['updated']} updated).")
+
+    # Only now are the transformed articles recorded as processed
+    manifest_updates_key = ti.xcom_pull(task_ids="upload_to_s3", key="manifest_updates_key")
+    if manifest_updates_key:
+        commit_staged_updates(bucket_name, manifest_updates_key)
 
     # Push số dòng đã load lên XCom
-    ti.xcom_push(key="rows_loaded", value=rows_loaded)
+    ti.xcom_push(key="rows_loaded", value=summary["rows_loaded"])
+    # Only the count: the id list grows with the load and XComs live in the metadata DB
+    ti.xcom_push(key="changed_articles", value=len(summary["changed_article_ids"]))
+    ti.xcom_push(key="changed_tables", value=summary["changed_tables"])
 
 
 def log_ingestion_metadata(**context):
@@ -31,7 +41,7 @@ def log_ingestion_metadata(**context):
     Log metadata of ingestion into guardian_ingestion_log (in Airflow's Postgres DB).
     """
     ti = context["ti"]
-    parquet_key = ti.xcom_pull(task_ids="upload_to_s3", key="parquet_key")
+    parquet_keys = ti.xcom_pull(task_ids="upload_to_s3", key="parquet_keys") or []
     rows_loaded = ti.xcom_pull(task_ids="load_data_to_postgres", key="rows_loaded") or 0
 
     PG_USER = os.getenv("POSTGRES_USER", "airflow")
@@ -48,7 +58,7 @@ def log_ingestion_metadata(**context):
                 INSERT INTO guardian_ingestion_log (parquet_key, load_time, rows_loaded, status)
                 VALUES (:key, :time, :rows, :status)
             """), {
-                "key": parquet_key,
+                "key": ",".join(parquet_keys),
                 "time": datetime.utcnow(),
                 "rows": rows_loaded,
                 "status": "SUCCESS"
@@ -1,24 +1,107 @@
 import subprocess
 import os
+import json
 import logging
+from airflow.exceptions import AirflowSkipException
 
 logger = logging.getLogger(__name__)
 
+DBT_THREADS = int(os.getenv("DBT_THREADS", 4))
+DBT_SOURCE = "guardian_dw"
+# Built from the calendar, not from dw tables: refreshed with every selective run
+ALWAYS_SELECTED = ["int_date_dim", "dim_date"]
+
+def _full_refresh_requested(context):
+    """Trigger with conf {"full_refresh": true} (or set DBT_FULL_REFRESH=true) to rebuild everything."""
+    dag_run = context.get("dag_run")
+    conf = (dag_run.conf if dag_run else None) or {}
+    if "full_refresh" in conf:
+        return str(conf["full_refresh"]).lower() in ("1", "true", "yes")
+    return os.getenv("DBT_FULL_REFRESH", "false").lower() in ("1", "true", "yes")
+
+
+def _models_missing_watermark(project_dir, profiles_dir):
+    """Incremental models whose existing table predates loaded_at (see macros/incremental.sql)."""
+    result = subprocess.run(
+        [
+            "dbt", "run-operation", "incremental_models_missing_watermark",
+            "--project-dir", project_dir,
+            "--profiles-dir", profiles_dir,
+        ],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        logger.error(result.stderr or result.stdout)
+        raise Exception("❌ dbt run-operation incremental_models_missing_watermark failed")
+    for line in result.stdout.splitlines():
+        if line.startswith("missing_watermark: "):
+            return json.loads(line[len("missing_watermark: "):])
+    return []
+
+
+def select_dbt_models(changed_tables, rows_loaded, changed_articles):
+    """
+    dbt --select arguments for what the load changed: every model downstream of a
+    changed dw table. [] means nothing changed; None means unknown (run everything).
+    """
+    if changed_tables is None and rows_loaded is None:
+        return None
+    tables = sorted({t.split(".")[-1] for t in changed_tables or []})
+    if not tables:
+        # Rows without a table list (older loader output): don't guess, run everything
+        return None if rows_loaded or changed_articles else []
+    return [f"source:{DBT_SOURCE}.{t}+" for t in tables] + ALWAYS_SELECTED
+
+
 def trigger_dbt_run(**context):
+    """
+    Run dbt. Incremental models only process the articles loaded since their last run;
+    a full refresh (on demand) rebuilds them from the whole history. Otherwise only the
+    lineage of the tables load_data_to_postgres changed is run, and nothing on an empty load.
+    """
     project_dir = os.getenv("DBT_PROJECT_DIR", "/opt/airflow/dbt")
     profiles_dir = os.getenv("DBT_PROFILES_DIR", "/opt/airflow/dbt/.dbt")
+    full_refresh = _full_refresh_requested(context)
+
+    selectors = None
+    if not full_refresh:
+        ti = context["ti"]
+        changed_articles = ti.xcom_pull(task_ids="load_data_to_postgres", key="changed_articles")
+        selectors = select_dbt_models(
+            ti.xcom_pull(task_ids="load_data_to_postgres", key="changed_tables"),
+            ti.xcom_pull(task_ids="load_data_to_postgres", key="rows_loaded"),
+            changed_articles,
+        )
+        if selectors == []:
+            raise AirflowSkipException("Nothing changed in the warehouse: dbt run skipped.")
+        logger.info(f"📰 {changed_articles or 0} new/updated articles")
+
+        missing = _models_missing_watermark(project_dir, profiles_dir)
+        if missing:
+            # Tables built before the models became incremental: rebuild once
+            logger.warning(f"⚠️ No loaded_at watermark in {missing}: running a full refresh")
+            full_refresh, selectors = True, None
 
     logger.info("🚀 Triggering dbt transformations (inside Airflow container)...")
     logger.info(f"📁 Project dir: {project_dir}")
     logger.info(f"⚙️ Profiles dir: {profiles_dir}")
+    logger.info(f"🔁 Mode: {'full refresh' if full_refresh else 'incremental'}, threads={DBT_THREADS}")
+    logger.info(f"🎯 Selection: {' '.join(selectors) if selectors else 'all models'}")
+
+    command = [
+        "dbt", "run",
+        "--project-dir", project_dir,
+        "--profiles-dir", profiles_dir,
+        "--threads", str(DBT_THREADS),
+    ]
+    if full_refresh:
+        command.append("--full-refresh")
+    elif selectors:
+        command += ["--select", *selectors]
 
     result = subprocess.run(
-        [
-            "dbt", "run",
-            "--project-dir", project_dir,
-            "--profiles-dir", profiles_dir,
-            "--full-refresh"
-        ],
+        command,
         capture_output=True,
         text=True
     )
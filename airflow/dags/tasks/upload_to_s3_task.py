@@ -1,6 +1,8 @@
 import os
+from airflow.exceptions import AirflowSkipException
 
-from src.processing.transform_guardian import transform_guardian_json_to_parquet
+from src.processing.processed_manifest import ProcessedIdManifest
+from src.processing.transform_guardian import transform_raw_object
 
 def upload_to_s3(**context):
     ti = context["ti"]
@@ -8,7 +10,14 @@ def upload_to_s3(**context):
     bucket_name = os.getenv("S3_BUCKET", "the-guardian-data")
 
     print(f"🚀 Transforming raw data file: {raw_key}")
-    parquet_key = transform_guardian_json_to_parquet(raw_key, bucket_name)
+    # The manifest is only committed by load_data_to_postgres once the load succeeded:
+    # if it fails, a rerun of this DAG run transforms the same articles again
+    manifest = ProcessedIdManifest(bucket_name)
+    parquet_keys = transform_raw_object(raw_key, bucket_name, manifest=manifest)["parquet_keys"]
+    # Every article in the raw file was already processed with the same content
+    if not parquet_keys:
+        raise AirflowSkipException("No new or changed articles to transform.")
 
-    # Push parquet path to XCom for downstream tasks
-    ti.xcom_push(key="parquet_key", value=parquet_key)
\ No newline at end of file
+    # Push partition file keys to XCom for downstream tasks
+    ti.xcom_push(key="parquet_keys", value=parquet_keys)
+    ti.xcom_push(key="manifest_updates_key", value=manifest.stage(f"{context['run_id']}:{raw_key}"))
\ No newline at end of file
@@ -0,0 +1,75 @@
+{#
+  Helpers for the incremental models. dw.articles.loaded_at is set by the loader on
+  every insert/update; each incremental model stores the loaded_at of its source rows
+  and on the next run only reprocesses rows (or whole publication days) loaded since.
+  The lookback re-reads rows of loads that committed while the previous run was going:
+  a row is stamped (clock_timestamp() in merge_staged_articles) shortly before its load
+  commits, so the lookback must be longer than that stamp-to-commit gap (the bridge
+  merges and the commit, seconds to minutes even for a large backfill file).
+#}
+
+{% macro loaded_since_last_run(column='loaded_at') -%}
+    {{ column }} > (
+        select coalesce(max(loaded_at), '-infinity'::timestamptz) - interval '{{ var("incremental_lookback", "3 hours") }}'
+        from {{ this }}
+    )
+{%- endmacro %}
+
+
+{#
+  Publication days with rows loaded since the last run, plus the days moved articles
+  left: day-grain models rebuild these days whole (unique_key = the day column).
+#}
+{% macro changed_publication_days(relation, date_expr='publication_date::date',
+                                  previous_expr='previous_publication_date::date') -%}
+    select {{ date_expr }} from {{ relation }} where {{ loaded_since_last_run() }}
+    union
+    select {{ previous_expr }} from {{ relation }}
+    where previous_publication_date is not null and {{ loaded_since_last_run() }}
+{%- endmacro %}
+
+
+{#
+  Days moved articles left, for a pre_hook that deletes them from {{ this }}:
+  delete+insert only deletes the keys of the new batch, so a day left with no
+  articles would otherwise keep its old rows.
+    pre_hook="{% if is_incremental() %}delete from {{ this }} where <day> in
+              ({{ moved_publication_days(ref(...)) }}){% endif %}"
+#}
+{% macro moved_publication_days(relation, previous_expr='previous_publication_date::date') -%}
+    select {{ previous_expr }} from {{ relation }}
+    where previous_publication_date is not null and {{ loaded_since_last_run() }}
+{%- endmacro %}
+
+
+{# Surrogate id continuing after the ids already in the table #}
+{% macro next_fact_id(column) -%}
+    {% if is_incremental() %}(select coalesce(max({{ column }}), 0) from {{ this }}) + {% endif %}row_number() over ()
+{%- endmacro %}
+
+
+{# Deterministic bigint id for a natural key (unchanged when other rows are added) #}
+{% macro stable_id(expr) -%}
+    ('x' || substr(md5({{ expr }}), 1, 15))::bit(60)::bigint
+{%- endmacro %}
+
+
+{#
+  dbt run-operation incremental_models_missing_watermark
+  Prints the incremental models whose table exists without a loaded_at column (built
+  before they became incremental): their first run must be a full refresh.
+#}
+{% macro incremental_models_missing_watermark(column='loaded_at') %}
+    {% set missing = [] %}
+    {% for node in graph.nodes.values()
+       if node.resource_type == 'model' and node.config.materialized == 'incremental' %}
+        {% set relation = adapter.get_relation(database=node.database, schema=node.schema, identifier=node.alias) %}
+        {% if relation is not none %}
+            {% set names = adapter.get_columns_in_relation(relation) | map(attribute='name') | map('lower') | list %}
+            {% if column not in names %}
+                {% do missing.append(node.name) %}
+            {% endif %}
+        {% endif %}
+    {% endfor %}
+    {{ print('missing_watermark: ' ~ tojson(missing)) }}
+{% endmacro %}
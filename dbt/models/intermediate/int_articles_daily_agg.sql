@@ -1,7 +1,17 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized='incremental',
+    unique_key='publication_date',
+    incremental_strategy='delete+insert',
+    pre_hook="{% if is_incremental() %}delete from {{ this }} where publication_date in ({{ moved_publication_days(ref('int_articles_enriched'), 'previous_publication_date') }}){% endif %}"
+) }}
 
+-- Incremental runs rebuild whole publication days that received new/updated articles
+-- (the pre_hook empties the days moved articles left)
 with enriched as (
     select * from {{ ref('int_articles_enriched') }}
+    {% if is_incremental() %}
+    where publication_date in ({{ changed_publication_days(ref('int_articles_enriched'), 'publication_date', 'previous_publication_date') }})
+    {% endif %}
 )
 
 select
@@ -13,6 +23,7 @@ select
     avg(wordcount) as avg_wordcount,
     avg(content_length) as avg_body_length,
     sum(case when is_long_read then 1 else 0 end) as long_read_count,
-    sum(case when has_thumbnail then 1 else 0 end) as with_thumbnail_count
+    sum(case when has_thumbnail then 1 else 0 end) as with_thumbnail_count,
+    max(loaded_at) as loaded_at
 from enriched
 group by 1,2,3,4
\ No newline at end of file
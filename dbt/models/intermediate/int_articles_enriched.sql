@@ -1,7 +1,14 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized='incremental',
+    unique_key='article_id',
+    incremental_strategy='delete+insert'
+) }}
 
 with articles as (
     select * from {{ ref('stg_articles') }}
+    {% if is_incremental() %}
+    where {{ loaded_since_last_run() }}
+    {% endif %}
 ),
 sections as (
     select * from {{ ref('stg_sections') }}
@@ -17,13 +24,14 @@ select
     a.trail_text,
     a.publication_date::date as publication_date,
     a.wordcount,
-    a.body,
     s.section_name,
     s.section_key,
     p.publication_name,
     a.has_thumbnail,
     case when a.wordcount > 1000 then true else false end as is_long_read,
-    length(a.body) as content_length
+    a.body_length as content_length,
+    a.loaded_at,
+    a.previous_publication_date::date as previous_publication_date
 from articles a
 left join sections s on a.section_id = s.section_id
 left join publications p on a.publication_id = p.publication_id
\ No newline at end of file
@@ -1,18 +1,30 @@
-{{ config(materialized='view') }}
+-- Incremental runs rebuild whole publication days (publication_day) that received
+-- new/updated articles or lost a moved one (the pre_hook empties the days moved articles left)
+{{ config(
+    materialized='incremental',
+    unique_key='publication_day',
+    incremental_strategy='delete+insert',
+    pre_hook="{% if is_incremental() %}delete from {{ this }} where publication_day in ({{ moved_publication_days(ref('stg_articles')) }}){% endif %}"
+) }}
 
 with article_authors as (
     select * from {{ ref('stg_article_authors') }}
 ),
 articles as (
-    select article_id, publication_date from {{ ref('stg_articles') }}
+    select article_id, publication_date, loaded_at from {{ ref('stg_articles') }}
+    {% if is_incremental() %}
+    where publication_date::date in ({{ changed_publication_days(ref('stg_articles')) }})
+    {% endif %}
 ),
 joined as (
     select
         aa.author_id,
         a.publication_date,
-        count(*) as articles_written
+        a.publication_date::date as publication_day,
+        count(*) as articles_written,
+        max(a.loaded_at) as loaded_at
     from article_authors aa
     join articles a on a.article_id = aa.article_id
-    group by 1,2
+    group by 1,2,3
 )
 select * from joined
\ No newline at end of file
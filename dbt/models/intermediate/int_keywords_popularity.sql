@@ -1,15 +1,26 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized='incremental',
+    unique_key='pub_day',
+    incremental_strategy='delete+insert',
+    pre_hook="{% if is_incremental() %}delete from {{ this }} where pub_day::date in ({{ moved_publication_days(ref('stg_articles')) }}){% endif %}"
+) }}
 
+-- Incremental runs rebuild whole publication days that received new/updated articles
+-- (the pre_hook empties the days moved articles left)
 with keywords as (
     select * from {{ ref('stg_article_keywords') }}
 ),
 articles as (
-    select article_id, publication_date, section_id from {{ ref('stg_articles') }}
+    select article_id, publication_date, section_id, loaded_at from {{ ref('stg_articles') }}
+    {% if is_incremental() %}
+    where publication_date::date in ({{ changed_publication_days(ref('stg_articles')) }})
+    {% endif %}
 )
 select
     lower(k.keyword) as keyword,
     date_trunc('day', a.publication_date) as pub_day,
-    count(distinct a.article_id) as article_count
+    count(distinct a.article_id) as article_count,
+    max(a.loaded_at) as loaded_at
 from keywords k
 join articles a on k.article_id = a.article_id
 group by 1,2
\ No newline at end of file
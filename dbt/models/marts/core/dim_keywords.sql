@@ -41,7 +41,8 @@ classified as (
 
 -- Dimension chính
 select
-    row_number() over (order by keyword_name) as keyword_id,
+    -- Stable across rebuilds: incremental facts keep pointing at the right keyword
+    {{ stable_id('keyword_name') }} as keyword_id,
     keyword_name,
     total_articles,
     avg_articles_per_day,
@@ -1,12 +1,19 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='article_id',
+    incremental_strategy='delete+insert'
+) }}
 
 with
 article_authors as (
     select * from {{ ref('stg_article_authors') }}
 ),
 articles as (
-    select article_id, publication_date, section_key
+    select article_id, publication_date, section_key, loaded_at
     from {{ ref('int_articles_enriched') }}
+    {% if is_incremental() %}
+    where {{ loaded_since_last_run() }}
+    {% endif %}
 ),
 sections as (
     select section_id, section_key
@@ -17,13 +24,14 @@ dates as (
 )
 
 select
-    row_number() over () as fact_article_author_id,
+    {{ next_fact_id('fact_article_author_id') }} as fact_article_author_id,
     aa.article_id,
     aa.author_id,
     s.section_id,
     dd.date_id,
     aa.ord as author_order,
     case when aa.ord = 0 then true else false end as is_primary_author,
+    a.loaded_at,
     current_timestamp as dw_loaded_at
 from article_authors aa
 join articles a on aa.article_id = a.article_id
@@ -1,5 +1,13 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='date_key',
+    incremental_strategy='delete+insert',
+    pre_hook="{% if is_incremental() %}delete from {{ this }} where date_key is null or date_key in (select date_id from {{ ref('dim_date') }} where date_day in ({{ moved_publication_days(ref('int_articles_enriched'), 'previous_publication_date') }})){% endif %}"
+) }}
 
+-- Incremental runs rebuild whole publication days that received new/updated articles
+-- (the pre_hook empties the days moved articles left). Days outside dim_date have no
+-- date_key and are left out (and old NULL rows deleted): delete+insert never replaces a NULL key
 with
 article_keywords as (
     select article_id, lower(trim(keyword)) as keyword
@@ -7,8 +15,11 @@ article_keywords as (
 ),
 articles_enriched as (
     select article_id, section_key, publication_name, publication_date, wordcount,
-           is_long_read, has_thumbnail, content_length
+           is_long_read, has_thumbnail, content_length, loaded_at
     from {{ ref('int_articles_enriched') }}
+    {% if is_incremental() %}
+    where publication_date in ({{ changed_publication_days(ref('int_articles_enriched'), 'publication_date', 'previous_publication_date') }})
+    {% endif %}
 ),
 sections as (
     select section_id, section_key from {{ ref('dim_sections') }}
@@ -32,13 +43,14 @@ joined as (
         ae.wordcount,
         ae.is_long_read,
         ae.has_thumbnail,
-        ae.content_length
+        ae.content_length,
+        ae.loaded_at
     from article_keywords ak
     join articles_enriched ae on ak.article_id = ae.article_id
     left join sections s on ae.section_key = s.section_key
     left join publications p on ae.publication_name = p.publication_name
     left join keywords_dim kd on ak.keyword = kd.keyword_name
-    left join dates dd on date_trunc('day', ae.publication_date) = dd.date_day
+    join dates dd on date_trunc('day', ae.publication_date) = dd.date_day
 ),
 aggregated as (
     select
@@ -50,13 +62,14 @@ aggregated as (
         avg(wordcount) as avg_wordcount,
         sum(case when is_long_read then 1 else 0 end) as long_read_count,
         sum(case when has_thumbnail then 1 else 0 end) as with_thumbnail_count,
-        avg(content_length) as avg_body_length
+        avg(content_length) as avg_body_length,
+        max(loaded_at) as loaded_at
     from joined
     group by 1,2,3,4
 )
 
 select
-    row_number() over () as fact_keyword_id,
+    {{ next_fact_id('fact_keyword_id') }} as fact_keyword_id,
     keyword_id,
     date_key,
     section_id,
@@ -66,5 +79,6 @@ select
     long_read_count,
     with_thumbnail_count,
     avg_body_length,
+    loaded_at,
     current_timestamp as dw_loaded_at
 from aggregated
\ No newline at end of file
@@ -1,18 +1,27 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='article_id',
+    incremental_strategy='delete+insert'
+) }}
 
 with
 articles as (
-    select article_id, publication_date, wordcount, content_length, is_long_read, has_thumbnail
+    select article_id, publication_date, wordcount, content_length, is_long_read, has_thumbnail, loaded_at
     from {{ ref('int_articles_enriched') }}
+    {% if is_incremental() %}
+    where {{ loaded_since_last_run() }}
+    {% endif %}
 ),
 article_authors as (
     select article_id, count(distinct author_id) as author_count
     from {{ ref('stg_article_authors') }}
+    where article_id in (select article_id from articles)
     group by article_id
 ),
 article_keywords as (
     select article_id, count(distinct keyword) as keyword_count
     from {{ ref('stg_article_keywords') }}
+    where article_id in (select article_id from articles)
     group by article_id
 ),
 sections as (
@@ -30,7 +39,7 @@ dates as (
 )
 
 select
-    row_number() over () as fact_article_id,
+    {{ next_fact_id('fact_article_id') }} as fact_article_id,
     a.article_id,
     dd.date_id as date_id,
     ast.section_id,
@@ -42,6 +51,7 @@ select
     a.is_long_read,
     case when a.wordcount > 2000 then true else false end as is_feature_length,
     a.has_thumbnail,
+    a.loaded_at,
     current_timestamp as dw_loaded_at
 from articles a
 left join articles_staging ast on a.article_id = ast.article_id
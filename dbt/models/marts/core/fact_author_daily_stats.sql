@@ -1,12 +1,23 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='date_id',
+    incremental_strategy='delete+insert',
+    pre_hook="{% if is_incremental() %}delete from {{ this }} where date_id is null or date_id in (select date_id from {{ ref('dim_date') }} where date_day in ({{ moved_publication_days(ref('int_articles_enriched'), 'previous_publication_date') }})){% endif %}"
+) }}
 
+-- Incremental runs rebuild whole publication days that received new/updated articles
+-- (the pre_hook empties the days moved articles left). Days outside dim_date have no
+-- date_id and are left out (and old NULL rows deleted): delete+insert never replaces a NULL key
 with
 article_authors as (
     select * from {{ ref('stg_article_authors') }}
 ),
 articles as (
-    select article_id, publication_date, section_key, wordcount
+    select article_id, publication_date, section_key, wordcount, loaded_at
     from {{ ref('int_articles_enriched') }}
+    {% if is_incremental() %}
+    where publication_date in ({{ changed_publication_days(ref('int_articles_enriched'), 'publication_date', 'previous_publication_date') }})
+    {% endif %}
 ),
 sections as (
     select section_id, section_key from {{ ref('stg_sections') }}
@@ -26,16 +37,17 @@ enriched as (
         sum(case when a.wordcount > 1000 then 1 else 0 end) as long_reads_written,
         sum(case when a.wordcount > 2000 then 1 else 0 end) as feature_length_written,
         min(a.wordcount) as min_wordcount,
-        max(a.wordcount) as max_wordcount
+        max(a.wordcount) as max_wordcount,
+        max(a.loaded_at) as loaded_at
     from article_authors aa
     join articles a on aa.article_id = a.article_id
     left join sections s on a.section_key = s.section_key
-    left join dates dd on date_trunc('day', a.publication_date) = dd.date_day
+    join dates dd on date_trunc('day', a.publication_date) = dd.date_day
     group by aa.author_id, dd.date_id, s.section_id
 )
 
 select
-    row_number() over () as fact_author_daily_id,
+    {{ next_fact_id('fact_author_daily_id') }} as fact_author_daily_id,
     author_id,
     date_id,
     section_id,
@@ -53,5 +65,6 @@ select
         when articles_written >= 2 then 'Moderate'
         else 'Light'
     end as daily_activity_level,
+    loaded_at,
     current_timestamp as dw_loaded_at
 from enriched
\ No newline at end of file
@@ -0,0 +1,16 @@
+{{ config(materialized='view') }}
+
+with
+
+source as (
+    select * from {{ source('guardian_dw', 'article_bodies') }}
+),
+
+renamed as (
+    select
+        article_id,
+        body
+    from source
+)
+
+select * from renamed
\ No newline at end of file
@@ -16,7 +16,7 @@ renamed as (
         title,
         headline,
         trail_text,
-        body,
+        body_length,
         wordcount,
         thumbnail_url,
         web_url,
@@ -26,7 +26,9 @@ renamed as (
         ingested_at,
         source_system,
         raw_s3_key,
-        processed_by
+        processed_by,
+        loaded_at,
+        previous_publication_date
     from source
 )
 
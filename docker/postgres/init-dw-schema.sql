@@ -22,15 +22,18 @@ CREATE TABLE IF NOT EXISTS dw.publications (
 );
 
 -- ARTICLES (fact / transactional)
+-- Range-partitioned by publication_date (one partition per month, created by
+-- dw.ensure_article_partitions). The primary key must include the partition key;
+-- the loader keeps article_id unique across partitions.
 CREATE TABLE IF NOT EXISTS dw.articles (
-    article_id           TEXT PRIMARY KEY,
+    article_id           TEXT NOT NULL,
     type                 TEXT,
     section_id           BIGINT REFERENCES dw.sections(section_id),
     publication_date     TIMESTAMP WITH TIME ZONE NOT NULL,  -- giữ lại ngày gốc
     title                TEXT,
     headline             TEXT,
     trail_text           TEXT,
-    body                 TEXT,
+    body_length          INT,                                -- độ dài body (body nằm ở dw.article_bodies)
     wordcount            INT,
     publication_id       BIGINT REFERENCES dw.publications(publication_id),
     thumbnail_url        TEXT,
@@ -41,12 +44,45 @@ CREATE TABLE IF NOT EXISTS dw.articles (
     ingested_at          TIMESTAMP WITH TIME ZONE,
     source_system        TEXT,
     raw_s3_key           TEXT,
-    processed_by         TEXT
+    processed_by         TEXT,
+    content_hash         BIGINT,                             -- hash nội dung raw, dùng để phát hiện thay đổi
+    loaded_at            TIMESTAMP WITH TIME ZONE DEFAULT now(), -- lần load/cập nhật gần nhất (watermark cho dbt incremental)
+    previous_publication_date TIMESTAMP WITH TIME ZONE,     -- ngày đăng trước khi bài bị đổi ngày (dbt build lại ngày cũ)
+    PRIMARY KEY (article_id, publication_date)
+) PARTITION BY RANGE (publication_date);
+
+-- Monthly partitions [month, month + 1) in UTC; existing ones are left alone
+CREATE OR REPLACE FUNCTION dw.ensure_article_partitions(months DATE[]) RETURNS INT AS $$
+DECLARE
+    month_start DATE;
+    created     INT := 0;
+BEGIN
+    FOREACH month_start IN ARRAY coalesce(months, '{}') LOOP
+        month_start := date_trunc('month', month_start)::date;
+        IF to_regclass(format('dw.%I', 'articles_' || to_char(month_start, 'YYYY_MM'))) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE dw.%I PARTITION OF dw.articles FOR VALUES FROM (%L) TO (%L)',
+                'articles_' || to_char(month_start, 'YYYY_MM'),
+                month_start::text || ' 00:00:00+00',
+                (month_start + interval '1 month')::date::text || ' 00:00:00+00'
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ARTICLE BODIES (large text, kept out of the hot metadata table)
+CREATE TABLE IF NOT EXISTS dw.article_bodies (
+    article_id   TEXT PRIMARY KEY,
+    body         TEXT
 );
 
 -- ARTICLE ↔ AUTHOR many-to-many
+-- (no foreign key to dw.articles: a partitioned table has no unique key on article_id alone)
 CREATE TABLE IF NOT EXISTS dw.article_authors (
-    article_id   TEXT REFERENCES dw.articles(article_id) ON DELETE CASCADE,
+    article_id   TEXT NOT NULL,
     author_id    BIGINT REFERENCES dw.authors(author_id),
     ord          INT DEFAULT 0,
     PRIMARY KEY (article_id, author_id)
@@ -54,12 +90,13 @@ CREATE TABLE IF NOT EXISTS dw.article_authors (
 
 -- ARTICLE KEYWORDS (one-to-many)
 CREATE TABLE IF NOT EXISTS dw.article_keywords (
-    article_id TEXT REFERENCES dw.articles(article_id) ON DELETE CASCADE,
+    article_id TEXT NOT NULL,
     keyword    TEXT NOT NULL,
     PRIMARY KEY (article_id, keyword)
 );
 
--- Indexes for optimization
+-- Indexes for optimization (created on every partition)
 CREATE INDEX IF NOT EXISTS idx_articles_pubdate ON dw.articles (publication_date);
 CREATE INDEX IF NOT EXISTS idx_articles_section ON dw.articles (section_id);
-CREATE INDEX IF NOT EXISTS idx_articles_topic_country ON dw.articles (topic_country);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_articles_topic_country ON dw.articles (topic_country);
+CREATE INDEX IF NOT EXISTS idx_articles_loaded_at ON dw.articles (loaded_at);
\ No newline at end of file
@@ -0,0 +1,4 @@
+-- Content hash per article (int64 hash of the raw API fields, computed by the transform).
+-- The loader compares it with incoming rows and only updates articles whose content changed.
+-- Rows loaded before this column existed keep NULL and are refreshed once on their next load.
+ALTER TABLE dw.articles ADD COLUMN IF NOT EXISTS content_hash BIGINT;
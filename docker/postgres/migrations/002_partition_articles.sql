@@ -0,0 +1,98 @@
+-- Split article bodies into dw.article_bodies and range-partition dw.articles by
+-- publication_date (monthly). Date-bounded queries then only scan the partitions of
+-- their range, and metadata scans no longer read through TOASTed bodies; length(body)
+-- is kept as dw.articles.body_length for the analytics that need it.
+--
+-- Rewrites dw.articles, so run it in a maintenance window (the loader must not run).
+-- The dbt views built on dw.articles are dropped with the old table (CASCADE):
+-- run `dbt run` afterwards to recreate them.
+BEGIN;
+
+-- Bodies
+CREATE TABLE IF NOT EXISTS dw.article_bodies (
+    article_id   TEXT PRIMARY KEY,
+    body         TEXT
+);
+
+INSERT INTO dw.article_bodies (article_id, body)
+SELECT article_id, body FROM dw.articles
+ON CONFLICT (article_id) DO NOTHING;
+
+-- A partitioned table has no unique key on article_id alone: the bridges lose their FKs
+ALTER TABLE dw.article_authors DROP CONSTRAINT IF EXISTS article_authors_article_id_fkey;
+ALTER TABLE dw.article_keywords DROP CONSTRAINT IF EXISTS article_keywords_article_id_fkey;
+ALTER TABLE dw.article_authors ALTER COLUMN article_id SET NOT NULL;
+ALTER TABLE dw.article_keywords ALTER COLUMN article_id SET NOT NULL;
+
+ALTER TABLE dw.articles RENAME TO articles_unpartitioned;
+ALTER INDEX IF EXISTS dw.idx_articles_pubdate RENAME TO idx_articles_unpartitioned_pubdate;
+ALTER INDEX IF EXISTS dw.idx_articles_section RENAME TO idx_articles_unpartitioned_section;
+ALTER INDEX IF EXISTS dw.idx_articles_topic_country RENAME TO idx_articles_unpartitioned_topic_country;
+
+CREATE TABLE dw.articles (
+    article_id           TEXT NOT NULL,
+    type                 TEXT,
+    section_id           BIGINT REFERENCES dw.sections(section_id),
+    publication_date     TIMESTAMP WITH TIME ZONE NOT NULL,
+    title                TEXT,
+    headline             TEXT,
+    trail_text           TEXT,
+    body_length          INT,
+    wordcount            INT,
+    publication_id       BIGINT REFERENCES dw.publications(publication_id),
+    thumbnail_url        TEXT,
+    web_url              TEXT,
+    has_thumbnail        BOOLEAN,
+    is_live_blog         BOOLEAN,
+    topic_country        TEXT,
+    ingested_at          TIMESTAMP WITH TIME ZONE,
+    source_system        TEXT,
+    raw_s3_key           TEXT,
+    processed_by         TEXT,
+    content_hash         BIGINT,
+    PRIMARY KEY (article_id, publication_date)
+) PARTITION BY RANGE (publication_date);
+
+CREATE OR REPLACE FUNCTION dw.ensure_article_partitions(months DATE[]) RETURNS INT AS $$
+DECLARE
+    month_start DATE;
+    created     INT := 0;
+BEGIN
+    FOREACH month_start IN ARRAY coalesce(months, '{}') LOOP
+        month_start := date_trunc('month', month_start)::date;
+        IF to_regclass(format('dw.%I', 'articles_' || to_char(month_start, 'YYYY_MM'))) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE dw.%I PARTITION OF dw.articles FOR VALUES FROM (%L) TO (%L)',
+                'articles_' || to_char(month_start, 'YYYY_MM'),
+                month_start::text || ' 00:00:00+00',
+                (month_start + interval '1 month')::date::text || ' 00:00:00+00'
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One partition per month that has articles (months are cut in UTC)
+SELECT dw.ensure_article_partitions(array_agg(DISTINCT (publication_date AT TIME ZONE 'UTC')::date))
+FROM dw.articles_unpartitioned;
+
+INSERT INTO dw.articles (
+    article_id, type, section_id, publication_date, title, headline, trail_text, body_length,
+    wordcount, publication_id, thumbnail_url, web_url, has_thumbnail, is_live_blog, topic_country,
+    ingested_at, source_system, raw_s3_key, processed_by, content_hash
+)
+SELECT
+    article_id, type, section_id, publication_date, title, headline, trail_text, length(body),
+    wordcount, publication_id, thumbnail_url, web_url, has_thumbnail, is_live_blog, topic_country,
+    ingested_at, source_system, raw_s3_key, processed_by, content_hash
+FROM dw.articles_unpartitioned;
+
+DROP TABLE dw.articles_unpartitioned CASCADE;
+
+CREATE INDEX IF NOT EXISTS idx_articles_pubdate ON dw.articles (publication_date);
+CREATE INDEX IF NOT EXISTS idx_articles_section ON dw.articles (section_id);
+CREATE INDEX IF NOT EXISTS idx_articles_topic_country ON dw.articles (topic_country);
+
+COMMIT;
@@ -0,0 +1,6 @@
+-- Load timestamp per article: set when the loader inserts or updates the row.
+-- Incremental dbt models only reprocess rows (and publication days) loaded since their last run.
+-- Existing rows get the migration time. The dbt tables built before the models became
+-- incremental have no loaded_at column: trigger_dbt_run detects them and runs a full refresh.
+ALTER TABLE dw.articles ADD COLUMN IF NOT EXISTS loaded_at TIMESTAMP WITH TIME ZONE DEFAULT now();
+CREATE INDEX IF NOT EXISTS idx_articles_loaded_at ON dw.articles (loaded_at);
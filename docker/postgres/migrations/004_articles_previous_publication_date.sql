@@ -0,0 +1,3 @@
+-- publication_date an article had before an update moved it to another day (set by the loader).
+-- Day-grain incremental dbt models rebuild that day as well, so the article leaves its old day.
+ALTER TABLE dw.articles ADD COLUMN IF NOT EXISTS previous_publication_date TIMESTAMP WITH TIME ZONE;
@@ -0,0 +1,163 @@
+"""
+Dimension-key cache for the warehouse loader.
+
+Keeps a mirror of the natural key → surrogate key maps of dw.authors,
+dw.publications and dw.sections in memory (one instance per bucket, shared by every
+loader code path in the process) and persisted in the object store between runs
+(DIMENSION_CACHE_KEY), so a load only sends values it has never seen to Postgres.
+
+Each table's entry carries a stamp (row count, max id) taken when it was last synced.
+sync() validates all stamps in one query: surrogate ids come from sequences and are
+never reused, so if the rows with id <= cached max are all still there the cached
+entries are valid and only rows with a higher id need fetching. If any were deleted
+(or the table was truncated / rebuilt) that table is reloaded in full.
+
+Besides the ids, the attributes a loader last upserted for a key (section name and
+pillar) are remembered, so a key is upserted again when they change.
+"""
+import logging
+import os
+import threading
+
+from sqlalchemy import text
+
+from src.storage.s3_helper import read_json_from_s3, write_json_to_s3
+
+DIMENSION_CACHE_KEY = os.getenv("DIMENSION_CACHE_KEY", "state/dw_dimension_cache.json")
+
+# table → (natural key column, surrogate key column)
+DIMENSIONS = {
+    "authors": ("author_name", "author_id"),
+    "publications": ("publication_name", "publication_id"),
+    "sections": ("section_key", "section_id"),
+}
+
+logger = logging.getLogger(__name__)
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _empty_entry():
+    return {"count": 0, "max_id": 0, "keys": {}}
+
+
+class DimensionCache:
+    def __init__(self, bucket_name, key=DIMENSION_CACHE_KEY, schema="dw"):
+        self.bucket_name = bucket_name
+        self.key = key
+        self.schema = schema
+        self._tables = self._read()
+        self._derived = {}
+        self._dirty = False
+        # Shared by the threads of a parallel load (load_driver)
+        self._lock = threading.RLock()
+
+    def _read(self):
+        try:
+            data = read_json_from_s3(self.bucket_name, self.key)
+        except FileNotFoundError:
+            data = {}
+        if data.get("schema") != self.schema:
+            data = {}
+        return {table: data.get("tables", {}).get(table) or _empty_entry() for table in DIMENSIONS}
+
+    def get(self, table):
+        """Cached {natural key: surrogate id} of `table` (call sync() first)."""
+        return self._tables[table]["keys"]
+
+    def sync(self, conn):
+        """Validate every table against Postgres (one query) and fetch what changed."""
+        with self._lock:
+            self._sync(conn)
+
+    def _sync(self, conn):
+        stamps = conn.execute(text(" UNION ALL ".join(
+            f"SELECT '{table}', count(*), coalesce(max({id_col}), 0), "
+            f"count(*) FILTER (WHERE {id_col} <= :max_{table}) FROM {self.schema}.{table}"
+            for table, (_, id_col) in DIMENSIONS.items()
+        )), {f"max_{t}": self._tables[t]["max_id"] for t in DIMENSIONS}).fetchall()
+
+        for table, count, max_id, kept in stamps:
+            entry = self._tables[table]
+            if (count, max_id) == (entry["count"], entry["max_id"]):
+                continue
+            key_col, id_col = DIMENSIONS[table]
+            if kept != entry["count"]:
+                # Rows we cached were deleted (or ids were reset): start over for this table
+                logger.info("♻️ Dimension cache for %s is stale — reloading", table)
+                entry = self._tables[table] = _empty_entry()
+            rows = conn.execute(text(
+                f"SELECT {key_col}, {id_col} FROM {self.schema}.{table} WHERE {id_col} > :max_id"
+            ), {"max_id": entry["max_id"]}).fetchall()
+            entry["keys"].update(rows)
+            entry["count"], entry["max_id"] = count, max_id
+            self._changed(table)
+
+    def add(self, table, mapping, attributes=None):
+        """
+        Record ids resolved by an upsert (new rows or rows committed by other loaders),
+        and the attributes ({key: [values]}) it wrote.
+        """
+        with self._lock:
+            entry = self._tables[table]
+            if attributes:
+                entry.setdefault("attributes", {}).update({k: list(v) for k, v in attributes.items()})
+                self._dirty = True
+            new = {k: int(v) for k, v in mapping.items() if entry["keys"].get(k) != v}
+            if not new:
+                return
+            entry["keys"].update(new)
+            entry["count"] = len(entry["keys"])
+            entry["max_id"] = max(entry["max_id"], *new.values())
+            self._changed(table)
+
+    def missing(self, table, values):
+        with self._lock:
+            keys = self._tables[table]["keys"]
+            return [v for v in values if v not in keys]
+
+    def stale(self, table, attributes):
+        """Keys of {key: [values]} that are not cached or were last upserted with other values."""
+        with self._lock:
+            entry = self._tables[table]
+            cached = entry.get("attributes", {})
+            return [k for k, v in attributes.items() if k not in entry["keys"] or cached.get(k) != list(v)]
+
+    def derived(self, name, table, build):
+        """build(keys) memoized until `table` changes (e.g. the normalized section lookup)."""
+        with self._lock:
+            version = self._tables[table].get("version", 0)
+            cached = self._derived.get(name)
+            if cached is None or cached[0] != version:
+                cached = self._derived[name] = (version, build(dict(self.get(table))))
+            return cached[1]
+
+    def _changed(self, table):
+        self._tables[table]["version"] = self._tables[table].get("version", 0) + 1
+        self._dirty = True
+
+    def save(self):
+        """Persist the maps (dimension rows are committed before their ids are cached)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            write_json_to_s3({"schema": self.schema, "tables": self._tables}, self.bucket_name, self.key)
+            self._dirty = False
+        logger.info("🗃️ Saved dimension cache (%s)", ", ".join(
+            f"{t}={len(e['keys'])}" for t, e in self._tables.items()
+        ))
+
+    def discard(self):
+        """Forget in-memory changes by reloading the persisted state."""
+        with self._lock:
+            self._tables, self._derived, self._dirty = self._read(), {}, False
+
+
+def get_dimension_cache(bucket_name, schema="dw"):
+    """Process-wide cache instance for `bucket_name`/`schema`."""
+    with _caches_lock:
+        cache = _caches.get((bucket_name, schema))
+        if cache is None:
+            cache = _caches[(bucket_name, schema)] = DimensionCache(bucket_name, schema=schema)
+        return cache
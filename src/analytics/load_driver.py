@@ -0,0 +1,111 @@
+"""
+Parallel load of many processed files into the warehouse (backfills, reloads).
+
+    python -m src.analytics.load_driver --from-date 2024-01-01 --to-date 2024-03-31 --workers 4
+    python -m src.analytics.load_driver --keys processed/.../a.parquet processed/.../b.parquet
+
+Each file is loaded by load_parquet_to_postgres in its own thread and transaction,
+at most `workers` at a time, through one shared SQLAlchemy connection pool. Dimension
+upserts run in short transactions of their own, serialized per table by an advisory
+lock (dimension_transaction), so concurrent loads never deadlock on dw.authors /
+dw.sections. A failed file is retried with exponential backoff; since every load is
+one transaction, a retry never sees half of a previous attempt.
+
+Files finish in any order, and several may hold versions of the same article (one per
+transform run). That is safe: the merge locks the articles it touches and never
+replaces a loaded version with an older one (ingested_at), so the latest version wins
+whatever order the files load in.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.analytics.load_parquet_to_postgres import LOAD_MODE, create_db_engine, load_parquet_to_postgres
+from src.processing.processed_dataset import list_processed_keys
+
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", 4))
+LOAD_RETRIES = int(os.getenv("LOAD_RETRIES", 3))
+LOAD_RETRY_BACKOFF_SECONDS = float(os.getenv("LOAD_RETRY_BACKOFF_SECONDS", 2))
+
+
+def _load_one(key, bucket_name, engine, mode, retries):
+    for attempt in range(1, retries + 1):
+        started = time.perf_counter()
+        try:
+            summary = load_parquet_to_postgres([key], bucket_name, mode=mode, engine=engine)
+            return {**summary, "key": key, "seconds": time.perf_counter() - started, "attempts": attempt}
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = LOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            print(f"⚠️ {key} failed (attempt {attempt}/{retries}): {e} — retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+
+def run_loads(keys, bucket_name, workers=LOAD_WORKERS, retries=LOAD_RETRIES, mode=LOAD_MODE):
+    """
+    Load `keys` with `workers` threads, in no particular order (the merge keeps the latest
+    ingested_at per article); returns {"results": [...], "failed": {key: error},
+    "rows_loaded", "inserted", "updated", "changed_article_ids", "changed_tables"}.
+    """
+    keys = list(keys)
+    print(f"🏭 Loading {len(keys)} processed files with {workers} workers (mode={mode}, retries={retries})")
+
+    # Each load holds its main connection plus, briefly, one for a dimension upsert
+    engine = create_db_engine(pool_size=2 * workers, max_overflow=workers, pool_pre_ping=True)
+    results, failed = [], {}
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dw-load") as pool:
+            futures = {pool.submit(_load_one, key, bucket_name, engine, mode, retries): key for key in keys}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {key} failed after {retries} attempts: {e}")
+                    failed[key] = str(e)
+                    continue
+                results.append(result)
+                print(f"   📄 {key}: {result['rows_loaded']} rows in {result['seconds']:.1f}s")
+    finally:
+        engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    total_rows = sum(r["rows_loaded"] for r in results)
+    print(f"✅ {len(results)} files ({total_rows} rows) in {elapsed:.1f}s "
+          f"→ {total_rows / elapsed if elapsed else 0:,.0f} rows/s overall, {len(failed)} failed")
+
+    return {
+        "results": results,
+        "failed": failed,
+        "rows_loaded": total_rows,
+        "inserted": sum(r["inserted"] for r in results),
+        "updated": sum(r["updated"] for r in results),
+        "changed_article_ids": sorted({i for r in results for i in r["changed_article_ids"]}),
+        "changed_tables": sorted({t for r in results for t in r["changed_tables"]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load many processed files into the warehouse in parallel")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--keys", nargs="+", help="processed parquet keys")
+    source.add_argument("--sections", nargs="+", help="only files of these sections (with the date range)")
+    parser.add_argument("--from-date", help="first publication date (YYYY-MM-DD)")
+    parser.add_argument("--to-date", help="last publication date (YYYY-MM-DD)")
+    parser.add_argument("--bucket", default=os.getenv("S3_BUCKET", "the-guardian-data"))
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS)
+    parser.add_argument("--retries", type=int, default=LOAD_RETRIES, help="attempts per file")
+    parser.add_argument("--mode", choices=["insert", "upsert"], default=LOAD_MODE)
+    args = parser.parse_args()
+
+    keys = args.keys or list_processed_keys(args.bucket, args.from_date, args.to_date, args.sections)
+    result = run_loads(keys, args.bucket, workers=args.workers, retries=args.retries, mode=args.mode)
+    if result["failed"]:
+        raise SystemExit(f"❌ {len(result['failed'])} files failed — rerun with --keys: {sorted(result['failed'])}")
+
+
+if __name__ == "__main__":
+    main()
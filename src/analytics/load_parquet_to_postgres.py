@@ -2,14 +2,17 @@
 
 import logging
 import os
-import json
 import re
+import time
 import pandas as pd
-from io import BytesIO
-from typing import Optional
+import pyarrow.compute as pc
+from contextlib import contextmanager
+from typing import List, Optional, Union
 from sqlalchemy import create_engine, text
 from urllib.parse import quote_plus
-from src.storage.s3_helper import get_s3_client
+from src.analytics.dimension_cache import get_dimension_cache
+from src.analytics.pg_bulk import copy_frame, create_staging_table, merge_staging
+from src.processing.processed_dataset import PARTITION_COLUMNS, iter_processed_articles, processed_dataset
 
 # -------------------------
 # Config
@@ -17,7 +20,6 @@ from src.storage.s3_helper import get_s3_client
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 S3_BUCKET = os.getenv("S3_BUCKET", "the-guardian-data")
-S3_KEY = os.getenv("S3_KEY", "processed/2025-10-15/guardian_articles_20251015_070945.parquet")
 
 PG_USER = os.getenv("POSTGRES_USER", "airflow")
 PG_PASSWORD = os.getenv("POSTGRES_PASSWORD", "airflow")
@@ -25,6 +27,24 @@ PG_HOST = os.getenv("POSTGRES_HOST", "postgres")
 PG_PORT = int(os.getenv("POSTGRES_PORT", 5432))
 PG_DB = os.getenv("POSTGRES_DB", "guardian_dw")
 SCHEMA = "dw"
+# "upsert": new articles are inserted, articles whose content_hash changed are updated
+# "insert": only new article ids are loaded (previous behaviour)
+LOAD_MODE = os.getenv("LOAD_MODE", "upsert")
+# Rows per streamed batch (peak loader memory is about one batch)
+LOAD_BATCH_ROWS = int(os.getenv("LOAD_BATCH_ROWS", 20_000))
+# Advisory locks a merge takes on article ids: a fixed number of hash buckets, so a
+# large file never fills Postgres' shared lock table (max_locks_per_transaction)
+ARTICLE_LOCK_BUCKETS = int(os.getenv("ARTICLE_LOCK_BUCKETS", 64))
+
+# Article prefixes that don't match a section key directly (extend as needed)
+SECTION_KEY_EXPANSIONS = {
+    "tv": "television-and-radio",
+    "tv-and-radio": "television-and-radio",
+    "television": "television-and-radio",
+    "world": "world-news",
+    "us": "us-news",
+    "uk": "uk-news",
+}
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,36 +55,161 @@ logger = logging.getLogger(__name__)
 # -------------------------
 # Helpers
 # -------------------------
-def create_db_engine():
+def create_db_engine(**pool_options):
     pg_url = f"postgresql://{PG_USER}:{quote_plus(PG_PASSWORD)}@{PG_HOST}:{PG_PORT}/{PG_DB}"
-    return create_engine(pg_url, client_encoding="utf8")
+    return create_engine(pg_url, client_encoding="utf8", **pool_options)
 
-def upsert_dimension(conn, table, unique_col, values):
-    """Upsert unique values and return mapping {value: id}"""
-    id_col = f"{table[:-1]}_id"
-    insert_sql = text(f"""
-        INSERT INTO {SCHEMA}.{table} ({unique_col})
-        VALUES (:val)
-        ON CONFLICT ({unique_col}) DO NOTHING;
-    """)
-    select_sql = text(f"SELECT {unique_col}, {id_col} FROM {SCHEMA}.{table} WHERE {unique_col} = :val;")
-    mapping = {}
+
+@contextmanager
+def dimension_transaction(engine, table, schema=SCHEMA):
+    """
+    Short, separately committed transaction for upserting into one dimension table.
+    A transaction-level advisory lock per table serializes concurrent loaders, so they
+    never wait on each other's uncommitted dimension rows (no deadlocks), and the
+    loader's own long transaction holds no dimension locks at all.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": f"{schema}.{table}"})
+        yield conn
+
+def _clean_values(values):
+    """Stripped, non-empty, de-duplicated strings (sorted: a stable lock order for upserts)."""
+    cleaned = []
     for val in values:
-        if not val or (isinstance(val, float) and pd.isna(val)):
+        if val is None or (isinstance(val, float) and pd.isna(val)):
             continue
         val = str(val).strip()
-        if val == "":
-            continue
-        conn.execute(insert_sql, {"val": val})
-        res = conn.execute(select_sql, {"val": val}).fetchone()
-        if res:
-            mapping[val] = res[1]
+        if val:
+            cleaned.append(val)
+    return sorted(set(cleaned))
+
+
+def upsert_dimension(conn, table, unique_col, values):
+    """
+    Upsert unique values and return mapping {value: id}, in one round trip:
+    RETURNING gives ids of the new rows, the join gives ids of the existing ones.
+    """
+    id_col = f"{table[:-1]}_id"
+    values = _clean_values(values)
+    if not values:
+        return {}
+    upsert_sql = text(f"""
+        WITH input AS (
+            SELECT DISTINCT unnest(CAST(:vals AS text[])) AS val
+        ), inserted AS (
+            INSERT INTO {SCHEMA}.{table} ({unique_col})
+            SELECT val FROM input
+            ON CONFLICT ({unique_col}) DO NOTHING
+            RETURNING {unique_col}, {id_col}
+        )
+        SELECT {unique_col}, {id_col} FROM inserted
+        UNION ALL
+        SELECT t.{unique_col}, t.{id_col} FROM {SCHEMA}.{table} t JOIN input i ON t.{unique_col} = i.val
+    """)
+    mapping = dict(conn.execute(upsert_sql, {"vals": values}).fetchall())
+
+    # Rows committed by a concurrent loader after our snapshot are in neither branch
+    missing = [v for v in values if v not in mapping]
+    if missing:
+        select_sql = text(f"SELECT {unique_col}, {id_col} FROM {SCHEMA}.{table} WHERE {unique_col} = ANY(:vals)")
+        mapping.update(conn.execute(select_sql, {"vals": missing}).fetchall())
     return mapping
 
-def fetch_existing_article_ids(conn, article_ids):
-    q = text(f"SELECT article_id FROM {SCHEMA}.articles WHERE article_id = ANY(:ids)")
+
+def upsert_sections(conn, sections_df, schema=SCHEMA):
+    """
+    Upsert (section_key, section_name, pillar_name) rows in one statement;
+    returns {section_key: section_id}. Later rows win for a repeated key.
+    """
+    sections_df = sections_df.dropna(subset=["section_key"]).drop_duplicates(subset=["section_key"], keep="last")
+    sections_df = sections_df.sort_values("section_key")
+    if sections_df.empty:
+        return {}
+
+    def column(name):
+        if name not in sections_df.columns:
+            return [None] * len(sections_df)
+        col = sections_df[name].astype(object)
+        return col.where(col.notna(), None).tolist()
+
+    upsert_sql = text(f"""
+        INSERT INTO {schema}.sections (section_key, section_name, pillar_name)
+        SELECT * FROM unnest(CAST(:keys AS text[]), CAST(:names AS text[]), CAST(:pillars AS text[]))
+        ON CONFLICT (section_key)
+        DO UPDATE SET
+            section_name = EXCLUDED.section_name,
+            pillar_name = EXCLUDED.pillar_name
+        RETURNING section_key, section_id
+    """)
+    rows = conn.execute(upsert_sql, {
+        "keys": column("section_key"), "names": column("section_name"), "pillars": column("pillar_name"),
+    }).fetchall()
+    return dict(rows)
+
+
+def resolve_dimension(engine, cache, table, unique_col, values, changed_tables=None):
+    """
+    {value: id} for `values`; only values the cache has never seen are upserted, in
+    their own dimension_transaction (the table is then appended to `changed_tables`).
+    """
+    values = _clean_values(values)
+    missing = cache.missing(table, values)
+    if missing:
+        with dimension_transaction(engine, table) as conn:
+            cache.add(table, upsert_dimension(conn, table, unique_col, missing))
+        if changed_tables is not None:
+            changed_tables.append(f"{SCHEMA}.{table}")
+    keys = cache.get(table)
+    return {v: keys[v] for v in values if v in keys}
+
+
+def build_section_lookup(section_map):
+    """Normalized section key → section_id, including SECTION_KEY_EXPANSIONS aliases."""
+    lookup = {normalize_section_key(str(k)): v for k, v in section_map.items()}
+    # If DB contains the target, map the source to the target id
+    for src, tgt in SECTION_KEY_EXPANSIONS.items():
+        tgt_norm = normalize_section_key(tgt)
+        if tgt_norm in lookup:
+            lookup[normalize_section_key(src)] = lookup[tgt_norm]
+    return lookup
+
+
+def publication_months(bucket_name, s3_keys):
+    """First days ("YYYY-MM-01", UTC) of the months the files publish into; reads one column."""
+    dataset = processed_dataset(bucket_name, keys=s3_keys)
+    if dataset is None:
+        return []
+    dates = dataset.to_table(columns=["webPublicationDate"])["webPublicationDate"].drop_null()
+    return sorted(pc.unique(pc.strftime(dates, format="%Y-%m-01")).to_pylist())
+
+
+def ensure_article_partitions(engine, months, schema=SCHEMA):
+    """
+    Create the missing monthly partitions of dw.articles for `months`. Runs before the
+    load transaction touches dw.articles: creating a partition locks the parent table.
+    """
+    if not months:
+        return 0
+    with dimension_transaction(engine, "articles", schema) as conn:
+        created = conn.execute(
+            text(f"SELECT {schema}.ensure_article_partitions(CAST(:months AS date[]))"), {"months": months}
+        ).scalar()
+    if created:
+        logger.info("🧱 Created %s partition(s) of %s.articles", created, schema)
+    return created
+
+
+def fetch_article_versions(conn, article_ids):
+    """{article_id: ingested_at} of the loaded version of each id (missing ids are absent)."""
+    q = text(f"SELECT article_id, ingested_at FROM {SCHEMA}.articles WHERE article_id = ANY(:ids)")
     rows = conn.execute(q, {"ids": list(article_ids)}).fetchall()
-    return {r[0] for r in rows}
+    return {r[0]: r[1] for r in rows}
+
+def fetch_loaded_article_versions(article_ids):
+    """Standalone lookup of loaded article versions (used by the two-phase fetch)."""
+    engine = create_db_engine()
+    with engine.connect() as conn:
+        return fetch_article_versions(conn, article_ids)
 
 def normalize_section_key(name: str) -> Optional[str]:
     if not isinstance(name, str):
@@ -76,267 +221,359 @@ def normalize_section_key(name: str) -> Optional[str]:
     s = re.sub(r"-+", "-", s).strip("-")
     return s
 
-def load_parquet_to_postgres(s3_key: str, bucket_name: str, schema: str = "dw"):
+def build_article_authors(articles: pd.DataFrame, author_map: dict) -> pd.DataFrame:
+    """(article_id, author_id, ord) rows: bylines split on "," in order, names resolved via author_map."""
+    if "fields_byline" not in articles.columns:
+        return pd.DataFrame(columns=["article_id", "author_id", "ord"])
+    names = (
+        articles.set_index("article_id")["fields_byline"].dropna().astype(str)
+        .str.split(",").explode().str.strip()
+    )
+    names = names[names.notna() & (names != "")]
+    bridge = names.rename("author_name").reset_index()
+    bridge["ord"] = bridge.groupby("article_id").cumcount()
+    bridge["author_id"] = bridge["author_name"].map(author_map).astype("Int64")
+    bridge = bridge.dropna(subset=["author_id"]).drop_duplicates(subset=["article_id", "author_id"])
+    return bridge[["article_id", "author_id", "ord"]]
+
+
+def build_article_keywords(articles: pd.DataFrame) -> pd.DataFrame:
+    """(article_id, keyword) rows from slug_keywords, lower-cased and de-duplicated."""
+    if "slug_keywords" not in articles.columns:
+        return pd.DataFrame(columns=["article_id", "keyword"])
+    # list<string> column (processed schema): one explode for the whole column
+    keywords = articles.set_index("article_id")["slug_keywords"].explode().astype("string").str.strip().str.lower()
+    bridge = keywords[keywords.notna() & (keywords != "")].rename("keyword").reset_index()
+    return bridge.drop_duplicates()
+
+
+def _section_frame(df):
+    """(section_key, section_name[, pillar_name]) rows of a batch."""
+    # Sections: try to use sectionId if exists, otherwise build from sectionName/pillarName
+    if "sectionId" in df.columns:
+        sections_df = df[["sectionId", "sectionName"]].dropna().drop_duplicates()
+        sections_df.columns = ["section_key", "section_name"]
+        # normalize keys
+        sections_df["section_key"] = sections_df["section_key"].astype(str).apply(normalize_section_key)
+        # Some sectionId values may already be normalized keys (keep as-is)
+        sections_df = sections_df.drop_duplicates(subset=["section_key"])
+        return sections_df[["section_key", "section_name"]]
+    # Fallback khi file parquet không có sectionId
+    sections_df = df[["sectionName", "pillarName"]].dropna(subset=["sectionName"]).drop_duplicates()
+    sections_df["section_key"] = (
+        sections_df["sectionName"].astype(str).apply(normalize_section_key)
+    )
+    sections_df = sections_df[["section_key", "sectionName", "pillarName"]]
+    sections_df.columns = ["section_key", "section_name", "pillar_name"]
+    return sections_df
+
+
+def resolve_section_id_from_prefix(prefix: Optional[str], map_dict: dict) -> Optional[int]:
+    """Resolve article prefix → section_id using normalized lookup"""
+    if not isinstance(prefix, str) or not prefix:
+        return None
+    p_norm = normalize_section_key(prefix)
+    if not p_norm:
+        return None
+    # direct
+    if p_norm in map_dict:
+        return map_dict[p_norm]
+    # try variants
+    if (p_norm + "-news") in map_dict:
+        return map_dict[p_norm + "-news"]
+    if p_norm.endswith("-news") and p_norm[:-5] in map_dict:
+        return map_dict[p_norm[:-5]]
+    return None
+
+
+def prepare_batch(engine, cache, df, schema=SCHEMA, changed_tables=None):
     """
-    Load transformed Guardian parquet file from S3 into Postgres DW schema.
+    Resolve the dimension keys of one batch (upserting unseen values, committed on
+    their own) and build the rows for dw.articles, dw.article_authors and dw.article_keywords.
+    `df` must hold one version per article_id, numbered by a `stage_seq` column.
     """
-
-    s3 = get_s3_client()
-    logger.info(f"📦 Downloading parquet from s3://{bucket_name}/{s3_key}")
-    obj = s3.get_object(Bucket=bucket_name, Key=s3_key)
-    df = pd.read_parquet(BytesIO(obj["Body"].read()))
-    logger.info("✅ Loaded parquet: %s rows", len(df))
-
-    required = ["article_id", "webPublicationDate"]
-    for r in required:
-        if r not in df.columns:
-            raise RuntimeError(f"❌ Missing column: {r}")
-
-    engine = create_db_engine()
+    author_raw = df.get("fields_byline", pd.Series(dtype=str)).dropna().astype(str)
+    all_authors = []
+    for s in author_raw.unique():
+        parts = [p.strip() for p in s.split(",") if p.strip()]
+        all_authors.extend(parts)
+    author_map = resolve_dimension(engine, cache, "authors", "author_name", all_authors, changed_tables)
+
+    # Upsert into dw.sections (one statement for the keys not cached yet, or whose
+    # name/pillar differs from what was last upserted)
+    sections_df = _section_frame(df).dropna(subset=["section_key"]).drop_duplicates(
+        subset=["section_key"], keep="last"
+    )
+    section_attributes = {
+        row[0]: [None if pd.isna(v) else str(v) for v in row[1:]]
+        for row in sections_df.reindex(columns=["section_key", "section_name", "pillar_name"]).itertuples(index=False)
+    }
+    stale_keys = cache.stale("sections", section_attributes)
+    sections_df = sections_df[sections_df["section_key"].isin(stale_keys)]
+    if not sections_df.empty:
+        with dimension_transaction(engine, "sections", schema) as conn:
+            cache.add("sections", upsert_sections(conn, sections_df, schema),
+                      attributes={k: section_attributes[k] for k in stale_keys})
+    if not sections_df.empty and changed_tables is not None:
+        changed_tables.append(f"{schema}.sections")
+
+    # Publications
+    pubs_values = (
+        df["fields_publication"].dropna().astype(str).str.strip().unique().tolist()
+        if "fields_publication" in df.columns else []
+    )
+    pub_map = resolve_dimension(engine, cache, "publications", "publication_name", pubs_values, changed_tables)
+    logger.info("🔹 Resolved %s authors, %s sections, %s publications", len(author_map),
+                len(sections_df), len(pub_map))
+
+    # --------------------
+    # Prepare Articles — robust section mapping
+    # --------------------
+    # Normalized section lookup, rebuilt only when the cached sections change
+    map_norm_to_id = cache.derived("section_lookup", "sections", build_section_lookup)
+
+    articles = df
+    articles["article_prefix"] = articles["article_id"].apply(
+        lambda x: str(x).split("/")[0] if pd.notna(x) else None)
+    prefix_to_section = {
+        p: resolve_section_id_from_prefix(p, map_norm_to_id) for p in articles["article_prefix"].dropna().unique()
+    }
+    articles["section_id"] = articles["article_prefix"].map(prefix_to_section)
+
+    # Log unmapped prefixes for debugging
+    unmapped = articles.loc[articles["section_id"].isnull(), "article_prefix"].dropna().unique().tolist()
+    if unmapped:
+        logger.warning("⚠️ Unmapped article prefixes: %s", unmapped)
+
+    # publication_id from the resolved map (covers every publication of the batch)
+    if "fields_publication" in articles.columns:
+        articles["publication_id"] = articles["fields_publication"].astype(object).map(
+            lambda v: pub_map.get(str(v).strip()) if pd.notna(v) else None
+        )
+
+    # Rename columns to target schema
+    rename_map = {
+        "webPublicationDate": "publication_date",
+        "webTitle": "title",
+        "fields_headline": "headline",
+        "fields_trailText": "trail_text",
+        "fields_body": "body",
+        "fields_wordcount": "wordcount",
+        "fields_thumbnail": "thumbnail_url",
+        "webUrl": "web_url",
+    }
+    articles = articles.rename(columns=rename_map)
+    if "body" in articles.columns:
+        articles["body_length"] = articles["body"].str.len()
+
+    # Keep only columns for the articles table (body goes to dw.article_bodies)
+    keep_cols = [
+        "article_id", "type", "section_id", "publication_date", "title",
+        "headline", "trail_text", "body", "body_length", "wordcount", "publication_id",
+        "thumbnail_url", "web_url", "has_thumbnail", "is_live_blog",
+        "topic_country", "ingested_at", "source_system", "raw_s3_key", "processed_by", "content_hash",
+        "stage_seq"
+    ]
+    articles_to_write = articles[[c for c in keep_cols if c in articles.columns]].copy()
+
+    # Type conversions
+    if "publication_date" in articles_to_write:
+        articles_to_write["publication_date"] = pd.to_datetime(
+            articles_to_write["publication_date"], errors="coerce"
+        )
+
+    for col in ["has_thumbnail", "is_live_blog"]:
+        if col in articles_to_write.columns:
+            # safe coercion to bool (nullable boolean: missing → False)
+            articles_to_write[col] = articles_to_write[col].fillna(False).astype(bool)
+
+    # Surrogate keys come out of the lookups as float/object (NaN = unmapped)
+    for col in ["section_id", "publication_id", "body_length", "content_hash"]:
+        if col in articles_to_write.columns:
+            articles_to_write[col] = pd.to_numeric(articles_to_write[col]).astype("Int64")
+
+    # Bridge rows carry the stage_seq of their version so only the latest one is linked
+    versions = df[["article_id", "stage_seq"]]
+    article_authors = build_article_authors(df, author_map).merge(versions, on="article_id")
+    article_keywords = build_article_keywords(df).merge(versions, on="article_id")
+    return articles_to_write, article_authors, article_keywords
+
+
+def merge_staged_articles(conn, columns, schema=SCHEMA, mode=LOAD_MODE):
+    """
+    Merge stg_articles (+ bridge staging) into the warehouse in set-based statements:
+    latest staged version per article, kept if new or (upsert) its content_hash changed and
+    it is not older than the loaded version (ingested_at), so replaying an old file never
+    overwrites newer content.
+    Bodies go to dw.article_bodies, the other columns to the partitioned dw.articles.
+    Returns (rows merged, [(article_id, existed)]).
+
+    The PK (article_id, publication_date) cannot stop two concurrent loads from inserting
+    one article under two dates, so the hash buckets (ARTICLE_LOCK_BUCKETS) of the staged
+    article_ids are first locked (transaction advisory locks, taken in bucket order so loads
+    never deadlock): a second load of the same article waits for the first to commit, then
+    sees its row and moves it.
+    """
+    conn.execute(text(f"""
+        SELECT count(pg_advisory_xact_lock(hashtext('{schema}.articles'), bucket))
+        FROM (
+            SELECT DISTINCT ((hashtext(article_id) % :buckets) + :buckets) % :buckets AS bucket
+            FROM stg_articles WHERE article_id IS NOT NULL ORDER BY bucket
+        ) buckets
+    """), {"buckets": ARTICLE_LOCK_BUCKETS})
+    conn.execute(text("DROP TABLE IF EXISTS stg_changed"))
+    conn.execute(text(f"""
+        CREATE TEMP TABLE stg_changed ON COMMIT DROP AS
+        WITH latest AS (
+            SELECT DISTINCT ON (article_id) * FROM stg_articles
+            ORDER BY article_id, ingested_at DESC NULLS LAST, stage_seq DESC
+        )
+        SELECT l.*, (a.article_id IS NOT NULL) AS existed
+        FROM latest l
+        LEFT JOIN {schema}.articles a ON a.article_id = l.article_id
+        WHERE a.article_id IS NULL
+           OR (:upsert AND l.content_hash IS NOT NULL AND a.content_hash IS DISTINCT FROM l.content_hash
+               AND (a.ingested_at IS NULL OR l.ingested_at >= a.ingested_at))
+    """), {"upsert": mode == "upsert"})
+    changed = conn.execute(text("SELECT article_id, existed FROM stg_changed")).fetchall()
+    if not changed:
+        return 0, []
+
+    # Remember the day a moved article leaves, so incremental dbt models rebuild it too
+    conn.execute(text(f"""
+        UPDATE stg_changed c
+        SET previous_publication_date = CASE WHEN a.publication_date <> c.publication_date
+                                             THEN a.publication_date ELSE a.previous_publication_date END
+        FROM {schema}.articles a
+        WHERE a.article_id = c.article_id AND c.existed
+    """))
+    # The partition key is part of the primary key: a moved publication_date means the
+    # old row (in another partition) is deleted and the new one inserted
+    conn.execute(text(f"""
+        DELETE FROM {schema}.articles a USING stg_changed c
+        WHERE a.article_id = c.article_id AND c.existed AND a.publication_date <> c.publication_date
+    """))
+    # loaded_at marks new/updated rows for incremental dbt models. Stamped here, at the
+    # end of the load, not now() (the transaction start): a row only becomes visible at
+    # commit, and dbt's lookback must cover the time between its stamp and the commit
+    conn.execute(text("UPDATE stg_changed SET loaded_at = clock_timestamp()"))
+    article_columns = [c for c in columns if c not in ("body", "stage_seq")]
+    article_columns += ["loaded_at", "previous_publication_date"]
+    conflict = ["article_id", "publication_date"]
+    update_columns = [c for c in article_columns if c not in conflict] if mode == "upsert" else None
+    merged = merge_staging(
+        conn, "stg_changed", "articles", article_columns, conflict, update_columns=update_columns,
+        update_where="articles.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+                     " AND (articles.ingested_at IS NULL OR EXCLUDED.ingested_at >= articles.ingested_at)",
+        schema=schema,
+    )
+    if "body" in columns:
+        merge_staging(
+            conn, "stg_changed", "article_bodies", ["article_id", "body"], ["article_id"],
+            update_columns=["body"] if mode == "upsert" else None, schema=schema,
+        )
+
+    # Changed articles get their bridge rows rebuilt from the new version
+    for bridge, bridge_columns, conflict in [
+        ("article_authors", ["article_id", "author_id", "ord"], ["article_id", "author_id"]),
+        ("article_keywords", ["article_id", "keyword"], ["article_id", "keyword"]),
+    ]:
+        conn.execute(text(f"""
+            DELETE FROM {schema}.{bridge} b USING stg_changed c
+            WHERE b.article_id = c.article_id AND c.existed
+        """))
+        linked = merge_staging(
+            conn, f"stg_{bridge} JOIN stg_changed USING (article_id, stage_seq)", bridge,
+            bridge_columns, conflict, schema=schema,
+        )
+        logger.info("🔗 Linked %s rows in %s.%s", linked, schema, bridge)
+    return merged, changed
+
+
+def load_parquet_to_postgres(s3_keys: Union[str, List[str]], bucket_name: str, schema: str = "dw",
+                             mode: str = LOAD_MODE, batch_rows: int = LOAD_BATCH_ROWS, engine=None):
+    """
+    Load transformed Guardian parquet file(s) from S3 into Postgres DW schema.
+    `s3_keys` is one processed file or the list of partition files of a run.
+
+    The files are streamed in batches of about `batch_rows` rows: each batch resolves
+    its dimension keys and is COPYed into staging tables; one set-based merge and a
+    single commit follow, so peak memory is one batch regardless of file size.
+    The monthly partitions of dw.articles the files need are created up front.
+    In "upsert" mode, existing articles whose content_hash differs are updated too.
+    Pass `engine` to share one connection pool between concurrent loads (load_driver).
+    Returns {"rows_loaded", "inserted", "updated", "changed_article_ids", "changed_tables"}.
+    """
+    if isinstance(s3_keys, str):
+        s3_keys = [s3_keys]
+
+    logger.info(f"📦 Streaming {len(s3_keys)} parquet file(s) from s3://{bucket_name}/ (batch={batch_rows} rows)")
+    started = time.perf_counter()
+    cache = get_dimension_cache(bucket_name, schema)
+    engine = engine or create_db_engine()
+    ensure_article_partitions(engine, publication_months(bucket_name, s3_keys), schema)
     with engine.connect() as conn:
         trans = conn.begin()
 
         try:
-            author_raw = df.get("fields_byline", pd.Series(dtype=str)).dropna().astype(str)
-            all_authors = []
-            for s in author_raw.unique():
-                parts = [p.strip() for p in s.split(",") if p.strip()]
-                all_authors.extend(parts)
-            author_map = upsert_dimension(conn, "authors", "author_name", list(dict.fromkeys(all_authors)))
-            logger.info("🔹 Upserted authors: %s", len(author_map))
-
-            # Sections: try to use sectionId if exists, otherwise build from sectionName/pillarName
-            if "sectionId" in df.columns:
-                sections_df = df[["sectionId", "sectionName"]].dropna().drop_duplicates()
-                sections_df.columns = ["section_key", "section_name"]
-                # normalize keys
-                sections_df["section_key"] = sections_df["section_key"].astype(str).apply(normalize_section_key)
-                # Some sectionId values may already be normalized keys (keep as-is)
-                sections_df = sections_df.drop_duplicates(subset=["section_key"])
-                sections_df = sections_df[["section_key", "section_name"]]
-            else:
-                # Fallback khi file parquet không có sectionId
-                sections_df = df[["sectionName", "pillarName"]].dropna(subset=["sectionName"]).drop_duplicates()
-                sections_df["section_key"] = (
-                    sections_df["sectionName"].astype(str).apply(normalize_section_key)
-                )
-                sections_df = sections_df[["section_key", "sectionName", "pillarName"]]
-                sections_df.columns = ["section_key", "section_name", "pillar_name"]
-
-            # Insert into dw.sections
-            insert_section_sql = text(f"""
-                        INSERT INTO {schema}.sections (section_key, section_name, pillar_name)
-                        VALUES (:key, :name, :pillar)
-                        ON CONFLICT (section_key)
-                        DO UPDATE SET
-                            section_name = EXCLUDED.section_name,
-                            pillar_name = EXCLUDED.pillar_name;
-                    """)
-
-            for _, row in sections_df.iterrows():
-                conn.execute(insert_section_sql, {
-                    "key": row["section_key"],
-                    "name": row["section_name"],
-                    "pillar": row.get("pillar_name")
-                })
-
-            logger.info("🔹 Upserted sections: %s", len(sections_df))
-
-            # Publications
-            pubs_values = (
-                df["fields_publication"].dropna().astype(str).str.strip().unique().tolist()
-                if "fields_publication" in df.columns else []
-            )
-            pub_map = upsert_dimension(conn, "publications", "publication_name", pubs_values)
-            logger.info("🔹 Upserted publications: %s", len(pub_map))
-
-            # ✅ FIX: Re-fetch mappings using SAME connection (conn) instead of engine
-            sections_db = pd.read_sql(
-                text(f"SELECT section_id, section_key, section_name FROM {schema}.sections"),
-                conn  # ← Changed from engine to conn
-            )
-            pubs_db = pd.read_sql(
-                text(f"SELECT publication_id, publication_name FROM {schema}.publications"),
-                conn  # ← Changed from engine to conn
-            )
-
-            # --------------------
-            # Filter new articles
-            # --------------------
-            incoming_ids = list(df["article_id"].dropna().unique())
-            existing_ids = fetch_existing_article_ids(conn, incoming_ids)
-            new_df = df[~df["article_id"].isin(existing_ids)].copy()
-            logger.info("ℹ️ New articles to insert: %s", len(new_df))
-
-            if new_df.empty:
-                logger.info("✅ No new articles. Done.")
-                trans.commit()
-                return
-
-            # --------------------
-            # Prepare Articles — robust section mapping
-            # --------------------
-            # Build normalized map from sections_db
-            sections_db["section_key_norm"] = sections_db["section_key"].astype(str).apply(normalize_section_key)
-            map_norm_to_id = dict(zip(sections_db["section_key_norm"], sections_db["section_id"]))
-
-            # Custom expansions / edge-case mappings (extend as needed)
-            custom_expansions = {
-                "tv": "television-and-radio",
-                "tv-and-radio": "television-and-radio",
-                "television": "television-and-radio",
-                "world": "world-news",
-                "us": "us-news",
-                "uk": "uk-news",
-            }
-            # If DB contains the target, map the source to the target id
-            for src, tgt in list(custom_expansions.items()):
-                tgt_norm = normalize_section_key(tgt)
-                if tgt_norm in map_norm_to_id:
-                    map_norm_to_id[normalize_section_key(src)] = map_norm_to_id[tgt_norm]
-
-            def resolve_section_id_from_prefix(prefix: Optional[str], map_dict: dict) -> Optional[int]:
-                """Resolve article prefix → section_id using normalized lookup"""
-                if not isinstance(prefix, str) or not prefix:
-                    return None
-                p_norm = normalize_section_key(prefix)
-                if not p_norm:
-                    return None
-                # direct
-                if p_norm in map_dict:
-                    return map_dict[p_norm]
-                # try variants
-                if (p_norm + "-news") in map_dict:
-                    return map_dict[p_norm + "-news"]
-                if p_norm.endswith("-news") and p_norm[:-5] in map_dict:
-                    return map_dict[p_norm[:-5]]
-                return None
-
-            # Apply with explicit argument
-            new_df["article_prefix"] = new_df["article_id"].apply(
-                lambda x: str(x).split("/")[0] if pd.notna(x) else None)
-            new_df["section_id"] = new_df["article_prefix"].apply(
-                lambda x: resolve_section_id_from_prefix(x, map_norm_to_id))
-
-            # Log unmapped prefixes for debugging
-            unmapped = new_df.loc[new_df["section_id"].isnull(), "article_prefix"].dropna().unique().tolist()
-            if unmapped:
-                logger.warning("⚠️ Unmapped article prefixes: %s", unmapped)
-
-            # Merge with publications to get publication_id
-            new_df = new_df.merge(
-                pubs_db,
-                how="left",
-                left_on="fields_publication",
-                right_on="publication_name"
-            )
-
-            # Rename columns to target schema
-            rename_map = {
-                "webPublicationDate": "publication_date",
-                "webTitle": "title",
-                "fields_headline": "headline",
-                "fields_trailText": "trail_text",
-                "fields_body": "body",
-                "fields_wordcount": "wordcount",
-                "fields_thumbnail": "thumbnail_url",
-                "webUrl": "web_url",
+            cache.sync(conn)
+            changed_tables = []
+            # stage_seq numbers the staged versions, so bridges join their version even
+            # when ingested_at is NULL or repeated
+            create_staging_table(conn, "articles", schema, extra_columns="body TEXT, stage_seq BIGINT")
+            create_staging_table(conn, "article_authors", schema, extra_columns="stage_seq BIGINT")
+            create_staging_table(conn, "article_keywords", schema, extra_columns="stage_seq BIGINT")
+
+            columns, staged, seq = None, 0, 0
+            # No reader-side dedup: merge_staged_articles keeps the latest staged version itself
+            for df in iter_processed_articles(bucket_name, keys=s3_keys, batch_rows=batch_rows,
+                                              latest_only=False):
+                df = df.drop(columns=PARTITION_COLUMNS, errors="ignore")
+                required = ["article_id", "webPublicationDate"]
+                for r in required:
+                    if r not in df.columns:
+                        raise RuntimeError(f"❌ Missing column: {r}")
+
+                # Reprocessed articles appear once per transform run: keep the latest version
+                # (across batches, merge_staged_articles picks the latest staged one)
+                if "ingested_at" in df.columns:
+                    df = df.sort_values("ingested_at", kind="stable", na_position="first")
+                df = df.drop_duplicates(subset=["article_id"], keep="last")
+                df["stage_seq"] = range(seq, seq + len(df))
+                seq += len(df)
+
+                articles, article_authors, article_keywords = prepare_batch(engine, cache, df, schema, changed_tables)
+                columns = columns or list(articles.columns)
+                copy_frame(conn, articles[columns], "stg_articles")
+                copy_frame(conn, article_authors, "stg_article_authors")
+                copy_frame(conn, article_keywords, "stg_article_keywords")
+                staged += len(articles)
+                logger.info("📥 Staged %s articles (total %s)", len(articles), staged)
+
+            rows_loaded, changed = merge_staged_articles(conn, columns, schema, mode) if staged else (0, [])
+            updated = sum(1 for _, existed in changed if existed)
+            summary = {
+                "rows_loaded": rows_loaded,
+                "inserted": len(changed) - updated,
+                "updated": updated,
+                "changed_article_ids": [article_id for article_id, _ in changed],
+                "changed_tables": list(dict.fromkeys(changed_tables)),
             }
-            new_df = new_df.rename(columns=rename_map)
-
-            # Keep only columns for the articles table
-            keep_cols = [
-                "article_id", "type", "section_id", "publication_date", "title",
-                "headline", "trail_text", "body", "wordcount", "publication_id",
-                "thumbnail_url", "web_url", "has_thumbnail", "is_live_blog",
-                "topic_country", "ingested_at", "source_system", "raw_s3_key", "processed_by"
-            ]
-            articles_to_write = new_df[[c for c in keep_cols if c in new_df.columns]].copy()
-
-            # Type conversions
-            if "publication_date" in articles_to_write:
-                articles_to_write["publication_date"] = pd.to_datetime(
-                    articles_to_write["publication_date"], errors="coerce"
-                )
-
-            for col in ["has_thumbnail", "is_live_blog"]:
-                if col in articles_to_write.columns:
-                    # safe coercion to bool
-                    articles_to_write[col] = articles_to_write[col].astype(bool)
-
-            # --------------------
-            # Insert ARTICLES
-            # --------------------
-            articles_to_write.to_sql("articles", conn, schema=schema, if_exists="append", index=False)
-            logger.info("✅ Inserted %s new articles.", len(articles_to_write))
-
-            # --------------------
-            # ARTICLE ↔ AUTHORS
-            # --------------------
-            insert_author_sql = text(f"""
-                        INSERT INTO {schema}.article_authors (article_id, author_id, ord)
-                        VALUES (:article_id, :author_id, :ord)
-                        ON CONFLICT DO NOTHING;
-                    """)
-            for _, row in new_df.iterrows():
-                a_id = row["article_id"]
-                byline = row.get("fields_byline")
-                if not byline:
-                    continue
-                parts = [p.strip() for p in str(byline).split(",") if p.strip()]
-                for i, name in enumerate(parts):
-                    aid = author_map.get(name)
-                    if aid:
-                        conn.execute(insert_author_sql, {"article_id": a_id, "author_id": int(aid), "ord": i})
-
-            # --------------------
-            # ARTICLE ↔ KEYWORDS
-            # --------------------
-            insert_kw_sql = text(f"""
-                        INSERT INTO {schema}.article_keywords (article_id, keyword)
-                        VALUES (:article_id, :keyword)
-                        ON CONFLICT DO NOTHING;
-                    """)
-
-            for _, row in new_df.iterrows():
-                a_id = row["article_id"]
-                kw = row.get("slug_keywords")
-
-                # Skip if None/NaN
-                if kw is None or (isinstance(kw, float) and pd.isna(kw)):
-                    continue
-
-                # Normalize to list
-                keywords = []
-                if isinstance(kw, str):
-                    try:
-                        parsed = json.loads(kw)
-                        if isinstance(parsed, list):
-                            keywords = parsed
-                        elif isinstance(parsed, dict):
-                            keywords = list(parsed.values())
-                        else:
-                            keywords = re.findall(r"[A-Za-z]+", kw)
-                    except Exception:
-                        keywords = re.findall(r"[A-Za-z]+", kw)
-                elif isinstance(kw, (list, tuple, set)):
-                    keywords = list(kw)
-                elif hasattr(kw, "__iter__"):
-                    keywords = list(kw)
-                else:
-                    continue
-
-                for k in keywords:
-                    k = str(k).strip().lower()
-                    if not k:
-                        continue
-                    conn.execute(insert_kw_sql, {"article_id": a_id, "keyword": k})
+            if changed:
+                summary["changed_tables"] += [f"{schema}.articles", f"{schema}.article_bodies",
+                                              f"{schema}.article_authors", f"{schema}.article_keywords"]
 
             trans.commit()
+            cache.save()
+            elapsed = time.perf_counter() - started
+            logger.info("✅ Loaded %s articles (%s new, %s updated) out of %s staged in %.1fs → %s rows/s",
+                        rows_loaded, summary["inserted"], updated, staged, elapsed,
+                        f"{staged / elapsed:,.0f}" if elapsed else "-")
             logger.info("🎉 ETL complete and committed successfully.")
         except Exception:
+            # Dimension rows were committed separately: their cached ids stay valid
             trans.rollback()
             logger.exception("❌ Error during ETL")
             raise
 
-    return len(articles_to_write)
+    return summary
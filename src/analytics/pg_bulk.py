@@ -0,0 +1,104 @@
+"""
+Bulk-load helpers for the warehouse (PostgreSQL COPY).
+
+    DataFrame → COPY FROM STDIN (CSV) → temp staging table → INSERT ... SELECT ... ON CONFLICT
+
+copy_frame() streams a frame into a table through psycopg2's copy_expert, in chunks
+of PG_COPY_CHUNK_ROWS rows so only one chunk of CSV is in memory at a time.
+bulk_merge() stages the frame in a temp table shaped like the target and merges it
+with a single INSERT ... SELECT, so existing rows are handled by ON CONFLICT instead
+of one statement per row. Loads larger than memory call create_staging_table() once,
+copy_frame() per batch and merge_staging() at the end. Everything runs on the
+caller's connection/transaction.
+"""
+import io
+import logging
+import os
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+PG_COPY_CHUNK_ROWS = int(os.getenv("PG_COPY_CHUNK_ROWS", 20_000))
+_NULL = r"\N"
+
+logger = logging.getLogger(__name__)
+
+
+def copy_frame(conn, df: pd.DataFrame, table: str, chunk_rows: int = PG_COPY_CHUNK_ROWS) -> int:
+    """COPY the rows of `df` into `table` (columns = df.columns); returns the row count."""
+    columns = ", ".join(df.columns)
+    copy_sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{_NULL}')"
+    # Raw psycopg2 cursor of the same DBAPI connection → same transaction as `conn`
+    cursor = conn.connection.cursor()
+    try:
+        for start in range(0, len(df), chunk_rows):
+            buffer = io.StringIO()
+            # Empty strings stay "" (quoted); only missing values become \N
+            df.iloc[start:start + chunk_rows].to_csv(buffer, header=False, index=False, na_rep=_NULL)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+    return len(df)
+
+
+def create_staging_table(conn, table: str, schema: str = "dw", extra_columns: str = None) -> str:
+    """
+    Empty temp table with the columns/defaults of schema.table (no keys or constraints,
+    so repeated rows are fine), plus `extra_columns` DDL if given; dropped at commit.
+    """
+    staging = f"stg_{table}"
+    conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    conn.execute(text(
+        f"CREATE TEMP TABLE {staging} (LIKE {schema}.{table} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    if extra_columns:
+        conn.execute(text(f"ALTER TABLE {staging} ADD COLUMN {extra_columns}"))
+    return staging
+
+
+def merge_staging(conn, source: str, table: str, columns, conflict_columns, update_columns=None,
+                  update_where=None, schema: str = "dw") -> int:
+    """
+    INSERT INTO schema.table (columns) SELECT columns FROM source ON CONFLICT (conflict_columns)
+    DO NOTHING, or DO UPDATE of `update_columns` (only where `update_where` holds, if given:
+    the existing row is referenced by the table name, the incoming one as EXCLUDED).
+    `source` is a staging table or a join over staging tables. Returns rows inserted/updated.
+    """
+    columns = ", ".join(columns)
+    conflict = ", ".join(conflict_columns)
+    if update_columns:
+        # DO UPDATE may touch each target row once: keep one staged row per key
+        select = f"SELECT DISTINCT ON ({conflict}) {columns} FROM {source}"
+        action = "DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+        if update_where:
+            action += f" WHERE {update_where}"
+    else:
+        select = f"SELECT {columns} FROM {source}"
+        action = "DO NOTHING"
+    return conn.execute(text(f"""
+        INSERT INTO {schema}.{table} ({columns})
+        {select}
+        ON CONFLICT ({conflict}) {action}
+    """)).rowcount
+
+
+def bulk_merge(conn, df: pd.DataFrame, table: str, conflict_columns, update_columns=None,
+               update_where=None, schema: str = "dw") -> int:
+    """COPY `df` into staging, then merge_staging() it into schema.table; returns rows inserted/updated."""
+    if df.empty:
+        return 0
+    started = time.perf_counter()
+    staging = create_staging_table(conn, table, schema)
+    copied = copy_frame(conn, df, staging)
+    copy_seconds = time.perf_counter() - started
+
+    merged = merge_staging(conn, staging, table, df.columns, conflict_columns, update_columns, update_where, schema)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "🚚 %s.%s: copied %s rows in %.2fs, merged %s in %.2fs total → %s rows/s",
+        schema, table, copied, copy_seconds, merged, elapsed, f"{copied / elapsed:,.0f}" if elapsed else "-",
+    )
+    return merged
@@ -1,17 +1,10 @@
-import pandas as pd
-from io import BytesIO
-from src.storage.s3_helper import get_s3_client
+from src.processing.processed_dataset import read_processed_articles
 
 bucket_name = "the-guardian-data"
-parquet_key = "processed/2025-10-08/guardian_articles_20251008_030002.parquet"
+publication_date = "2025-10-08"
 
-s3 = get_s3_client()
-
-buffer = BytesIO()
-s3.download_fileobj(bucket_name, parquet_key, buffer)
-buffer.seek(0)
-
-df = pd.read_parquet(buffer)
+# Chỉ đọc partition publication_date=2025-10-08 (các ngày khác không bị mở)
+df = read_processed_articles(bucket_name, from_date=publication_date, to_date=publication_date)
 
 print("📊 Số dòng:", len(df))
 print("📋 Các cột:", df.columns.tolist())
@@ -19,4 +12,4 @@ print("\n🔎 5 dòng đầu tiên:")
 print(df.head(5))
 
 print("\n🧱 Thông tin schema:")
-print(df.info())
\ No newline at end of file
+print(df.info())
@@ -0,0 +1,93 @@
+"""
+Benchmark fetch_guardian_articles against the local stub server.
+
+    python -m src.benchmarks.bench_fetch --pages 100 --latency-ms 150 --concurrency 1 4 8
+    python -m src.benchmarks.bench_fetch --pages 100 --two-phase
+
+--two-phase compares a full refetch of an already-loaded window with the two-phase
+fetch (header pass, then bodies only for articles edited since they were loaded);
+every article counts as loaded an hour after publication.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from src.benchmarks.synthetic_corpus import SyntheticCorpus
+from src.benchmarks.guardian_stub_server import start_stub_server
+from src.ingestion import guardian_api
+from src.ingestion.ingest_job import _collect_stale_article_ids
+
+
+def bench_two_phase(server, corpus, args):
+    loaded_at = {}
+    for i in range(len(corpus)):
+        loaded_at[corpus.article(i)["id"]] = corpus.published_at(i) + timedelta(hours=1)
+    concurrency = max(args.concurrency)
+
+    def timed(name, fetch):
+        before = server.stats["requests"]
+        started = time.perf_counter()
+        articles = fetch()
+        elapsed = time.perf_counter() - started
+        print(f"📊 {name:<9} {len(articles)} bodies fetched, {server.stats['requests'] - before} requests "
+              f"in {elapsed:.2f}s")
+        return elapsed
+
+    full = timed("full", lambda: guardian_api.fetch_guardian_articles(
+        from_date="2025-10-21", to_date="2025-10-21", page_size=args.page_size,
+        max_pages=args.pages, concurrency=concurrency,
+    ))
+
+    def two_phase():
+        header_pages = -(-args.pages * args.page_size // guardian_api.HEADER_PAGE_SIZE)
+        stale_ids, _ = _collect_stale_article_ids(
+            "2025-10-21", "2025-10-21", header_pages, concurrency, None,
+            lambda ids: {i: loaded_at[i] for i in ids if i in loaded_at},
+        )
+        pages = guardian_api.iter_guardian_articles_by_ids(stale_ids, batch_size=args.page_size,
+                                                           concurrency=concurrency)
+        return [a for _, results in pages for a in results]
+
+    split = timed("two-phase", two_phase)
+    print(f"🚀 Two-phase refetch: {full / split:.1f}x faster ({corpus.edited_fraction:.0%} of articles edited)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Guardian page fetching offline")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--rate-limit", type=float, default=12.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--two-phase", action="store_true", help="benchmark the two-phase refetch instead")
+    args = parser.parse_args()
+
+    end = datetime(2025, 10, 22, tzinfo=timezone.utc)
+    corpus = SyntheticCorpus(args.pages * args.page_size, start=end - timedelta(days=1), end=end)
+    server = start_stub_server(corpus, rate_limit=args.rate_limit, latency_ms=args.latency_ms)
+    guardian_api.BASE_URL = server.base_url
+    guardian_api.API_KEY = "bench"
+    print(f"🧪 Stub at {server.base_url}: {len(corpus)} articles, {args.latency_ms:.0f} ms latency")
+
+    if args.two_phase:
+        bench_two_phase(server, corpus, args)
+        server.shutdown()
+        return
+
+    for concurrency in args.concurrency:
+        before = dict(server.stats)
+        started = time.perf_counter()
+        articles = guardian_api.fetch_guardian_articles(
+            from_date="2025-10-21", to_date="2025-10-21", page_size=args.page_size,
+            max_pages=args.pages, concurrency=concurrency,
+        )
+        elapsed = time.perf_counter() - started
+        requests_made = server.stats["requests"] - before["requests"]
+        throttled = server.stats["throttled"] - before["throttled"]
+        print(f"📊 concurrency={concurrency}: {len(articles)} articles in {elapsed:.2f}s "
+              f"({requests_made / elapsed:.1f} req/s, {throttled} throttled)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
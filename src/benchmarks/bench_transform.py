@@ -0,0 +1,176 @@
+"""
+Benchmark the Guardian transform: row-wise baseline vs the vectorized transform.
+
+    python -m src.benchmarks.bench_transform --articles 100000 --batch-size 5000
+
+Generates a synthetic raw file (gzip NDJSON, as written by ingestion), then times
+both implementations over the same batches and reports rows/sec. The baseline is
+the previous per-row pipeline (Series.apply with clean_html / extract_from_id and
+a whole-frame applymap), kept here only as a reference point.
+
+Most of the remaining transform time is HTML cleaning of the bodies (one regex pass
+per body in html_cleaning, the same work the baseline does), so the speedup is
+bounded by body size; run with --profile to see where the time goes.
+"""
+import argparse
+import cProfile
+import gzip
+import io
+import json
+import pstats
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from src.benchmarks.synthetic_corpus import SyntheticCorpus, write_raw_ndjson
+from src.processing.transform_guardian import RAW_COLUMNS, transform_articles_frame
+
+
+# Reference implementation: the per-row helpers the transform used before vectorization
+def clean_html(text: str) -> str:
+    if not isinstance(text, str):
+        return ""
+    return re.sub(r"<[^>]*>", "", text).strip()
+
+
+def extract_from_id(article_id):
+    if not isinstance(article_id, str):
+        return pd.Series({
+            "article_type": None,
+            "article_year": None,
+            "article_month": None,
+            "article_day": None,
+            "slug_keywords": [],
+            "slug_length": None,
+            "is_live_blog": None,
+            "topic_country": None
+        })
+
+    parts = article_id.split('/')
+    year_idx = next((i for i, p in enumerate(parts) if re.fullmatch(r"\d{4}", p)), None)
+    if year_idx is None:
+        # ✅ FIX: Không trả về "..." nữa, mà trả về dict rỗng an toàn
+        return pd.Series({
+            "article_type": None,
+            "article_year": None,
+            "article_month": None,
+            "article_day": None,
+            "slug_keywords": [],
+            "slug_length": None,
+            "is_live_blog": None,
+            "topic_country": None
+        })
+
+    article_type = parts[1] if year_idx > 1 else None
+    year = int(parts[year_idx])
+    month = parts[year_idx + 1] if len(parts) > year_idx + 1 else None
+    day = int(parts[year_idx + 2]) if len(parts) > year_idx + 2 and parts[year_idx + 2].isdigit() else None
+
+    slug_parts = parts[year_idx + 3:]
+    slug = "-".join(slug_parts)
+
+    slug_keywords = re.findall(r"[a-zA-Z]+", slug)
+    slug_length = len(slug_keywords)
+    is_live_blog = article_type and "live" in article_type.lower()
+    known_countries = {"uk", "us", "china", "india", "australia", "eu"}
+    topic_country = next((w for w in slug_keywords if w.lower() in known_countries), None)
+
+    return pd.Series({
+        "article_type": article_type,
+        "article_year": year,
+        "article_month": month,
+        "article_day": day,
+        "slug_keywords": slug_keywords,
+        "slug_length": slug_length,
+        "is_live_blog": bool(is_live_blog),
+        "topic_country": topic_country
+    })
+
+
+def rowwise_transform_frame(records, raw_key, ingested_at):
+    """The pre-vectorization transform, for comparison."""
+    df = pd.json_normalize(records, sep="_").reindex(columns=RAW_COLUMNS)
+    df["webPublicationDate"] = pd.to_datetime(df["webPublicationDate"], errors="coerce", utc=True)
+    df["fields_wordcount"] = pd.to_numeric(df["fields_wordcount"], errors="coerce")
+    for col in ["fields_trailText", "fields_headline", "fields_body"]:
+        df[col] = df[col].apply(clean_html)
+    df["fields_body"] = df["fields_body"].fillna("").astype(str).str.strip()
+    df["fields_byline"] = df["fields_byline"].fillna("Unknown").str.title()
+    df["sectionName"] = df["sectionName"].fillna("Unknown").str.title()
+    df["webTitle"] = df["webTitle"].fillna("").str.strip()
+    df["fields_publication"] = df["fields_publication"].fillna("The Guardian")
+    df["title_length"] = df["webTitle"].apply(lambda x: len(x.split()) if isinstance(x, str) else 0)
+    df["headline_length"] = df["fields_headline"].apply(lambda x: len(x.split()) if isinstance(x, str) else 0)
+    df["days_since_publication"] = (pd.Timestamp.now(tz=timezone.utc) - df["webPublicationDate"]).dt.days
+    df["has_thumbnail"] = df["fields_thumbnail"].notnull().astype(int)
+    df["ingested_at"] = ingested_at
+    df["source_system"] = "guardian_api"
+    df["raw_s3_key"] = raw_key
+    df["processed_by"] = "transform_guardian_v2"
+    df = df.join(df["id"].apply(extract_from_id))
+    df = df.rename(columns={"id": "article_id"})
+    apply_cells = df.map if hasattr(df, "map") else df.applymap
+    return apply_cells(lambda x: None if x is Ellipsis else x)
+
+
+def read_batches(path, batch_size):
+    batch = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def time_transform(name, fn, batches, raw_key):
+    ingested_at = datetime.now(timezone.utc)
+    rows = 0
+    started = time.perf_counter()
+    for records in batches:
+        rows += len(fn(records, raw_key, ingested_at))
+    elapsed = time.perf_counter() - started
+    print(f"📊 {name:<10} {rows} rows in {elapsed:.2f}s → {rows / elapsed:,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row-wise vs vectorized Guardian transform")
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--raw-file", help="existing gzip NDJSON raw file (default: generate one)")
+    parser.add_argument("--skip-rowwise", action="store_true")
+    parser.add_argument("--profile", action="store_true", help="print the top functions of the vectorized run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(args.raw_file) if args.raw_file else write_raw_ndjson(
+            SyntheticCorpus(args.articles), Path(tmpdir, "raw.ndjson.gz")
+        )
+        # Parse once up front so both runs time the transform only
+        batches = list(read_batches(path, args.batch_size))
+
+    raw_key = "raw/bench/articles.ndjson.gz"
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        vectorized = time_transform("vectorized", transform_articles_frame, batches, raw_key)
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("tottime").print_stats(12)
+        print(out.getvalue())
+    else:
+        vectorized = time_transform("vectorized", transform_articles_frame, batches, raw_key)
+    if not args.skip_rowwise:
+        rowwise = time_transform("row-wise", rowwise_transform_frame, batches, raw_key)
+        print(f"🚀 Speedup: {rowwise / vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
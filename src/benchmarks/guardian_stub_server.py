@@ -0,0 +1,178 @@
+"""
+Local stand-in for the Guardian /search endpoint, backed by SyntheticCorpus.
+
+    python -m src.benchmarks.guardian_stub_server --articles 100000 --port 8088 --latency-ms 80
+    GUARDIAN_BASE_URL=http://localhost:8088/search GUARDIAN_API_KEY=test python ...
+
+Reproduces the response envelope (status/total/pages/currentPage/results), pagination,
+from-date/to-date, order-by, ids, show-fields, page-size limits, per-key rate limiting
+with HTTP 429, and configurable latency, so ingestion can be benchmarked offline.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from src.benchmarks.synthetic_corpus import SyntheticCorpus
+from src.ingestion.guardian_api import TokenBucket
+
+MAX_PAGE_SIZE = 200
+
+
+class GuardianStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, corpus, rate_limit=12.0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0):
+        super().__init__(address, _SearchHandler)
+        self.corpus = corpus
+        self.rate_limit = rate_limit
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def throttle(self, api_key):
+        """Per-key token bucket allowing `rate_limit` req/s (burst of one second); returns Retry-After or 0."""
+        if not self.rate_limit:
+            return 0
+        with self._lock:
+            bucket = self._buckets.setdefault(api_key, TokenBucket(self.rate_limit, capacity=self.rate_limit))
+        return bucket.try_acquire()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def start_background(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True, name="guardian-stub")
+        thread.start()
+        return thread
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=None):
+        self._send(status, {"response": {"status": "error", "message": message}}, headers)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/search":
+            return self._error(404, "not found")
+
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        with server._lock:
+            server.stats["requests"] += 1
+
+        api_key = q.get("api-key")
+        if not api_key:
+            return self._error(401, "Unauthorized")
+        retry_after = server.throttle(api_key)
+        if retry_after:
+            with server._lock:
+                server.stats["throttled"] += 1
+            return self._send(429, {"message": "API rate limit exceeded"}, {"Retry-After": str(max(int(retry_after), 1))})
+
+        delay = server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if server.error_rate and random.random() < server.error_rate:
+            with server._lock:
+                server.stats["errors"] += 1
+            return self._error(503, "Service Unavailable")
+
+        try:
+            page = int(q.get("page", 1))
+            page_size = int(q.get("page-size", 10))
+        except ValueError:
+            return self._error(400, "page and page-size must be integers")
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            return self._error(400, f"page-size must be between 1 and {MAX_PAGE_SIZE}")
+
+        corpus = server.corpus
+        order_by = q.get("order-by", "newest")
+        if q.get("ids"):
+            indices = [corpus.index_of(i) for i in q["ids"].split(",")]
+            indices = sorted(i for i in indices if i is not None)
+        else:
+            lo, hi = corpus.index_range(q.get("from-date"), q.get("to-date"))
+            indices = range(lo, hi)
+        if order_by == "oldest":
+            indices = indices[::-1]
+
+        total = len(indices)
+        pages = max((total + page_size - 1) // page_size, 1)
+        if page < 1 or (total and page > pages):
+            return self._error(400, "requested page is beyond the number of available pages")
+
+        show_fields = [f for f in q.get("show-fields", "").split(",") if f] or None
+        start = (page - 1) * page_size
+        results = [corpus.article(i, show_fields) for i in indices[start:start + page_size]]
+        self._send(200, {"response": {
+            "status": "ok",
+            "userTier": "developer",
+            "total": total,
+            "startIndex": start + 1,
+            "pageSize": page_size,
+            "currentPage": page,
+            "pages": pages if total else 0,
+            "orderBy": order_by,
+            "results": results,
+        }})
+
+
+def start_stub_server(corpus=None, host="127.0.0.1", port=0, **kwargs):
+    """Start a stub server in a background thread (port=0 picks a free port)."""
+    server = GuardianStubServer((host, port), corpus or SyntheticCorpus(), **kwargs)
+    server.start_background()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Guardian API stand-in")
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--rate-limit", type=float, default=12.0, help="req/s per api-key (0 = unlimited)")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    end = datetime(2025, 10, 22, tzinfo=timezone.utc)
+    corpus = SyntheticCorpus(args.articles, start=end - timedelta(days=args.days), end=end, seed=args.seed)
+    server = GuardianStubServer(
+        (args.host, args.port), corpus, rate_limit=args.rate_limit,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+    )
+    print(f"🧪 Guardian stub serving {len(corpus)} articles at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"📊 {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Deterministic synthetic Guardian corpus for offline load tests.
+
+Article i (0 = newest) is generated on demand from (seed, i), so a 1M-article corpus
+costs no memory until pages are requested. Ids follow the real
+`section[/type]/yyyy/mon/dd/slug` shape and bodies are HTML paragraphs with
+lognormal word counts (median ~700 words, long reads up to ~8k). fields.lastModified
+is a few minutes after publication, except for `edited_fraction` of the articles,
+which were edited hours to days later (what the two-phase fetch must refetch).
+
+    python -m src.benchmarks.synthetic_corpus --articles 100000 --out data/synthetic/raw.ndjson.gz
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+SECTIONS = [
+    # (sectionId, sectionName, pillarId, pillarName, weight)
+    ("world", "World news", "pillar/news", "News", 14),
+    ("uk-news", "UK news", "pillar/news", "News", 10),
+    ("us-news", "US news", "pillar/news", "News", 9),
+    ("australia-news", "Australia news", "pillar/news", "News", 6),
+    ("politics", "Politics", "pillar/news", "News", 7),
+    ("business", "Business", "pillar/news", "News", 6),
+    ("technology", "Technology", "pillar/news", "News", 4),
+    ("environment", "Environment", "pillar/news", "News", 4),
+    ("science", "Science", "pillar/news", "News", 2),
+    ("society", "Society", "pillar/news", "News", 2),
+    ("commentisfree", "Opinion", "pillar/opinion", "Opinion", 8),
+    ("football", "Football", "pillar/sport", "Sport", 10),
+    ("sport", "Sport", "pillar/sport", "Sport", 6),
+    ("culture", "Culture", "pillar/arts", "Arts", 3),
+    ("film", "Film", "pillar/arts", "Arts", 3),
+    ("music", "Music", "pillar/arts", "Arts", 3),
+    ("books", "Books", "pillar/arts", "Arts", 2),
+    ("tv-and-radio", "Television & radio", "pillar/arts", "Arts", 3),
+    ("lifeandstyle", "Life and style", "pillar/lifestyle", "Lifestyle", 3),
+    ("food", "Food", "pillar/lifestyle", "Lifestyle", 2),
+    ("travel", "Travel", "pillar/lifestyle", "Lifestyle", 1),
+    ("money", "Money", "pillar/lifestyle", "Lifestyle", 1),
+]
+SECTION_WEIGHTS = [s[4] for s in SECTIONS]
+
+WORDS = (
+    "government minister election court police climate energy market bank budget health hospital school "
+    "university police city council water river storm heat fire record report study scientists research "
+    "league club season match goal manager player transfer final cup win defeat coach fans stadium "
+    "film music album tour festival book novel author series show actor director review star "
+    "war peace talks border refugees aid army ceasefire president prime leader party vote campaign "
+    "company shares profit prices inflation interest rates jobs workers strike union tax benefits "
+    "china india australia uk us eu europe london sydney washington brussels paris berlin "
+    "people family children women men community young old week year month day night morning "
+    "new big small first last major key latest early late high low long short good bad best worst "
+    "says said warns calls plans faces wins loses backs rejects launches reveals announces"
+).split()
+COUNTRY_WORDS = ["uk", "us", "china", "india", "australia", "eu"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Priya", "Chen", "Maria", "Tom", "Aisha", "Luca", "Hannah", "Kwame", "Sofia"]
+LAST_NAMES = ["Smith", "Jones", "Nguyen", "Patel", "Garcia", "Taylor", "Okafor", "Rossi", "Kim", "Walker", "Murphy"]
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+ALL_FIELDS = ["headline", "trailText", "body", "byline", "publication", "thumbnail", "wordcount", "lastModified"]
+
+
+class SyntheticCorpus:
+    """
+    n_articles spread evenly (newest first) over [start, end).
+    Same (seed, n_articles, start, end) always gives byte-identical articles.
+    """
+
+    def __init__(self, n_articles=10_000, start=None, end=None, seed=42, median_words=700, edited_fraction=0.1):
+        self.n_articles = int(n_articles)
+        self.end = end or datetime(2025, 10, 22, tzinfo=timezone.utc)
+        self.start = start or self.end - timedelta(days=30)
+        self.seed = seed
+        self.median_words = median_words
+        self.edited_fraction = edited_fraction
+        self._step = (self.end - self.start).total_seconds() / max(self.n_articles, 1)
+
+    def __len__(self):
+        return self.n_articles
+
+    def published_at(self, i):
+        return self.end - timedelta(seconds=(i + 1) * self._step)
+
+    def last_modified(self, i):
+        """Last edit of article i (own random stream: does not change the other fields)."""
+        rng = random.Random(self.seed * 2_000_003 + i)
+        if rng.random() < self.edited_fraction:
+            delay = timedelta(hours=rng.uniform(2, 72))
+        else:
+            delay = timedelta(minutes=rng.uniform(0, 15))
+        return self.published_at(i) + delay
+
+    def index_range(self, from_date=None, to_date=None):
+        """Index range [lo, hi) of articles published within the (inclusive) date window."""
+        lo, hi = 0, self.n_articles
+        if to_date:
+            to_ts = _parse_date(to_date, end_of_day=True)
+            lo = max(lo, math.ceil((self.end - to_ts).total_seconds() / self._step - 1e-9) - 1)
+        if from_date:
+            from_ts = _parse_date(from_date)
+            hi = min(hi, math.floor((self.end - from_ts).total_seconds() / self._step + 1e-9))
+        return max(lo, 0), max(min(hi, self.n_articles), max(lo, 0))
+
+    def index_of(self, article_id):
+        """Recover the article index from the numeric slug suffix (None if not ours)."""
+        tail = str(article_id).rsplit("-", 1)[-1]
+        return int(tail) if tail.isdigit() and int(tail) < self.n_articles else None
+
+    def article(self, i, show_fields=None):
+        """Build article i in the /search result shape; `fields` only when show_fields is given."""
+        rng = random.Random(self.seed * 1_000_003 + i)
+        section_id, section_name, pillar_id, pillar_name, _ = rng.choices(SECTIONS, SECTION_WEIGHTS)[0]
+        published = self.published_at(i)
+
+        is_live = section_id in ("football", "sport", "politics", "world") and rng.random() < 0.08
+        sub_type = "live" if is_live else rng.choice([None] * 8 + ["ng-interactive", "gallery"])
+        title_words = rng.choices(WORDS, k=rng.randint(6, 14))
+        if rng.random() < 0.25:
+            title_words.insert(rng.randrange(len(title_words)), rng.choice(COUNTRY_WORDS))
+        slug = "-".join(title_words[:9] + [str(i)])
+        parts = [section_id] + ([sub_type] if sub_type else []) + [
+            f"{published.year}", MONTHS[published.month - 1], f"{published.day:02d}", slug
+        ]
+        article_id = "/".join(parts)
+
+        result = {
+            "id": article_id,
+            "type": "liveblog" if is_live else "article",
+            "sectionId": section_id,
+            "sectionName": section_name,
+            "webPublicationDate": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "webTitle": " ".join(title_words).capitalize(),
+            "webUrl": f"https://www.theguardian.com/{article_id}",
+            "apiUrl": f"https://content.guardianapis.com/{article_id}",
+            "isHosted": False,
+            "pillarId": pillar_id,
+            "pillarName": pillar_name,
+        }
+        if show_fields:
+            wanted = ALL_FIELDS if "all" in show_fields else show_fields
+            # Header passes ask for lastModified only: skip generating the body
+            fields = self._fields(rng, title_words, is_live) if set(wanted) - {"lastModified"} else {}
+            fields["lastModified"] = self.last_modified(i).strftime("%Y-%m-%dT%H:%M:%SZ")
+            result["fields"] = {k: v for k, v in fields.items() if k in wanted}
+        return result
+
+    def _fields(self, rng, title_words, is_live):
+        n_words = int(min(max(rng.lognormvariate(math.log(self.median_words), 0.6), 40), 8000))
+        if is_live:
+            n_words *= 3
+        paragraphs, remaining = [], n_words
+        while remaining > 0:
+            k = min(remaining, rng.randint(25, 90))
+            words = rng.choices(WORDS, k=k)
+            if rng.random() < 0.15:
+                j = rng.randrange(k)
+                words[j] = f'<a href="https://www.theguardian.com/{rng.choice(WORDS)}">{words[j]}</a>'
+            if rng.random() < 0.1:
+                words.insert(rng.randrange(k), "&amp;")
+            paragraphs.append("<p>" + " ".join(words).capitalize() + ".</p>")
+            remaining -= k
+        authors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(rng.choice([1, 1, 1, 2, 3]))]
+        fields = {
+            "headline": " ".join(title_words).capitalize(),
+            "trailText": "<strong>" + " ".join(rng.choices(WORDS, k=rng.randint(12, 30))).capitalize() + "</strong>",
+            "body": "".join(paragraphs),
+            "publication": "The Observer" if rng.random() < 0.07 else "The Guardian",
+            "wordcount": str(n_words),
+        }
+        if rng.random() < 0.92:
+            fields["byline"] = " and ".join(authors) if len(authors) == 2 else ", ".join(authors)
+        if rng.random() < 0.9:
+            fields["thumbnail"] = f"https://media.guim.co.uk/{rng.getrandbits(64):016x}/0_0_5000_3000/500.jpg"
+        return fields
+
+    def iter_articles(self, lo=0, hi=None, show_fields=ALL_FIELDS):
+        for i in range(lo, self.n_articles if hi is None else hi):
+            yield self.article(i, show_fields)
+
+
+def _parse_date(value, end_of_day=False):
+    value = str(value)
+    if "T" in value:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    ts = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return ts + timedelta(days=1, microseconds=-1) if end_of_day else ts
+
+
+def write_raw_ndjson(corpus, path, show_fields=ALL_FIELDS):
+    """Write the corpus as a gzip NDJSON raw-zone file (same format as run_guardian_ingestion)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        for article in corpus.iter_articles(show_fields=show_fields):
+            f.write(json.dumps(article, ensure_ascii=False, separators=(",", ":")) + "\n")
+    print(f"💾 Wrote {len(corpus)} synthetic articles → {path} ({path.stat().st_size / 1024 / 1024:.1f} MB)")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Guardian raw file")
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=30, help="days covered, ending 2025-10-22")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data/synthetic/raw.ndjson.gz")
+    args = parser.parse_args()
+
+    end = datetime(2025, 10, 22, tzinfo=timezone.utc)
+    corpus = SyntheticCorpus(args.articles, start=end - timedelta(days=args.days), end=end, seed=args.seed)
+    write_raw_ndjson(corpus, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Time-sharded parallel backfill of the Guardian raw zone.
+
+    python -m src.ingestion.backfill --from-date 2025-01-01 --to-date 2025-03-31 --shard day --workers 4
+
+The range is split into day (or hour) shards so each shard stays under `max_pages`.
+A day shard with more pages is split into hour shards; an hour shard that is still
+too large fails (raise --max-pages) rather than silently dropping articles.
+Shards run in parallel threads that share the process-wide Guardian rate limiter,
+each writes one raw object under raw/backfill/<shard>/, and completed shards are
+recorded in a manifest so a rerun only fetches what is missing.
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from src.ingestion.guardian_api import WindowTooLargeError
+from src.ingestion.ingest_job import run_guardian_ingestion
+from src.storage.s3_helper import read_json_from_s3, write_json_to_s3
+
+MANIFEST_KEY = os.getenv("BACKFILL_MANIFEST_KEY", "state/guardian_backfill_manifest.json")
+BACKFILL_PREFIX = "raw/backfill"
+
+
+def build_shards(from_date: str, to_date: str, shard: str = "day"):
+    """Split [from_date, to_date] (inclusive, YYYY-MM-DD) into (shard_id, from, to) windows."""
+    start = datetime.strptime(from_date, "%Y-%m-%d")
+    end = datetime.strptime(to_date, "%Y-%m-%d") + timedelta(days=1)
+    step = timedelta(hours=1) if shard == "hour" else timedelta(days=1)
+
+    shards = []
+    current = start
+    while current < end:
+        if shard == "hour":
+            shard_id = current.strftime("%Y-%m-%dT%H")
+            window_end = current + step - timedelta(seconds=1)
+            window = (current.strftime("%Y-%m-%dT%H:%M:%SZ"), window_end.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        else:
+            shard_id = current.strftime("%Y-%m-%d")
+            window = (shard_id, shard_id)
+        shards.append((shard_id, *window))
+        current += step
+    return shards
+
+
+def load_manifest(bucket_name, key=MANIFEST_KEY):
+    try:
+        return read_json_from_s3(bucket_name, key)
+    except FileNotFoundError:
+        return {"shards": {}}
+
+
+def run_backfill(from_date, to_date, shard="day", workers=4, page_concurrency=2, page_size=50, max_pages=200,
+                 manifest_key=MANIFEST_KEY):
+    """Fetch every missing shard in parallel; returns {"completed": [...], "skipped": [...], "failed": [...]}."""
+    bucket_name = os.getenv("S3_BUCKET", "the-guardian-data")
+    manifest = load_manifest(bucket_name, manifest_key)
+    lock = threading.Lock()
+
+    shards = build_shards(from_date, to_date, shard)
+    todo = [s for s in shards if s[0] not in manifest["shards"]]
+    skipped = [s[0] for s in shards if s[0] in manifest["shards"]]
+    print(f"🧩 Backfill {from_date} → {to_date}: {len(shards)} {shard} shards, "
+          f"{len(skipped)} already done, {len(todo)} to fetch (workers={workers})")
+
+    def record(shard_id, entry):
+        with lock:
+            manifest["shards"][shard_id] = {**entry, "completed_at": datetime.utcnow().isoformat()}
+            write_json_to_s3(manifest, bucket_name, manifest_key)
+
+    def fetch_window(shard_id, shard_from, shard_to):
+        raw_key = run_guardian_ingestion(
+            from_date=shard_from,
+            to_date=shard_to,
+            page_size=page_size,
+            max_pages=max_pages,
+            concurrency=page_concurrency,
+            use_checkpoint=False,
+            prefix=f"{BACKFILL_PREFIX}/{shard_id}",
+            strict_max_pages=True,
+        )
+        record(shard_id, {"from_date": shard_from, "to_date": shard_to, "raw_key": raw_key})
+        return raw_key
+
+    def fetch_shard(shard_id, shard_from, shard_to):
+        try:
+            return fetch_window(shard_id, shard_from, shard_to)
+        except WindowTooLargeError as e:
+            if shard == "hour":
+                raise
+            print(f"✂️ Shard {shard_id}: {e} — splitting into hour shards")
+
+        # Hours already fetched by an earlier (failed) run are kept; the day counts as
+        # completed only once all of its hours are
+        hours = build_shards(shard_id, shard_id, "hour")
+        for hour_id, hour_from, hour_to in hours:
+            if hour_id not in manifest["shards"]:
+                fetch_window(hour_id, hour_from, hour_to)
+        record(shard_id, {"from_date": shard_from, "to_date": shard_to, "split_into": [h[0] for h in hours]})
+
+    completed, failed = [], []
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as pool:
+        futures = {pool.submit(fetch_shard, *s): s[0] for s in todo}
+        for future in as_completed(futures):
+            shard_id = futures[future]
+            try:
+                future.result()
+                completed.append(shard_id)
+            except Exception as e:
+                print(f"❌ Shard {shard_id} failed: {e}")
+                failed.append(shard_id)
+
+    print(f"✅ Backfill finished in {time.time() - started:.1f}s: "
+          f"{len(completed)} completed, {len(skipped)} skipped, {len(failed)} failed")
+    return {"completed": sorted(completed), "skipped": skipped, "failed": sorted(failed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-sharded parallel Guardian backfill")
+    parser.add_argument("--from-date", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--to-date", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--shard", choices=["day", "hour"], default="day")
+    parser.add_argument("--workers", type=int, default=4, help="shards fetched in parallel")
+    parser.add_argument("--page-concurrency", type=int, default=2, help="pages in flight per shard")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--max-pages", type=int, default=200)
+    parser.add_argument("--manifest-key", default=MANIFEST_KEY)
+    args = parser.parse_args()
+
+    result = run_backfill(
+        args.from_date, args.to_date, shard=args.shard, workers=args.workers,
+        page_concurrency=args.page_concurrency, page_size=args.page_size,
+        max_pages=args.max_pages, manifest_key=args.manifest_key,
+    )
+    if result["failed"]:
+        raise SystemExit(f"❌ {len(result['failed'])} shards failed — rerun to retry: {result['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+from datetime import datetime
+from src.storage.s3_helper import read_json_from_s3, write_json_to_s3
+
+CHECKPOINT_KEY = os.getenv("INGESTION_CHECKPOINT_KEY", "state/guardian_ingestion_checkpoint.json")
+
+
+def empty_checkpoint():
+    """
+    - watermark: newest article already ingested {"webPublicationDate", "id"}
+    - in_progress: window of a failed run {"from_date", "to_date", "last_page", "raw_key", "newest"}
+    """
+    return {"watermark": None, "in_progress": None, "updated_at": None}
+
+
+def load_checkpoint(bucket_name, key=CHECKPOINT_KEY):
+    try:
+        checkpoint = read_json_from_s3(bucket_name, key)
+    except FileNotFoundError:
+        return empty_checkpoint()
+    return {**empty_checkpoint(), **checkpoint}
+
+
+def save_checkpoint(checkpoint, bucket_name, key=CHECKPOINT_KEY):
+    checkpoint["updated_at"] = datetime.utcnow().isoformat()
+    write_json_to_s3(checkpoint, bucket_name, key)
+    return checkpoint
+
+
+def resume_state(checkpoint, from_date, to_date):
+    """Return the in-progress state if the last run of this exact window failed midway."""
+    state = checkpoint.get("in_progress")
+    if state and state.get("from_date") == from_date and state.get("to_date") == to_date:
+        return state
+    return None
+
+
+def watermark_applies(checkpoint, to_date):
+    """Only forward windows stop at the watermark; re-fetching an older window ignores it."""
+    watermark = checkpoint.get("watermark")
+    if not watermark or not to_date:
+        return False
+    return str(to_date)[:10] >= watermark["webPublicationDate"][:10]
+
+
+def cut_at_watermark(results, watermark):
+    """
+    Keep articles newer than the watermark (results are ordered newest first).
+    Returns (new_results, reached) where reached=True means older pages are already ingested.
+    """
+    if not watermark:
+        return results, False
+    for i, article in enumerate(results):
+        published = article.get("webPublicationDate") or ""
+        if published < watermark["webPublicationDate"] or article.get("id") == watermark["id"]:
+            return results[:i], True
+    return results, False
+
+
+def advance_watermark(checkpoint, newest):
+    """Move the watermark forward to `newest` (never backwards)."""
+    if not newest:
+        return checkpoint
+    watermark = checkpoint.get("watermark")
+    if not watermark or newest["webPublicationDate"] > watermark["webPublicationDate"]:
+        checkpoint["watermark"] = newest
+    return checkpoint
@@ -1,6 +1,13 @@
 import os
 import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,61 +15,265 @@ load_dotenv()
 API_KEY = os.getenv("GUARDIAN_API_KEY")
 BASE_URL = os.getenv("GUARDIAN_BASE_URL", "https://content.guardianapis.com/search")
 
-def fetch_guardian_articles(from_date=None, to_date=None, page_size=50, max_pages=40, order_by="newest"):
+# Guardian Open Platform: 12 requests/s (developer key)
+RATE_LIMIT_PER_SEC = float(os.getenv("GUARDIAN_RATE_LIMIT", 12))
+FETCH_CONCURRENCY = int(os.getenv("GUARDIAN_FETCH_CONCURRENCY", 4))
+MAX_RETRIES = int(os.getenv("GUARDIAN_MAX_RETRIES", 3))
+HEADER_PAGE_SIZE = int(os.getenv("GUARDIAN_HEADER_PAGE_SIZE", 200))  # metadata-only pages are tiny
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+SHOW_FIELDS = [
+    "headline",
+    "trailText",
+    "body",
+    "byline",
+    "publication",
+    "thumbnail",
+    "wordcount"
+]
+# Header passes only ask for lastModified, to tell edited articles from already-loaded ones
+HEADER_FIELDS = ["lastModified"]
+
+
+class WindowTooLargeError(Exception):
+    """The window has more pages than max_pages, so fetching it would silently skip articles."""
+
+    def __init__(self, total_pages, max_pages):
+        super().__init__(f"window has {total_pages} pages but max_pages={max_pages}")
+        self.total_pages = total_pages
+        self.max_pages = max_pages
+
+
+class TokenBucket:
     """
-    Fetch articles from The Guardian Open Platform API (with pagination).
-    - page_size: max 50 (API limit)
-    - max_pages: default 40 (~2,000 articles)
-    - from_date/to_date: optional, may be ignored by free tier
+    Thread-safe token bucket rate limiter.
+    - rate: tokens added per second
+    - capacity: max burst; 1 spaces requests evenly so no 1s window exceeds `rate`
     """
 
-    if not API_KEY:
-        raise ValueError("Missing GUARDIAN_API_KEY in environment variables.")
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take a token if one is available; return the seconds to wait otherwise (0 = acquired)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
 
-    all_results = []
-    print(f"🔎 Starting Guardian API fetch | {from_date} → {to_date}")
-
-    for page in range(1, max_pages + 1):
-        params = {
-            "api-key": API_KEY,
-            "order-by": order_by,
-            "page-size": page_size,
-            "page": page,
-            "show-fields": ",".join([
-                "headline",
-                "trailText",
-                "body",
-                "byline",
-                "publication",
-                "thumbnail",
-                "wordcount"
-            ])
-        }
-
-        if from_date:
-            params["from-date"] = from_date
-        if to_date:
-            params["to-date"] = to_date
 
+# Shared by every fetch in the process so parallel callers stay under the API limit
+_RATE_LIMITER = TokenBucket(RATE_LIMIT_PER_SEC)
+
+
+def get_rate_limiter() -> TokenBucket:
+    return _RATE_LIMITER
+
+
+@lru_cache(maxsize=None)
+def get_http_session(pool_size: int = FETCH_CONCURRENCY) -> requests.Session:
+    """Process-wide keep-alive session with a connection pool sized for concurrent fetches."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _build_params(page, page_size, order_by, from_date=None, to_date=None, show_fields=SHOW_FIELDS):
+    params = {
+        "api-key": API_KEY,
+        "order-by": order_by,
+        "page-size": page_size,
+        "page": page,
+    }
+    # Without show-fields the API returns only headers (id, date, section, title, url)
+    if show_fields:
+        params["show-fields"] = ",".join(show_fields)
+    if from_date:
+        params["from-date"] = from_date
+    if to_date:
+        params["to-date"] = to_date
+    return params
+
+
+def _get_page(session, params, limiter, max_retries=MAX_RETRIES):
+    """GET one search page, retrying transient failures with exponential backoff."""
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
         try:
-            response = requests.get(BASE_URL, params=params, timeout=30)
+            response = session.get(BASE_URL, params=params, timeout=30)
+            if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 0.5 * 2 ** attempt
+                print(f"⏳ Page {params['page']}: HTTP {response.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay + random.uniform(0, 0.1))
+                continue
             response.raise_for_status()
-            data = response.json()
+            return response.json()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= max_retries:
+                raise
+            delay = 0.5 * 2 ** attempt
+            print(f"⏳ Page {params['page']}: {e.__class__.__name__}, retrying in {delay:.1f}s")
+            time.sleep(delay + random.uniform(0, 0.1))
+
+
+def _iter_pages(from_date, to_date, page_size, max_pages, order_by, concurrency, start_page=1,
+                show_fields=SHOW_FIELDS, strict_max_pages=False):
+    """
+    Yield (page, results) in page order.
+    `start_page` is fetched first to learn the `pages` total; the remaining pages are kept
+    `concurrency` in flight over one pooled session. Errors propagate to the caller.
+    strict_max_pages: raise WindowTooLargeError (before yielding anything) instead of
+    warning when the window has more than max_pages pages.
+    """
+    session = get_http_session(max(concurrency, 1))
+    limiter = get_rate_limiter()
+
+    def fetch(page):
+        params = _build_params(page, page_size, order_by, from_date, to_date, show_fields)
+        return _get_page(session, params, limiter).get("response", {})
+
+    first = fetch(start_page)
+    total_pages = int(first.get("pages") or 1)
+    if total_pages > max_pages:
+        if strict_max_pages:
+            raise WindowTooLargeError(total_pages, max_pages)
+        print(f"⚠️ Window has {total_pages} pages but max_pages={max_pages}: "
+              f"{(total_pages - max_pages) * page_size} articles will be skipped (use smaller shards).")
+    yield start_page, first.get("results", [])
+
+    last_page = min(total_pages, max_pages)
+    if last_page <= start_page:
+        return
 
-            results = data.get("response", {}).get("results", [])
+    if concurrency <= 1:
+        for page in range(start_page + 1, last_page + 1):
+            yield page, fetch(page).get("results", [])
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="guardian-fetch") as pool:
+        pending = deque()
+        next_page = start_page + 1
+        try:
+            while pending or next_page <= last_page:
+                while next_page <= last_page and len(pending) < concurrency:
+                    pending.append((next_page, pool.submit(fetch, next_page)))
+                    next_page += 1
+                page, future = pending.popleft()
+                yield page, future.result().get("results", [])
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def iter_guardian_pages(from_date=None, to_date=None, page_size=50, max_pages=40, order_by="newest",
+                        concurrency=None, start_page=1, raise_on_error=False, headers_only=False,
+                        strict_max_pages=False):
+    """
+    Generator version of fetch_guardian_articles: yields (page, results) one page at a time,
+    so callers can stream pages out without holding the whole window in memory.
+    - start_page: resume a window from this page
+    - raise_on_error: re-raise the RequestException instead of stopping quietly,
+      so callers can tell a failed window from a complete one
+    - headers_only: only show lastModified (no bodies) for a cheap metadata pass
+    - strict_max_pages: raise WindowTooLargeError when the window has more than max_pages pages
+    """
+
+    if not API_KEY:
+        raise ValueError("Missing GUARDIAN_API_KEY in environment variables.")
+
+    concurrency = FETCH_CONCURRENCY if concurrency is None else concurrency
+    total = 0
+    print(f"🔎 Starting Guardian API fetch | {from_date} → {to_date} (concurrency={concurrency})")
+
+    show_fields = HEADER_FIELDS if headers_only else SHOW_FIELDS
+    pages = _iter_pages(from_date, to_date, page_size, max_pages, order_by, concurrency, start_page, show_fields,
+                        strict_max_pages)
+    page = start_page - 1
+    try:
+        for page, results in pages:
             if not results:
                 print(f"⚠️ No more results at page {page}. Stopping early.")
                 break
 
-            all_results.extend(results)
-            print(f"📄 Page {page}: {len(results)} articles fetched (total={len(all_results)})")
+            total += len(results)
+            print(f"📄 Page {page}: {len(results)} articles fetched (total={total})")
+            yield page, results
+
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error fetching page {page + 1}: {e}")
+        if raise_on_error:
+            raise
+    finally:
+        pages.close()
 
-            # Respect Guardian rate limits (12 requests/s)
-            time.sleep(0.1)
+    print(f"✅ Finished fetching {total} articles total.")
 
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching page {page}: {e}")
-            break
 
-    print(f"✅ Finished fetching {len(all_results)} articles total.")
-    return all_results
\ No newline at end of file
+def iter_guardian_articles_by_ids(article_ids, batch_size=50, concurrency=None):
+    """
+    Fetch full articles (with bodies) for known ids, `batch_size` ids per request
+    through the search `ids` filter. Yields (batch, results) in input order.
+    """
+
+    if not API_KEY:
+        raise ValueError("Missing GUARDIAN_API_KEY in environment variables.")
+
+    concurrency = FETCH_CONCURRENCY if concurrency is None else concurrency
+    article_ids = list(article_ids)
+    batches = [article_ids[i:i + batch_size] for i in range(0, len(article_ids), batch_size)]
+    session = get_http_session(max(concurrency, 1))
+    limiter = get_rate_limiter()
+
+    def fetch(batch):
+        params = _build_params(1, len(batch), "newest")
+        params["ids"] = ",".join(batch)
+        return _get_page(session, params, limiter).get("response", {}).get("results", [])
+
+    print(f"📰 Fetching bodies for {len(article_ids)} articles in {len(batches)} requests")
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="guardian-bodies") as pool:
+        pending = deque()
+        next_batch = 0
+        try:
+            while pending or next_batch < len(batches):
+                while next_batch < len(batches) and len(pending) < max(concurrency, 1):
+                    pending.append((next_batch + 1, pool.submit(fetch, batches[next_batch])))
+                    next_batch += 1
+                batch_no, future = pending.popleft()
+                yield batch_no, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def fetch_guardian_articles(from_date=None, to_date=None, page_size=50, max_pages=40, order_by="newest",
+                            concurrency=None):
+    """
+    Fetch articles from The Guardian Open Platform API (with pagination).
+    - page_size: max 50 (API limit)
+    - max_pages: default 40 (~2,000 articles), capped by the `pages` total of the first response
+    - from_date/to_date: optional, may be ignored by free tier
+    - concurrency: pages kept in flight (default GUARDIAN_FETCH_CONCURRENCY, 1 = sequential);
+      all requests share one token bucket set to GUARDIAN_RATE_LIMIT req/s
+    """
+    all_results = []
+    for _, results in iter_guardian_pages(from_date, to_date, page_size, max_pages, order_by, concurrency):
+        all_results.extend(results)
+    return all_results
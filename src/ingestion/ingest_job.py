@@ -1,39 +1,193 @@
 import os
-from datetime import datetime, timedelta
-from src.ingestion.guardian_api import fetch_guardian_articles
-from src.storage.s3_helper import upload_json_to_s3
+import requests
+from datetime import datetime, timedelta, timezone
+from src.ingestion.guardian_api import iter_guardian_pages, iter_guardian_articles_by_ids, HEADER_PAGE_SIZE
+from src.ingestion.checkpoint import (
+    load_checkpoint, save_checkpoint, resume_state,
+    watermark_applies, cut_at_watermark, advance_watermark
+)
+from src.storage.s3_helper import NDJSONGzipS3Writer, delete_s3_object
 
-def run_guardian_ingestion(from_date=None, to_date=None, page_size=50, max_pages=200):
+
+def _parse_api_time(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _is_stale(last_modified, loaded_at):
+    """An article needs (re)fetching unless its loaded version was ingested after its last edit."""
+    if loaded_at is None:
+        return True
+    if last_modified is None:
+        return True  # unknown edit time: refetch rather than keep a possibly stale version
+    if loaded_at.tzinfo is None:
+        loaded_at = loaded_at.replace(tzinfo=timezone.utc)
+    return last_modified > loaded_at
+
+
+def _collect_stale_article_ids(from_date, to_date, max_pages, concurrency, watermark, loaded_versions_fn):
+    """
+    Phase 1 of a two-phase fetch: page through headers only and keep the ids that are
+    not loaded yet or were edited (fields.lastModified) after their loaded version was ingested.
+    """
+    ids, last_modified, newest = [], {}, None
+    pages = iter_guardian_pages(
+        from_date=from_date,
+        to_date=to_date,
+        page_size=HEADER_PAGE_SIZE,
+        max_pages=max_pages,
+        concurrency=concurrency,
+        raise_on_error=True,
+        headers_only=True
+    )
+    for page, results in pages:
+        if newest is None and results:
+            newest = {"webPublicationDate": results[0].get("webPublicationDate"), "id": results[0].get("id")}
+        results, reached = cut_at_watermark(results, watermark)
+        for r in results:
+            if r.get("id"):
+                ids.append(r["id"])
+                last_modified[r["id"]] = _parse_api_time((r.get("fields") or {}).get("lastModified"))
+        if reached:
+            break
+    pages.close()
+
+    ids = list(dict.fromkeys(ids))
+    loaded = loaded_versions_fn(ids) if loaded_versions_fn and ids else {}
+    stale_ids = [i for i in ids if _is_stale(last_modified.get(i), loaded.get(i))]
+    edited = sum(1 for i in stale_ids if i in loaded)
+    print(f"🧾 Headers: {len(ids)} articles, {len(loaded)} already loaded, "
+          f"{len(stale_ids) - edited} new, {edited} edited since loaded")
+    return stale_ids, newest
+
+
+def run_guardian_ingestion(from_date=None, to_date=None, page_size=50, max_pages=200, concurrency=None,
+                           use_checkpoint=True, prefix=None, two_phase=False, loaded_versions_fn=None,
+                           strict_max_pages=False):
     """
-    Fetch Guardian articles and upload as JSON to S3 (bronze/raw zone).
+    Fetch Guardian articles and stream them to S3 as gzip NDJSON (bronze/raw zone).
+    Pages are uploaded as they arrive, so peak memory is about one page.
+
+    With use_checkpoint (default), progress is persisted in the ingestion checkpoint:
+    - paging stops once it reaches the watermark (newest article already ingested)
+    - if a page fails, the pages fetched so far are kept and the next run of the same
+      window resumes from the last good page instead of starting over
+    prefix overrides the default raw/<today>/<timestamp> location (used by backfills).
+    strict_max_pages: fail with WindowTooLargeError (nothing is uploaded) when the window
+    has more than max_pages pages, instead of fetching only the first max_pages.
+
+    two_phase: page through headers only (id, date, section, title, lastModified), drop ids
+    whose loaded version is current (loaded_versions_fn(ids) -> {id: ingested_at}, not older
+    than lastModified), then fetch bodies just for new and edited ids.
+    The body pass is not page-resumable; a failed two-phase run starts over (the header pass is cheap).
     """
     bucket_name = os.getenv("S3_BUCKET", "the-guardian-data")
     today_str = datetime.utcnow().strftime("%Y-%m-%d")
     timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
-    prefix = f"raw/{today_str}/{timestamp}"
+    prefix = prefix or f"raw/{today_str}/{timestamp}"
 
     # 🗓️ Nếu không truyền, mặc định lấy 1 ngày gần nhất
     if from_date is None or to_date is None:
         to_date = datetime.utcnow().strftime("%Y-%m-%d")
         from_date = (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
 
+    checkpoint = load_checkpoint(bucket_name) if use_checkpoint else None
+    state = resume_state(checkpoint, from_date, to_date) if checkpoint and not two_phase else None
+    watermark = checkpoint["watermark"] if checkpoint and watermark_applies(checkpoint, to_date) else None
+    start_page = state["last_page"] + 1 if state else 1
+    newest = state.get("newest") if state else None
+
     print(f"🚀 Fetching Guardian articles from {from_date} → {to_date}")
+    if state:
+        print(f"↩️ Resuming window from page {start_page} (partial data: {state.get('raw_key')})")
+    if watermark:
+        print(f"🔖 Watermark: {watermark['webPublicationDate']} ({watermark['id']})")
 
     # 🔹 Fetch paginated data
-    data = fetch_guardian_articles(
-        from_date=from_date,
-        to_date=to_date,
-        page_size=page_size,
-        max_pages=max_pages
-    )
+    if two_phase:
+        header_pages = -(-max_pages * page_size // HEADER_PAGE_SIZE)
+        stale_ids, newest = _collect_stale_article_ids(
+            from_date, to_date, header_pages, concurrency, watermark, loaded_versions_fn
+        )
+        pages = iter_guardian_articles_by_ids(stale_ids, batch_size=page_size, concurrency=concurrency)
+        watermark = None  # already applied to the header pass
+    else:
+        pages = iter_guardian_pages(
+            from_date=from_date,
+            to_date=to_date,
+            page_size=page_size,
+            max_pages=max_pages,
+            concurrency=concurrency,
+            start_page=start_page,
+            raise_on_error=True,
+            strict_max_pages=strict_max_pages
+        )
 
-    if not data:
-        print("⚠️ No articles fetched — skipping upload.")
-        return None
+    # 🔹 Stream NDJSON to S3 page by page
+    s3_key = f"{prefix}/articles_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+    print(f"💾 Streaming raw data to s3://{bucket_name}/{s3_key}")
+    writer = NDJSONGzipS3Writer(bucket_name, s3_key)
+    previous_key = state.get("raw_key") if state else None
+    last_page = start_page - 1
+    try:
+        if previous_key:
+            writer.copy_from(bucket_name, previous_key)
+
+        for page, results in pages:
+            if newest is None and results:
+                newest = {"webPublicationDate": results[0].get("webPublicationDate"), "id": results[0].get("id")}
+            results, reached = cut_at_watermark(results, watermark)
+            writer.write_records(results)
+            last_page = page
+            if reached:
+                print(f"🔖 Reached already-ingested articles at page {page}. Stopping.")
+                break
+        pages.close()
+
+    except requests.exceptions.RequestException as e:
+        if not checkpoint or two_phase:
+            writer.abort()
+            raise
+        # Keep what we have and remember where to resume
+        has_data = writer.records_written > 0 or previous_key
+        if has_data:
+            writer.close()
+            if previous_key:
+                delete_s3_object(bucket_name, previous_key)
+        else:
+            writer.abort()
+        checkpoint["in_progress"] = {
+            "from_date": from_date,
+            "to_date": to_date,
+            "last_page": last_page,
+            "raw_key": s3_key if has_data else None,
+            "newest": newest,
+        }
+        save_checkpoint(checkpoint, bucket_name)
+        raise RuntimeError(
+            f"❌ Guardian fetch failed after page {last_page}; checkpoint saved, rerun resumes from page {last_page + 1}"
+        ) from e
+    except BaseException:
+        writer.abort()
+        raise
 
-    # 🔹 Upload JSON to S3
-    print(f"💾 Uploading raw data to s3://{bucket_name}/{prefix}/")
-    s3_key = upload_json_to_s3(data, bucket_name=bucket_name, prefix=prefix)
+    if writer.records_written == 0 and not previous_key:
+        writer.abort()
+        s3_key = None
+    else:
+        writer.close()
+        if previous_key:
+            delete_s3_object(bucket_name, previous_key)
+
+    if checkpoint:
+        checkpoint["in_progress"] = None
+        save_checkpoint(advance_watermark(checkpoint, newest), bucket_name)
+
+    if not s3_key:
+        print("⚠️ No new articles fetched — skipping upload.")
+        return None
 
     print(f"✅ Ingestion complete! File stored at: s3://{bucket_name}/{s3_key}")
-    return s3_key
\ No newline at end of file
+    return s3_key
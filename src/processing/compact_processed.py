@@ -0,0 +1,206 @@
+"""
+Compaction of the processed dataset.
+
+    python -m src.processing.compact_processed --from-date 2025-10-01 --to-date 2025-10-31 --target-mb 128
+
+Every transform run adds small files to each publication_date/section partition.
+Compaction merges them month by month into target-sized files under
+<prefix>/_compacted/publication_month=YYYY-MM/, keeping only the latest version
+(ingested_at) of articles reprocessed by several runs. Rows are sorted by publication date
+(then section) so row-group statistics stay selective, and the files use zstd plus
+dictionary encoding for the low-cardinality columns.
+
+The compacted files are invisible until the manifest (<prefix>/_manifest.json) lists
+them together with the files they replace, so readers switch sets atomically.
+Replaced files are kept for one cycle: --delete-replaced removes the ones superseded
+by an earlier compaction, which no in-flight reader can still be using.
+"""
+import argparse
+import math
+import os
+import tempfile
+from datetime import datetime
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.processing.processed_dataset import (
+    COMPACTED_DIR, PROCESSED_PREFIX, is_compacted_key, latest_versions, live_keys, load_manifest, manifest_key,
+    processed_dataset,
+)
+from src.storage.object_store import get_object_store
+from src.storage.s3_helper import write_json_to_s3
+
+COMPACTION_TARGET_FILE_MB = int(os.getenv("COMPACTION_TARGET_FILE_MB", 128))
+COMPACTION_ROW_GROUP_SIZE = int(os.getenv("COMPACTION_ROW_GROUP_SIZE", 100_000))
+COMPACTION_ZSTD_LEVEL = int(os.getenv("COMPACTION_ZSTD_LEVEL", 6))
+
+# Repeated strings: one dictionary page per column chunk instead of a copy per row
+DICTIONARY_COLUMNS = [
+    "publication_date", "section", "type", "sectionName", "pillarName", "fields_byline",
+    "fields_publication", "source_system", "processed_by", "raw_s3_key",
+    "article_type", "article_month", "topic_country", "slug_keywords.list.element",
+]
+SORT_KEYS = [("publication_date", "ascending"), ("section", "ascending"), ("webPublicationDate", "ascending")]
+
+
+def _month_of(key):
+    """publication_month of a partition file key (from its publication_date=... segment)."""
+    for part in key.split("/"):
+        if part.startswith("publication_date="):
+            return part.split("=", 1)[1][:7]
+    return "unknown"
+
+
+def plan_compaction(bucket_name, from_date=None, to_date=None, target_mb=COMPACTION_TARGET_FILE_MB,
+                    prefix=PROCESSED_PREFIX, manifest=None):
+    """
+    ({month: [keys]}, {key: bytes}) to merge: every live partition file in range, plus
+    compacted files smaller than half the target. Months with a single candidate are left alone.
+    """
+    store = get_object_store()
+    manifest = manifest or load_manifest(bucket_name, prefix)
+    small = {f["key"]: f for f in manifest["files"] if f["bytes"] < target_mb * 1024 * 1024 / 2}
+
+    plan = {}
+    for key in live_keys(bucket_name, from_date, to_date, prefix=prefix, manifest=manifest):
+        if is_compacted_key(key):
+            if key not in small:
+                continue
+            month = small[key]["month"]
+        else:
+            month = _month_of(key)
+        plan.setdefault(month, []).append(key)
+    plan = {m: keys for m, keys in sorted(plan.items()) if len(keys) > 1}
+    sizes = {k: store.size(bucket_name, k) for keys in plan.values() for k in keys}
+    return plan, sizes
+
+
+def _write_parquet(table, path, row_group_size):
+    dictionary_columns = [c for c in DICTIONARY_COLUMNS if c.split(".")[0] in table.column_names]
+    pq.write_table(
+        table, path,
+        compression="zstd", compression_level=COMPACTION_ZSTD_LEVEL,
+        use_dictionary=dictionary_columns, row_group_size=row_group_size, write_statistics=True,
+    )
+    return os.path.getsize(path)
+
+
+def _upload_compacted(table, path, size, bucket_name, key):
+    with open(path, "rb") as f:
+        get_object_store().upload_fileobj(f, bucket_name, key)
+    dates = pc.min_max(table["publication_date"])
+    return {
+        "key": key,
+        "rows": table.num_rows,
+        "bytes": size,
+        "min_date": dates["min"].as_py(),
+        "max_date": dates["max"].as_py(),
+    }
+
+
+def compact_month(table, bucket_name, month, version, target_mb, row_group_size, prefix=PROCESSED_PREFIX):
+    """
+    Write one month as compacted files. The month is first encoded as a single file;
+    only if that exceeds the target is it re-encoded as evenly sized slices (the
+    zstd output size is measured rather than guessed from the snappy inputs).
+    """
+    table = table.sort_by(SORT_KEYS)
+    target_bytes = target_mb * 1024 * 1024
+
+    def key_for(i):
+        return f"{prefix}/{COMPACTED_DIR}/publication_month={month}/part-v{version:05d}-{i:03d}.parquet"
+
+    entries = []
+    with tempfile.TemporaryDirectory(prefix="compact_") as tmpdir:
+        path = os.path.join(tmpdir, "month.parquet")
+        size = _write_parquet(table, path, row_group_size)
+        n_files = max(math.ceil(size / target_bytes), 1)
+        if n_files == 1:
+            return [_upload_compacted(table, path, size, bucket_name, key_for(0))]
+
+        rows_per_file = math.ceil(table.num_rows / n_files)
+        for i in range(n_files):
+            chunk = table.slice(i * rows_per_file, rows_per_file)
+            if chunk.num_rows == 0:
+                continue
+            path = os.path.join(tmpdir, f"part-{i:03d}.parquet")
+            size = _write_parquet(chunk, path, row_group_size)
+            entries.append(_upload_compacted(chunk, path, size, bucket_name, key_for(i)))
+    return entries
+
+
+def compact_processed(bucket_name, from_date=None, to_date=None, target_mb=COMPACTION_TARGET_FILE_MB,
+                      row_group_size=COMPACTION_ROW_GROUP_SIZE, delete_replaced=False, dry_run=False,
+                      prefix=PROCESSED_PREFIX):
+    """Merge small processed files month by month; returns {"version", "compacted", "replaced", "deleted"}."""
+    store = get_object_store()
+    manifest = load_manifest(bucket_name, prefix)
+    version = manifest["version"] + 1
+    plan, sizes = plan_compaction(bucket_name, from_date, to_date, target_mb, prefix, manifest)
+
+    total_files = sum(len(keys) for keys in plan.values())
+    print(f"🗜️ Compaction v{version}: {total_files} files in {len(plan)} months "
+          f"({sum(sizes.values()) / 1024 / 1024:.1f} MB) → target {target_mb} MB/file")
+    if dry_run:
+        for month, keys in plan.items():
+            print(f"   {month}: {len(keys)} files")
+        return {"version": manifest["version"], "compacted": [], "replaced": [], "deleted": []}
+
+    new_files, replaced = [], []
+    for month, keys in plan.items():
+        table = processed_dataset(bucket_name, keys=keys, prefix=prefix).to_table()
+        versions = table.num_rows
+        table = latest_versions(table)
+        if table.num_rows < versions:
+            print(f"   {month}: dropped {versions - table.num_rows} superseded article versions")
+        entries = compact_month(table, bucket_name, month, version, target_mb, row_group_size, prefix)
+        new_files += [{**e, "month": month, "version": version} for e in entries]
+        replaced += keys
+        print(f"✅ {month}: {len(keys)} files ({sum(sizes[k] for k in keys) / 1024 / 1024:.1f} MB) → "
+              f"{len(entries)} file(s) ({sum(e['bytes'] for e in entries) / 1024 / 1024:.1f} MB)")
+
+    deleted = []
+    if new_files:
+        replaced_set = set(replaced)
+        manifest["files"] = [f for f in manifest["files"] if f["key"] not in replaced_set] + new_files
+        manifest["replaced"] += [{"key": k, "version": version} for k in replaced]
+        manifest["version"] = version
+        manifest["updated_at"] = datetime.utcnow().isoformat()
+        # Single put: readers see either the old or the new set, never a mix
+        write_json_to_s3(manifest, bucket_name, manifest_key(prefix))
+
+    if delete_replaced:
+        stale = [r for r in manifest["replaced"] if r["version"] < manifest["version"]]
+        for r in stale:
+            store.delete(bucket_name, r["key"])
+            deleted.append(r["key"])
+        if stale:
+            manifest["replaced"] = [r for r in manifest["replaced"] if r["version"] >= manifest["version"]]
+            write_json_to_s3(manifest, bucket_name, manifest_key(prefix))
+        print(f"🧹 Deleted {len(deleted)} files replaced by earlier compactions")
+
+    return {"version": manifest["version"], "compacted": [f["key"] for f in new_files],
+            "replaced": replaced, "deleted": deleted}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact small processed Parquet files")
+    parser.add_argument("--bucket", default=os.getenv("S3_BUCKET", "the-guardian-data"))
+    parser.add_argument("--from-date", help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--to-date", help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--target-mb", type=int, default=COMPACTION_TARGET_FILE_MB)
+    parser.add_argument("--row-group-size", type=int, default=COMPACTION_ROW_GROUP_SIZE)
+    parser.add_argument("--delete-replaced", action="store_true",
+                        help="delete files replaced by earlier compactions")
+    parser.add_argument("--dry-run", action="store_true", help="only print the plan")
+    args = parser.parse_args()
+
+    compact_processed(
+        args.bucket, args.from_date, args.to_date, target_mb=args.target_mb,
+        row_group_size=args.row_group_size, delete_replaced=args.delete_replaced, dry_run=args.dry_run,
+    )
+
+
+if __name__ == "__main__":
+    main()
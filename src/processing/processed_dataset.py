@@ -0,0 +1,412 @@
+"""
+Processed zone as a Hive-partitioned Parquet dataset:
+
+    processed/guardian_articles/publication_date=2025-10-21/section=world/part-<id>.parquet
+
+- publication_date: UTC day of webPublicationDate
+- section: Guardian section id (first segment of article_id)
+
+Partition values live in the path only; readers get them back as string columns.
+Row groups are sized by PROCESSED_ROW_GROUP_SIZE and carry min/max statistics, so
+read_processed_articles() skips whole partitions (date/section) and row groups
+(webPublicationDate range) without opening them.
+
+Small partition files are periodically merged by compact_processed into
+<prefix>/_compacted/...; <prefix>/_manifest.json says which files are live.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.processing.processed_schema import PROCESSED_SCHEMA, frame_to_table, to_pandas
+from src.storage.object_store import get_object_store
+from src.storage.s3_helper import read_json_from_s3
+
+PROCESSED_PREFIX = os.getenv("PROCESSED_DATASET_PREFIX", "processed/guardian_articles")
+PROCESSED_ROW_GROUP_SIZE = int(os.getenv("PROCESSED_ROW_GROUP_SIZE", 50_000))
+# Rows buffered across all partitions of a writer before the largest ones are flushed early
+PROCESSED_MAX_PENDING_ROWS = int(os.getenv("PROCESSED_MAX_PENDING_ROWS", 200_000))
+UNKNOWN_PARTITION = "unknown"
+COMPACTED_DIR = "_compacted"
+
+PARTITION_COLUMNS = ["publication_date", "section"]
+PARTITIONING = ds.partitioning(pa.schema([(c, pa.string()) for c in PARTITION_COLUMNS]), flavor="hive")
+# Identify one version of an article: a reprocessed article is stored once per transform run
+VERSION_COLUMNS = ["article_id", "ingested_at"]
+# What readers see: the data columns plus the partition values
+DATASET_SCHEMA = pa.schema(list(PROCESSED_SCHEMA) + list(PARTITIONING.schema))
+
+
+def _section_value(article_id):
+    if not isinstance(article_id, str) or "/" not in article_id:
+        return UNKNOWN_PARTITION
+    value = re.sub(r"[^a-z0-9-]+", "-", article_id.split("/", 1)[0].lower()).strip("-")
+    return value or UNKNOWN_PARTITION
+
+
+def partition_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """(publication_date, section) partition values for every row of a transformed frame."""
+    published = pd.to_datetime(df["webPublicationDate"], errors="coerce", utc=True)
+    return pd.DataFrame({
+        "publication_date": published.dt.strftime("%Y-%m-%d").fillna(UNKNOWN_PARTITION),
+        "section": df["article_id"].map(_section_value),
+    }, index=df.index)
+
+
+def partition_key(publication_date, section, file_name, prefix=PROCESSED_PREFIX):
+    return f"{prefix}/publication_date={publication_date}/section={section}/{file_name}"
+
+
+def part_file_name(source_key, run_id):
+    """
+    File name of one transform run of a raw object. Every run writes new keys: a rerun
+    never overwrites parts of an earlier run, in particular not a key a compaction has
+    already replaced (which readers would then ignore, or --delete-replaced remove).
+    Articles reprocessed by a later run exist in several files; see latest_versions().
+    """
+    return f"part-{hashlib.sha1(f'{source_key}#{run_id}'.encode('utf-8')).hexdigest()[:16]}.parquet"
+
+
+def latest_versions(table: pa.Table) -> pa.Table:
+    """One row per article_id: the one with the latest ingested_at (row order is kept)."""
+    if table.num_rows == 0:
+        return table
+    versions = table.select(VERSION_COLUMNS).to_pandas()
+    keyed = versions["article_id"].notna()
+    latest = versions[keyed].sort_values("ingested_at", kind="stable", na_position="first").drop_duplicates(
+        subset=["article_id"], keep="last"
+    ).index.union(versions.index[~keyed])
+    if len(latest) == table.num_rows:
+        return table
+    return table.take(latest.to_numpy())
+
+
+class PartitionedParquetWriter:
+    """
+    Split transformed frames into partitions and write one Parquet file per partition.
+    Each partition buffers its rows until it has a full row group (row_group_size) to
+    write. All partitions together hold at most max_pending_rows rows: past that, the
+    largest buffers are flushed early (as smaller row groups) to bound memory.
+    Files are staged locally and uploaded on close(); abort() discards them.
+    Every frame is conformed to `schema` (PROCESSED_SCHEMA by default) before writing.
+    """
+
+    def __init__(self, bucket_name, file_name, schema=PROCESSED_SCHEMA, prefix=PROCESSED_PREFIX,
+                 row_group_size=PROCESSED_ROW_GROUP_SIZE, max_pending_rows=PROCESSED_MAX_PENDING_ROWS,
+                 store=None, **parquet_options):
+        self.bucket_name = bucket_name
+        self.file_name = file_name
+        self.schema = schema
+        self.prefix = prefix
+        self.row_group_size = row_group_size
+        self.max_pending_rows = max(max_pending_rows, row_group_size)
+        self.parquet_options = {"write_statistics": True, **parquet_options}
+        self.rows_written = 0
+        self._store = store or get_object_store()
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="processed_")
+        self._writers = {}
+        self._pending = {}       # partition -> [tables]
+        self._partition_rows = {}  # partition -> pending rows
+        self._pending_rows = 0
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        table = frame_to_table(df, self.schema)
+        parts = partition_columns(df)
+        for partition, positions in parts.groupby(["publication_date", "section"]).indices.items():
+            part = table.take(positions)
+            self._pending.setdefault(partition, []).append(part)
+            self._partition_rows[partition] = self._partition_rows.get(partition, 0) + part.num_rows
+            self._pending_rows += part.num_rows
+            if self._partition_rows[partition] >= self.row_group_size:
+                self._flush_partition(partition, whole_row_groups=True)
+
+        # Memory cap: flush the largest buffers until half of the cap is free
+        if self._pending_rows >= self.max_pending_rows:
+            for partition in sorted(self._partition_rows, key=self._partition_rows.get, reverse=True):
+                if self._pending_rows <= self.max_pending_rows // 2:
+                    break
+                self._flush_partition(partition)
+
+    def _flush_partition(self, partition, whole_row_groups=False):
+        """Write the partition's buffer; with whole_row_groups, keep the remainder buffered."""
+        writer = self._writers.get(partition)
+        if writer is None:
+            path = Path(self._tmpdir.name, *partition, self.file_name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(str(path), self.schema, **self.parquet_options)
+            self._writers[partition] = writer
+        table = pa.concat_tables(self._pending.pop(partition))
+        self._partition_rows.pop(partition)
+        if whole_row_groups:
+            rows = table.num_rows - table.num_rows % self.row_group_size
+            if rows < table.num_rows:
+                self._pending[partition] = [table.slice(rows)]
+                self._partition_rows[partition] = table.num_rows - rows
+            table = table.slice(0, rows)
+        writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows_written += table.num_rows
+        self._pending_rows -= table.num_rows
+
+    def _flush(self):
+        for partition in list(self._pending):
+            self._flush_partition(partition)
+
+    def close(self):
+        """Flush, upload every partition file and return the written keys (sorted)."""
+        self._flush()
+        keys = []
+        try:
+            for (publication_date, section), writer in sorted(self._writers.items()):
+                writer.close()
+                key = partition_key(publication_date, section, self.file_name, self.prefix)
+                with open(Path(self._tmpdir.name, publication_date, section, self.file_name), "rb") as f:
+                    self._store.upload_fileobj(f, self.bucket_name, key)
+                keys.append(key)
+        finally:
+            self._tmpdir.cleanup()
+        return keys
+
+    def abort(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._tmpdir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        return False
+
+
+def _date_str(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _and(expr, other):
+    return other if expr is None else expr & other
+
+
+def partition_filter(from_date=None, to_date=None, sections=None):
+    """Expression on the partition columns only (prunes files without opening them)."""
+    expr = None
+    if from_date:
+        expr = _and(expr, ds.field("publication_date") >= _date_str(from_date))
+    if to_date:
+        expr = _and(expr, ds.field("publication_date") <= _date_str(to_date))
+    if sections:
+        expr = _and(expr, ds.field("section").isin([_section_value(f"{s}/") for s in sections]))
+    return expr
+
+
+def build_filter(from_date=None, to_date=None, sections=None):
+    """
+    Partition filter plus a webPublicationDate bound that prunes row groups through
+    their min/max statistics. Dates are inclusive days.
+    """
+    expr = partition_filter(from_date, to_date, sections)
+    if from_date:
+        start = pd.Timestamp(_date_str(from_date), tz="UTC")
+        expr = _and(expr, ds.field("webPublicationDate") >= pa.scalar(start, pa.timestamp("ns", "UTC")))
+    if to_date:
+        end = pd.Timestamp(_date_str(to_date), tz="UTC") + pd.Timedelta(days=1)
+        expr = _and(expr, ds.field("webPublicationDate") < pa.scalar(end, pa.timestamp("ns", "UTC")))
+    return expr
+
+
+def manifest_key(prefix=PROCESSED_PREFIX):
+    return f"{prefix}/_manifest.json"
+
+
+def empty_manifest():
+    """
+    - files: compacted files {"key", "month", "rows", "bytes", "min_date", "max_date", "version"}
+    - replaced: files superseded by compaction {"key", "version"}; readers skip them
+    """
+    return {"version": 0, "files": [], "replaced": [], "updated_at": None}
+
+
+def load_manifest(bucket_name, prefix=PROCESSED_PREFIX):
+    try:
+        manifest = read_json_from_s3(bucket_name, manifest_key(prefix))
+    except FileNotFoundError:
+        return empty_manifest()
+    return {**empty_manifest(), **manifest}
+
+
+def is_compacted_key(key):
+    return f"/{COMPACTED_DIR}/" in key
+
+
+def _in_range(entry, from_date=None, to_date=None):
+    if from_date and entry["max_date"] < _date_str(from_date):
+        return False
+    if to_date and entry["min_date"] > _date_str(to_date):
+        return False
+    return True
+
+
+def live_keys(bucket_name, from_date=None, to_date=None, sections=None, prefix=PROCESSED_PREFIX, manifest=None):
+    """
+    Data files readers should see for a slice: partition files not replaced by a
+    compaction, plus the compacted files listed in the manifest. The manifest is
+    one object, so swapping it switches readers to a compacted set atomically.
+    """
+    store = get_object_store()
+    manifest = manifest or load_manifest(bucket_name, prefix)
+    replaced = {r["key"] for r in manifest["replaced"]}
+
+    keys = []
+    try:
+        dataset = ds.dataset(
+            store.arrow_path(bucket_name, prefix), filesystem=store.arrow_filesystem(),
+            format="parquet", partitioning=PARTITIONING,
+        )
+    except FileNotFoundError:
+        dataset = None
+    if dataset is not None:
+        root = store.arrow_path(bucket_name)
+        expr = partition_filter(from_date, to_date, sections)
+        fragments = dataset.get_fragments() if expr is None else dataset.get_fragments(filter=expr)
+        keys = [f.path[len(root) + 1:] for f in fragments]
+    keys = [k for k in keys if k not in replaced]
+    keys += [f["key"] for f in manifest["files"] if _in_range(f, from_date, to_date)]
+    return sorted(keys)
+
+
+def processed_dataset(bucket_name, keys=None, from_date=None, to_date=None, sections=None,
+                      prefix=PROCESSED_PREFIX, store=None):
+    """
+    pyarrow Dataset over the live files of a slice (or exactly `keys`), with
+    publication_date/section available on both partition and compacted files.
+    Files are scanned with DATASET_SCHEMA, so older files are cast to the current
+    types. Returns None when there is nothing to read.
+    """
+    store = store or get_object_store()
+    if keys is None:
+        keys = live_keys(bucket_name, from_date, to_date, sections, prefix)
+    elif isinstance(keys, str):
+        keys = [keys]
+    if not keys:
+        return None
+
+    filesystem = store.arrow_filesystem()
+    partition_paths = [store.arrow_path(bucket_name, k) for k in keys if not is_compacted_key(k)]
+    compacted_paths = [store.arrow_path(bucket_name, k) for k in keys if is_compacted_key(k)]
+    datasets = []
+    if partition_paths:
+        datasets.append(ds.dataset(
+            partition_paths, filesystem=filesystem, format="parquet", schema=DATASET_SCHEMA,
+            partitioning=PARTITIONING, partition_base_dir=store.arrow_path(bucket_name, prefix),
+        ))
+    if compacted_paths:
+        # Compacted files carry publication_date/section as regular columns
+        datasets.append(ds.dataset(compacted_paths, filesystem=filesystem, format="parquet", schema=DATASET_SCHEMA))
+    return datasets[0] if len(datasets) == 1 else ds.dataset(datasets)
+
+
+def _with_version_columns(columns):
+    return None if columns is None else list(columns) + [c for c in VERSION_COLUMNS if c not in columns]
+
+
+def read_processed_articles(bucket_name, from_date=None, to_date=None, sections=None, columns=None,
+                            keys=None, prefix=PROCESSED_PREFIX, latest_only=True) -> pd.DataFrame:
+    """
+    Read a slice of the processed dataset. Only partitions in [from_date, to_date] and
+    `sections` are listed/opened, only matching row groups are decoded, and only
+    `columns` are read (partition columns "publication_date"/"section" are selectable).
+    Columns come back with compact dtypes (see processed_schema.to_pandas).
+    With `latest_only`, articles reprocessed by several runs come back once (latest_versions).
+    """
+    dataset = processed_dataset(bucket_name, keys, from_date, to_date, sections, prefix)
+    if dataset is None:
+        return pd.DataFrame(columns=columns or [])
+    expr = build_filter(from_date, to_date, sections)
+    if not latest_only:
+        return to_pandas(dataset.to_table(columns=columns, filter=expr))
+    table = latest_versions(dataset.to_table(columns=_with_version_columns(columns), filter=expr))
+    return to_pandas(table.select(columns) if columns is not None else table)
+
+
+def _repeated_articles(dataset, expr):
+    """Latest ingested_at of every article_id present more than once (reads two columns)."""
+    versions = dataset.to_table(columns=VERSION_COLUMNS, filter=expr).to_pandas()
+    repeated = versions[versions["article_id"].notna() & versions["article_id"].duplicated(keep=False)]
+    return repeated.groupby("article_id")["ingested_at"].max()
+
+
+def _drop_superseded(table, repeated, emitted):
+    """Rows of `table` that are not an older version (or a second copy) of a repeated article."""
+    versions = table.select(VERSION_COLUMNS).to_pandas()
+    is_repeated = versions["article_id"].isin(repeated.index)
+    if not is_repeated.any():
+        return table
+    latest = versions["article_id"].map(repeated)
+    keep = ~is_repeated | (versions["ingested_at"] == latest) | (latest.isna() & versions["ingested_at"].isna())
+    kept_ids = versions.loc[keep & is_repeated, "article_id"]
+    copies = kept_ids.duplicated() | kept_ids.isin(emitted)
+    keep[copies[copies].index] = False
+    emitted.update(kept_ids[~copies])
+    return table.filter(pa.array(keep.to_numpy()))
+
+
+def iter_processed_articles(bucket_name, from_date=None, to_date=None, sections=None, columns=None,
+                            keys=None, batch_rows=PROCESSED_ROW_GROUP_SIZE, prefix=PROCESSED_PREFIX,
+                            latest_only=True):
+    """
+    read_processed_articles() as a stream of DataFrames of about `batch_rows` rows.
+    Record batches are decoded one at a time (no read-ahead) and small ones (from
+    small partition files) are coalesced, so memory is bounded by one batch.
+    With `latest_only`, a first pass over (article_id, ingested_at) finds the articles
+    stored more than once, and only their latest version is yielded.
+    """
+    dataset = processed_dataset(bucket_name, keys, from_date, to_date, sections, prefix)
+    if dataset is None:
+        return
+    expr = build_filter(from_date, to_date, sections)
+    repeated = _repeated_articles(dataset, expr) if latest_only else None
+    emitted = set()
+
+    def frame(batches):
+        table = pa.Table.from_batches(batches)
+        if repeated is not None and len(repeated):
+            table = _drop_superseded(table, repeated, emitted)
+        if columns is not None:
+            table = table.select(columns)
+        return to_pandas(table) if table.num_rows else None
+
+    batches = dataset.to_batches(
+        columns=_with_version_columns(columns) if latest_only else columns, filter=expr,
+        batch_size=batch_rows, batch_readahead=0, fragment_readahead=0,
+    )
+    pending, rows = [], 0
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= batch_rows:
+            df = frame(pending)
+            if df is not None:
+                yield df
+            pending, rows = [], 0
+    if pending:
+        df = frame(pending)
+        if df is not None:
+            yield df
+
+
+def list_processed_keys(bucket_name, from_date=None, to_date=None, sections=None, prefix=PROCESSED_PREFIX):
+    """Keys of the live data files that may hold rows of the requested slice."""
+    return live_keys(bucket_name, from_date, to_date, sections, prefix)
@@ -0,0 +1,148 @@
+"""
+Processed-id manifest: which article ids are already in the processed zone, and
+the content hash of the raw fields they were built from.
+
+Stored beside the processed dataset as one small Parquet file sorted by id
+(article_id string, content_hash int64). The transform checks each batch against
+it right after parsing, before any HTML cleaning, and only processes ids that are
+new or whose hash changed.
+
+save() re-reads the stored manifest and merges before a single put. That is not a
+conditional put: two concurrent save()s can still lose each other's updates, so the
+manifest needs a single writer at a time. Parallel drivers collect updates from their
+workers and save once from the parent process; the DAG stages a run's updates with
+stage() and only commits them (commit_staged_updates) once the load has succeeded,
+so a failed load leaves its articles unprocessed and a retry transforms them again.
+"""
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.processing.processed_dataset import PROCESSED_PREFIX
+from src.storage.object_store import get_object_store
+
+PROCESSED_MANIFEST_KEY = os.getenv("PROCESSED_MANIFEST_KEY", f"{PROCESSED_PREFIX}/_state/processed_ids.parquet")
+# Updates of a run waiting for its warehouse load (see stage / commit_staged_updates)
+STAGED_UPDATES_PREFIX = f"{PROCESSED_PREFIX}/_state/staged"
+
+# Raw inputs of the transform; a change in any of them means the article is reprocessed
+HASHED_COLUMNS = [
+    "type", "sectionName", "webPublicationDate", "webTitle",
+    "fields_headline", "fields_trailText", "fields_byline", "fields_wordcount",
+    "fields_publication", "fields_thumbnail", "fields_body", "pillarName", "webUrl",
+]
+
+
+def content_hashes(raw: pd.DataFrame) -> np.ndarray:
+    """64-bit hash per row of the raw (uncleaned) columns, as int64 (Postgres bigint friendly)."""
+    cols = [c for c in HASHED_COLUMNS if c in raw.columns]
+    hashed = pd.util.hash_pandas_object(raw[cols].astype("string"), index=False)
+    return hashed.to_numpy().view(np.int64)
+
+
+class ProcessedIdManifest:
+    def __init__(self, bucket_name, key=PROCESSED_MANIFEST_KEY, store=None):
+        self.bucket_name = bucket_name
+        self.key = key
+        self._store = store or get_object_store()
+        self._hashes = self._read()
+        self._index = pd.Index(self._hashes.index)
+        self._pending = {}
+
+    def _read(self) -> pd.Series:
+        try:
+            data = self._store.get_bytes(self.bucket_name, self.key)
+        except FileNotFoundError:
+            return pd.Series([], index=pd.Index([], dtype=object), dtype=np.int64)
+        return _from_parquet(data)
+
+    def __len__(self):
+        return len(self._hashes) + len(self._pending)
+
+    def select(self, ids: pd.Series, hashes: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of rows to process: id unseen (stored or pending) or hash changed.
+        Repeats of an id within the batch keep only the first occurrence.
+        """
+        ids = ids.astype(object)
+        positions = self._index.get_indexer(ids)
+        known = positions >= 0
+        stored = np.zeros(len(ids), dtype=np.int64)
+        stored[known] = self._hashes.to_numpy()[positions[known]]
+        wanted = ~known | (stored != hashes)
+
+        if self._pending:
+            pending = np.array([self._pending.get(i) == h for i, h in zip(ids, hashes)], dtype=bool)
+            wanted &= ~pending
+        return wanted & ~ids.duplicated(keep="first").to_numpy() & ids.notna().to_numpy()
+
+    def add(self, ids, hashes):
+        self._pending.update(zip(ids, (int(h) for h in hashes)))
+
+    def pending(self):
+        """Updates since load, as (ids, hashes) lists (picklable, for merging in a parent process)."""
+        return list(self._pending), list(self._pending.values())
+
+    def stage(self, tag):
+        """
+        Write the pending updates to their own object (named after `tag`, e.g. a DAG run)
+        instead of the manifest; returns its key, or None if nothing is pending.
+        """
+        if not self._pending:
+            return None
+        key = f"{STAGED_UPDATES_PREFIX}/{hashlib.sha1(str(tag).encode('utf-8')).hexdigest()[:16]}.parquet"
+        self._store.put_bytes(self.bucket_name, key, _to_parquet(pd.Series(self._pending, dtype=np.int64)))
+        print(f"🗂️ Staged {len(self._pending)} processed-id updates → {key}")
+        return key
+
+    def save(self):
+        """
+        Merge pending updates into the latest stored manifest and write it in one put
+        (not atomic against another writer: one writer at a time).
+        """
+        if not self._pending:
+            return 0
+        latest = self._read()
+        updates = pd.Series(self._pending, dtype=np.int64)
+        merged = pd.concat([latest[~latest.index.isin(updates.index)], updates]).sort_index()
+        self._store.put_bytes(self.bucket_name, self.key, _to_parquet(merged))
+
+        saved = len(self._pending)
+        self._hashes, self._index, self._pending = merged, pd.Index(merged.index), {}
+        print(f"🗂️ Processed-id manifest: {saved} ids updated ({len(merged)} total)")
+        return saved
+
+
+def _to_parquet(hashes: pd.Series) -> bytes:
+    table = pa.table({
+        "article_id": pa.array(hashes.index.astype(str), pa.string()),
+        "content_hash": pa.array(hashes.to_numpy(), pa.int64()),
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def _from_parquet(data: bytes) -> pd.Series:
+    table = pq.read_table(io.BytesIO(data))
+    return pd.Series(table["content_hash"].to_numpy(), index=table["article_id"].to_pandas(), dtype=np.int64)
+
+
+def commit_staged_updates(bucket_name, staged_key, key=PROCESSED_MANIFEST_KEY, store=None):
+    """Merge updates written by stage() into the manifest, then delete them; returns the count."""
+    store = store or get_object_store()
+    try:
+        updates = _from_parquet(store.get_bytes(bucket_name, staged_key))
+    except FileNotFoundError:
+        print(f"⚠️ Staged manifest updates {staged_key} not found (already committed?)")
+        return 0
+    manifest = ProcessedIdManifest(bucket_name, key, store)
+    manifest.add(updates.index, updates.to_numpy())
+    saved = manifest.save()
+    store.delete(bucket_name, staged_key)
+    return saved
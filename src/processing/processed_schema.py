@@ -0,0 +1,88 @@
+"""
+Declared Arrow schema of the processed zone (one row per article).
+
+- low-cardinality strings (section, type, byline, ...) are dictionary-encoded:
+  Parquet stores one dictionary page per column chunk, pandas reads them as Categorical
+- counters are narrow nullable ints instead of int64/float64 with NaN
+- slug_keywords is list<string>
+
+Writers conform every batch to PROCESSED_SCHEMA (conform_table), so all files of the
+dataset share one schema; readers scan with the same schema (older files are cast on
+read, missing columns come back as nulls) and convert with to_pandas(), which keeps
+strings/ints/lists Arrow-backed instead of Python object arrays.
+"""
+import pandas as pd
+import pyarrow as pa
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+PROCESSED_SCHEMA = pa.schema([
+    pa.field("article_id", pa.string()),
+    pa.field("type", CATEGORY),
+    pa.field("sectionName", CATEGORY),
+    pa.field("webPublicationDate", pa.timestamp("ns", tz="UTC")),
+    pa.field("webTitle", pa.string()),
+    pa.field("fields_headline", pa.string()),
+    pa.field("fields_trailText", pa.string()),
+    pa.field("fields_byline", CATEGORY),
+    pa.field("fields_wordcount", pa.int32()),
+    pa.field("fields_publication", CATEGORY),
+    pa.field("fields_thumbnail", pa.string()),
+    pa.field("fields_body", pa.string()),
+    pa.field("pillarName", CATEGORY),
+    pa.field("webUrl", pa.string()),
+    pa.field("content_hash", pa.int64()),
+    pa.field("title_length", pa.int16()),
+    pa.field("headline_length", pa.int16()),
+    pa.field("days_since_publication", pa.int32()),
+    pa.field("has_thumbnail", pa.bool_()),
+    pa.field("ingested_at", pa.timestamp("us", tz="UTC")),
+    pa.field("source_system", CATEGORY),
+    pa.field("raw_s3_key", CATEGORY),
+    pa.field("processed_by", CATEGORY),
+    pa.field("article_type", CATEGORY),
+    pa.field("article_year", pa.int16()),
+    pa.field("article_month", CATEGORY),
+    pa.field("article_day", pa.int8()),
+    pa.field("slug_keywords", pa.list_(pa.string())),
+    pa.field("slug_length", pa.int16()),
+    pa.field("is_live_blog", pa.bool_()),
+    pa.field("topic_country", CATEGORY),
+])
+
+# Arrow → pandas: nullable extension dtypes instead of object / float-with-NaN columns
+_PANDAS_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+    pa.list_(pa.string()): pd.ArrowDtype(pa.list_(pa.string())),
+}
+
+
+def conform_table(table: pa.Table, schema: pa.Schema = PROCESSED_SCHEMA) -> pa.Table:
+    """
+    Cast `table` to `schema` (column order included). Missing columns become nulls;
+    columns the schema doesn't declare are an error, so the schema stays the contract.
+    """
+    extra = [name for name in table.column_names if schema.get_field_index(name) < 0]
+    if extra:
+        raise ValueError(f"❌ Columns not in the processed schema: {extra}")
+    columns = [
+        table[field.name].cast(field.type) if field.name in table.column_names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def frame_to_table(df: pd.DataFrame, schema: pa.Schema = PROCESSED_SCHEMA) -> pa.Table:
+    """Transformed pandas frame → Arrow table in the processed schema."""
+    return conform_table(pa.Table.from_pandas(df, preserve_index=False), schema)
+
+
+def to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Arrow → pandas keeping compact dtypes (dictionary columns become Categorical)."""
+    return table.to_pandas(types_mapper=_PANDAS_TYPES.get)
@@ -0,0 +1,147 @@
+"""
+Parallel transform of many raw objects (backfills, replays, reprocessing).
+
+    python -m src.processing.transform_driver --prefix raw/backfill/ --workers 8
+    python -m src.processing.transform_driver --keys raw/a.ndjson.gz raw/b.ndjson.gz --merge
+
+Each raw object is transformed in its own worker process (streamed batch by batch,
+see transform_raw_object). At most `max_in_flight` files are being processed at
+once, so memory is bounded by roughly max_in_flight x one batch. Output is one set
+of partition files per input; --merge additionally compacts the touched date range.
+Articles already in the processed-id manifest with unchanged content are skipped;
+--full reprocesses everything.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from src.processing.processed_manifest import ProcessedIdManifest
+from src.storage.object_store import get_object_store
+from src.storage.s3_helper import is_ndjson_key
+
+TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", os.cpu_count() or 1))
+
+
+def list_raw_keys(bucket_name, prefix):
+    """Raw objects (NDJSON(.gz) or JSON) under `prefix`, in key order."""
+    return sorted(
+        k for k in get_object_store().list_keys(bucket_name, prefix)
+        if is_ndjson_key(k) or k.endswith(".json")
+    )
+
+
+def _init_worker():
+    # Bodies are already cleaned in parallel across files: no nested process pools
+    from src.processing import html_cleaning
+    html_cleaning.HTML_CLEAN_WORKERS = 1
+
+
+def _transform_one(raw_key, bucket_name, batch_size, incremental):
+    from src.processing.processed_manifest import ProcessedIdManifest
+    from src.processing.transform_guardian import transform_raw_object
+
+    started = time.perf_counter()
+    # Workers read the manifest but never write it; the parent merges their updates
+    manifest = ProcessedIdManifest(bucket_name)
+    result = transform_raw_object(raw_key, bucket_name, batch_size, incremental=incremental, manifest=manifest)
+    return {**result, "seconds": time.perf_counter() - started, "pid": os.getpid()}
+
+
+def _dates_of(parquet_keys):
+    dates = [
+        part.split("=", 1)[1]
+        for key in parquet_keys for part in key.split("/")
+        if part.startswith("publication_date=") and part[len("publication_date="):][:1].isdigit()
+    ]
+    return (min(dates), max(dates)) if dates else (None, None)
+
+
+def run_transforms(raw_keys, bucket_name, workers=TRANSFORM_WORKERS, max_in_flight=None, batch_size=None,
+                   merge=False, incremental=True):
+    """
+    Transform `raw_keys` in a process pool; returns
+    {"results": [...], "failed": {raw_key: error}, "workers": {pid: stats}, "compaction": ...}.
+    """
+    from src.processing.transform_guardian import TRANSFORM_BATCH_SIZE
+
+    batch_size = batch_size or TRANSFORM_BATCH_SIZE
+    max_in_flight = max_in_flight or workers
+    pending_keys = list(raw_keys)
+    print(f"🏭 Transforming {len(pending_keys)} raw files with {workers} workers "
+          f"(≤{max_in_flight} files in flight, batch={batch_size})")
+
+    results, failed = [], {}
+    manifest = ProcessedIdManifest(bucket_name)
+    per_worker = defaultdict(lambda: {"files": 0, "rows": 0, "seconds": 0.0})
+    started = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")  # no inherited boto3 pools / threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+        in_flight = {}
+        while pending_keys or in_flight:
+            while pending_keys and len(in_flight) < max_in_flight:
+                key = pending_keys.pop(0)
+                in_flight[pool.submit(_transform_one, key, bucket_name, batch_size, incremental)] = key
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {key} failed: {e}")
+                    failed[key] = str(e)
+                    continue
+                manifest.add(*result.pop("manifest_updates"))
+                results.append(result)
+                stats = per_worker[result["pid"]]
+                stats["files"] += 1
+                stats["rows"] += result["rows"]
+                stats["seconds"] += result["seconds"]
+
+    manifest.save()
+    elapsed = time.perf_counter() - started
+    total_rows = sum(r["rows"] for r in results)
+    for pid, stats in sorted(per_worker.items()):
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+        print(f"   👷 worker {pid}: {stats['files']} files, {stats['rows']} rows, "
+              f"{stats['seconds']:.1f}s busy → {rate:,.0f} rows/s")
+    print(f"✅ {len(results)} files ({total_rows} rows, {sum(r['skipped'] for r in results)} already processed) "
+          f"in {elapsed:.1f}s → {total_rows / elapsed if elapsed else 0:,.0f} rows/s overall, {len(failed)} failed")
+
+    compaction = None
+    if merge and results:
+        from src.processing.compact_processed import compact_processed
+
+        from_date, to_date = _dates_of([k for r in results for k in r["parquet_keys"]])
+        compaction = compact_processed(bucket_name, from_date, to_date)
+
+    return {"results": results, "failed": failed, "workers": dict(per_worker), "compaction": compaction}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transform many raw Guardian files in parallel")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--keys", nargs="+", help="raw object keys")
+    source.add_argument("--prefix", help="transform every raw object under this prefix")
+    parser.add_argument("--bucket", default=os.getenv("S3_BUCKET", "the-guardian-data"))
+    parser.add_argument("--workers", type=int, default=TRANSFORM_WORKERS)
+    parser.add_argument("--max-in-flight", type=int, help="files processed at once (default: workers)")
+    parser.add_argument("--batch-size", type=int, help="records per transform batch")
+    parser.add_argument("--merge", action="store_true", help="compact the touched date range afterwards")
+    parser.add_argument("--full", action="store_true",
+                        help="reprocess every article, ignoring the processed-id manifest (e.g. after a schema change)")
+    args = parser.parse_args()
+
+    raw_keys = args.keys or list_raw_keys(args.bucket, args.prefix)
+    result = run_transforms(
+        raw_keys, args.bucket, workers=args.workers, max_in_flight=args.max_in_flight,
+        batch_size=args.batch_size, merge=args.merge, incremental=not args.full,
+    )
+    if result["failed"]:
+        raise SystemExit(f"❌ {len(result['failed'])} files failed — rerun with --keys: {sorted(result['failed'])}")
+
+
+if __name__ == "__main__":
+    main()
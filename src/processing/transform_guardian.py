@@ -1,128 +1,197 @@
 import os
-import re
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime, timezone
-from io import BytesIO
-from src.storage.s3_helper import get_s3_client, read_json_from_s3
-
-
-def clean_html(text: str) -> str:
-    if not isinstance(text, str):
-        return ""
-    return re.sub(r"<[^>]*>", "", text).strip()
-
-
-def extract_from_id(article_id):
-    if not isinstance(article_id, str):
-        return pd.Series({
-            "article_type": None,
-            "article_year": None,
-            "article_month": None,
-            "article_day": None,
-            "slug_keywords": [],
-            "slug_length": None,
-            "is_live_blog": None,
-            "topic_country": None
-        })
-
-    parts = article_id.split('/')
-    year_idx = next((i for i, p in enumerate(parts) if re.fullmatch(r"\d{4}", p)), None)
-    if year_idx is None:
-        # ✅ FIX: Không trả về "..." nữa, mà trả về dict rỗng an toàn
-        return pd.Series({
-            "article_type": None,
-            "article_year": None,
-            "article_month": None,
-            "article_day": None,
-            "slug_keywords": [],
-            "slug_length": None,
-            "is_live_blog": None,
-            "topic_country": None
-        })
-
-    article_type = parts[1] if year_idx > 1 else None
-    year = int(parts[year_idx])
-    month = parts[year_idx + 1] if len(parts) > year_idx + 1 else None
-    day = int(parts[year_idx + 2]) if len(parts) > year_idx + 2 and parts[year_idx + 2].isdigit() else None
-
-    slug_parts = parts[year_idx + 3:]
-    slug = "-".join(slug_parts)
-
-    slug_keywords = re.findall(r"[a-zA-Z]+", slug)
-    slug_length = len(slug_keywords)
-    is_live_blog = article_type and "live" in article_type.lower()
-    known_countries = {"uk", "us", "china", "india", "australia", "eu"}
-    topic_country = next((w for w in slug_keywords if w.lower() in known_countries), None)
-
-    return pd.Series({
-        "article_type": article_type,
-        "article_year": year,
-        "article_month": month,
-        "article_day": day,
-        "slug_keywords": slug_keywords,
-        "slug_length": slug_length,
-        "is_live_blog": bool(is_live_blog),
-        "topic_country": topic_country
-    })
-
-
-def transform_guardian_json_to_parquet(raw_key: str, bucket_name: str):
-    s3 = get_s3_client()
-
-    print(f"📥 Reading raw data from s3://{bucket_name}/{raw_key}")
-    data = read_json_from_s3(bucket_name, raw_key)
-    df = pd.json_normalize(data, sep="_")
-
-    cols_to_keep = [
-        "id", "type", "sectionName",
-        "webPublicationDate", "webTitle",
-        "fields_headline", "fields_trailText",
-        "fields_byline", "fields_wordcount",
-        "fields_publication", "fields_thumbnail",
-        "fields_body",  # nội dung chính
-        "pillarName", "webUrl"
-    ]
-    df = df[[c for c in cols_to_keep if c in df.columns]]
-
-    df["webPublicationDate"] = pd.to_datetime(df["webPublicationDate"], errors="coerce")
+from src.processing.html_cleaning import clean_html_bodies, clean_html_text
+from src.processing.processed_dataset import PROCESSED_PREFIX, PartitionedParquetWriter, part_file_name
+from src.processing.processed_manifest import ProcessedIdManifest, content_hashes
+from src.storage.s3_helper import iter_json_records_from_s3
+
+
+TRANSFORM_BATCH_SIZE = int(os.getenv("TRANSFORM_BATCH_SIZE", 5000))
+
+RAW_COLUMNS = [
+    "id", "type", "sectionName",
+    "webPublicationDate", "webTitle",
+    "fields_headline", "fields_trailText",
+    "fields_byline", "fields_wordcount",
+    "fields_publication", "fields_thumbnail",
+    "fields_body",  # nội dung chính
+    "pillarName", "webUrl"
+]
+
+KNOWN_COUNTRIES = ["uk", "us", "china", "india", "australia", "eu"]
+
+# section[/type]/yyyy/mon/dd/slug — the first all-digit 4-char segment is the year
+ARTICLE_ID_PATTERN = (
+    r"^(?P<prefix>(?:[^/]*/)*?)(?P<year>\d{4})(?=/|$)"
+    r"(?:/(?P<month>[^/]*))?(?:/(?P<day>[^/]*))?(?:/(?P<slug>.*))?$"
+)
+
+
+def _slug_keywords(slugs: pd.Series):
+    """(list<string> keywords, keyword count, first country keyword) for every slug, in one columnar pass."""
+    n = len(slugs)
+    parts = pc.split_pattern_regex(pa.array(slugs.fillna(""), type=pa.string()), r"[^A-Za-z]+")
+    words = pc.list_flatten(parts)
+    parents = pc.list_parent_indices(parts)
+    non_empty = pc.not_equal(words, "")
+    words, parents = words.filter(non_empty), parents.filter(non_empty).to_numpy()
+
+    counts = np.bincount(parents, minlength=n)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+    keywords = pa.ListArray.from_arrays(pa.array(offsets), words)
+
+    is_country = pc.is_in(pc.utf8_lower(words), value_set=pa.array(KNOWN_COUNTRIES)).to_numpy(zero_copy_only=False)
+    country_rows, first = np.unique(parents[is_country], return_index=True)
+    country = np.full(n, None, dtype=object)
+    country[country_rows] = words.filter(pa.array(is_country)).to_numpy(zero_copy_only=False)[first]
+    return keywords, counts, country
+
+
+def parse_article_ids(ids: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized extract_from_id: same columns and values, computed for the whole
+    column at once (ids without a year segment get nulls and an empty keyword list).
+    """
+    parts = ids.astype("string").str.extract(ARTICLE_ID_PATTERN)
+    has_year = parts["year"].notna()
+    slugs = parts["slug"].str.replace("/", "-", regex=False).where(has_year)
+    keywords, counts, country = _slug_keywords(slugs)
+
+    article_type = parts["prefix"].str.extract(r"^[^/]*/([^/]*)/", expand=False)
+    day = parts["day"].where(parts["day"].str.fullmatch(r"\d+").fillna(False))
+    return pd.DataFrame({
+        "article_type": article_type.astype(object).where(article_type.notna(), None),
+        "article_year": pd.to_numeric(parts["year"]).astype("Int64"),
+        "article_month": parts["month"].astype(object).where(parts["month"].notna(), None),
+        "article_day": pd.to_numeric(day).astype("Int64"),
+        "slug_keywords": pd.Series(pd.arrays.ArrowExtensionArray(keywords), index=ids.index),
+        "slug_length": pd.Series(counts, index=ids.index).astype("Int64").where(has_year),
+        "is_live_blog": article_type.str.lower().str.contains("live").fillna(False).astype("boolean").where(has_year),
+        "topic_country": pd.Series(country, index=ids.index),
+    }, index=ids.index)
+
+
+def records_to_frame(records) -> pd.DataFrame:
+    """
+    Project raw records straight onto RAW_COLUMNS ("fields_x" ← record["fields"]["x"]).
+    Equivalent to json_normalize(sep="_") + reindex, without flattening unused keys;
+    every batch gets the same columns even if no record in it carries a field.
+    """
+    columns = {}
+    fields = [r.get("fields") or {} for r in records]
+    for col in RAW_COLUMNS:
+        if col.startswith("fields_"):
+            name = col[len("fields_"):]
+            columns[col] = [f.get(name) for f in fields]
+        else:
+            columns[col] = [r.get(col) for r in records]
+    return pd.DataFrame(columns, columns=RAW_COLUMNS)
+
+
+def transform_articles_frame(records, raw_key: str, ingested_at=None) -> pd.DataFrame:
+    """Clean + feature-engineer one batch of raw article records (column-at-a-time)."""
+    return transform_raw_frame(records_to_frame(records), raw_key, ingested_at)
+
+
+def transform_raw_frame(df: pd.DataFrame, raw_key: str, ingested_at=None, hashes=None) -> pd.DataFrame:
+    """Transform a records_to_frame() frame; `hashes` are its precomputed content hashes."""
+    df = df.copy()
+    df["content_hash"] = content_hashes(df) if hashes is None else hashes
+
+    df["webPublicationDate"] = pd.to_datetime(df["webPublicationDate"], errors="coerce", utc=True)
     df["fields_wordcount"] = pd.to_numeric(df["fields_wordcount"], errors="coerce")
 
-    for col in ["fields_trailText", "fields_headline", "fields_body"]:
-        if col in df.columns:
-            df[col] = df[col].apply(clean_html)
-    df["fields_body"] = df.get("fields_body", "").fillna("").astype(str).str.strip()
+    for col in ["fields_trailText", "fields_headline"]:
+        df[col] = [clean_html_text(t) for t in df[col]]
+    # Bodies dominate transform time: paragraph-preserving cleaner, process pool for big batches
+    df["fields_body"] = clean_html_bodies(df["fields_body"].tolist())
     df["fields_byline"] = df["fields_byline"].fillna("Unknown").str.title()
     df["sectionName"] = df["sectionName"].fillna("Unknown").str.title()
     df["webTitle"] = df["webTitle"].fillna("").str.strip()
     df["fields_publication"] = df["fields_publication"].fillna("The Guardian")
 
     # ---- Feature Engineering ----
-    df["title_length"] = df["webTitle"].apply(lambda x: len(x.split()) if isinstance(x, str) else 0)
-    df["headline_length"] = df["fields_headline"].apply(lambda x: len(x.split()) if isinstance(x, str) else 0)
+    df["title_length"] = df["webTitle"].str.count(r"\S+")
+    df["headline_length"] = df["fields_headline"].str.count(r"\S+")
     df["days_since_publication"] = (
         pd.Timestamp.now(tz=timezone.utc) - df["webPublicationDate"]
     ).dt.days
     df["has_thumbnail"] = df["fields_thumbnail"].notnull().astype(int)
 
-    df["ingested_at"] = datetime.now(timezone.utc)
+    df["ingested_at"] = ingested_at or datetime.now(timezone.utc)
     df["source_system"] = "guardian_api"
     df["raw_s3_key"] = raw_key
     df["processed_by"] = "transform_guardian_v2"
 
-    df = df.join(df["id"].apply(extract_from_id))
-    df = df.rename(columns={"id": "article_id"})
+    df = df.join(parse_article_ids(df["id"]))
+    return df.rename(columns={"id": "article_id"})
 
-    # ✅ FIX: loại bỏ mọi giá trị Ellipsis hoặc invalid Python objects
-    df = df.applymap(lambda x: None if x is Ellipsis else x)
 
-    buffer = BytesIO()
-    df.to_parquet(buffer, index=False)
-    buffer.seek(0)
+def transform_raw_object(raw_key: str, bucket_name: str, batch_size: int = TRANSFORM_BATCH_SIZE,
+                         incremental: bool = True, manifest=None):
+    """
+    Stream a raw object through the transform batch by batch into the partitioned
+    processed dataset (see processed_dataset). Records are parsed incrementally and
+    each batch is split by publication_date/section, so memory stays bounded.
 
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    parquet_key = f"processed/{today}/guardian_articles_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.parquet"
-    s3.put_object(Bucket=bucket_name, Key=parquet_key, Body=buffer.getvalue())
+    With `incremental`, articles already in the processed-id manifest with the same
+    content hash are dropped before cleaning. If no `manifest` is passed one is
+    loaded and saved here; a caller-owned manifest is only updated in memory.
+    Returns {"raw_key", "parquet_keys", "rows", "skipped", "manifest_updates"}.
+    """
+    ingested_at = datetime.now(timezone.utc)
+    owns_manifest = manifest is None
+    if owns_manifest:
+        manifest = ProcessedIdManifest(bucket_name)
 
-    print(f"✅ Transformed & uploaded parquet to s3://{bucket_name}/{parquet_key}")
-    print(f"✅ Uploaded parquet ({len(df)} records, {buffer.getbuffer().nbytes / 1024:.2f} KB) → {parquet_key}")
-    return parquet_key
\ No newline at end of file
+    print(f"📥 Reading raw data from s3://{bucket_name}/{raw_key}")
+    rows = skipped = 0
+    writer = None
+    try:
+        for records in iter_json_records_from_s3(bucket_name, raw_key, batch_size=batch_size):
+            raw = records_to_frame(records)
+            hashes = content_hashes(raw)
+            if incremental:
+                wanted = manifest.select(raw["id"], hashes)
+                skipped += int((~wanted).sum())
+                raw, hashes = raw[wanted], hashes[wanted]
+            if raw.empty:
+                print(f"⏭️ Batch of {len(records)} records already processed")
+                continue
+
+            df = transform_raw_frame(raw, raw_key, ingested_at, hashes)
+            if writer is None:
+                # New keys per run: earlier parts (possibly already compacted) are never overwritten
+                run_id = ingested_at.strftime("%Y%m%dT%H%M%S%f")
+                writer = PartitionedParquetWriter(bucket_name, part_file_name(raw_key, run_id))
+            writer.write(df)
+            manifest.add(df["article_id"], hashes)
+            rows += len(df)
+            print(f"🔄 Transformed batch of {len(df)} records (total={rows}, skipped={skipped})")
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+
+    result = {"raw_key": raw_key, "parquet_keys": [], "rows": rows, "skipped": skipped}
+    if writer is None:
+        print(f"⚠️ Nothing new to write ({skipped} records already processed).")
+        return {**result, "manifest_updates": ([], [])}
+    result["parquet_keys"] = writer.close()
+    # Data first, manifest second: a crash in between only means reprocessing next time
+    result["manifest_updates"] = manifest.pending()
+    if owns_manifest:
+        manifest.save()
+
+    print(f"✅ Transformed & uploaded {len(result['parquet_keys'])} parquet partition files to s3://{bucket_name}/{PROCESSED_PREFIX}/")
+    print(f"✅ Uploaded parquet ({rows} records, {skipped} skipped) → {result['parquet_keys'][0]} ...")
+    return result
+
+
+def transform_guardian_json_to_parquet(raw_key: str, bucket_name: str, batch_size: int = TRANSFORM_BATCH_SIZE):
+    """Transform one raw object; returns the written partition keys (empty if nothing was new)."""
+    return transform_raw_object(raw_key, bucket_name, batch_size)["parquet_keys"]
@@ -25,7 +25,8 @@ def chunk_text_semantic(text, chunk_size=400, overlap=50):
     if not isinstance(text, str) or not text.strip():
         return []
 
-    sentences = sent_tokenize(text)
+    # Sentences never span a paragraph break
+    sentences = [s for para in re.split(r"\n\s*\n", text) for s in sent_tokenize(para)]
     chunks, current_chunk = [], []
     current_len = 0
 
@@ -25,45 +25,59 @@ def load_new_articles(since_date: str, limit: int | None = None):
     """
     Lấy các bài báo mới từ staging kể từ since_date.
     since_date: ISO format string (e.g., '2025-10-26')
+    Selects on loaded_at (inserted or updated by the loader since since_date), so edited
+    articles the upsert rewrote are re-embedded too, not only newly published ones.
     """
     engine = get_postgres_engine()
 
+    # Pick the most recently loaded articles on metadata only (idx_articles_loaded_at),
+    # then fetch bodies and aggregate authors/keywords for those rows alone
     q = f"""
+    WITH recent AS (
+      SELECT
+        a.article_id, a.title, a.headline, a.trail_text, a.web_url, a.publication_date,
+        a.publication_id, a.section_id, a.topic_country
+      FROM analytics_staging.stg_articles a
+      WHERE a.loaded_at >= '{since_date}'
+        AND a.body_length IS NOT NULL
+      ORDER BY a.loaded_at DESC
+      LIMIT {int(limit) if limit else 5000}
+    )
     SELECT
-      a.article_id,
-      a.title,
-      a.headline,
-      a.trail_text AS summary,
-      a.body AS content,
-      a.publication_date AS published_at,
-      a.web_url AS url,
+      r.article_id,
+      r.title,
+      r.headline,
+      r.trail_text AS summary,
+      b.body AS content,
+      r.publication_date AS published_at,
+      r.web_url AS url,
       p.publication_name AS publication,
       s.section_name AS section,
       s.pillar_name AS pillar,
-      COALESCE(STRING_AGG(DISTINCT au.author_name, ', '), 'Unknown') AS authors,
-      COALESCE(STRING_AGG(DISTINCT k.keyword, ', '), '') AS keywords,
-      a.topic_country
-    FROM analytics_staging.stg_articles a
+      COALESCE((
+        SELECT STRING_AGG(DISTINCT au.author_name, ', ')
+        FROM analytics_staging.stg_article_authors aa
+        JOIN analytics_staging.stg_authors au ON aa.author_id = au.author_id
+        WHERE aa.article_id = r.article_id
+      ), 'Unknown') AS authors,
+      COALESCE((
+        SELECT STRING_AGG(DISTINCT k.keyword, ', ')
+        FROM analytics_staging.stg_article_keywords k
+        WHERE k.article_id = r.article_id
+      ), '') AS keywords,
+      r.topic_country
+    FROM recent r
+    JOIN analytics_staging.stg_article_bodies b
+      ON b.article_id = r.article_id
     LEFT JOIN analytics_staging.stg_publications p 
-      ON a.publication_id = p.publication_id
+      ON r.publication_id = p.publication_id
     LEFT JOIN analytics_staging.stg_sections s 
-      ON a.section_id = s.section_id
-    LEFT JOIN analytics_staging.stg_article_authors aa 
-      ON a.article_id = aa.article_id
-    LEFT JOIN analytics_staging.stg_authors au 
-      ON aa.author_id = au.author_id
-    LEFT JOIN analytics_staging.stg_article_keywords k 
-      ON a.article_id = k.article_id
-    WHERE a.body IS NOT NULL
-      AND a.publication_date >= '{since_date}'
-    GROUP BY
-      a.article_id, a.title, a.headline, a.trail_text, a.body, a.web_url,
-      a.publication_date, p.publication_name, s.section_name, s.pillar_name, a.topic_country
-    ORDER BY a.publication_date DESC
-    LIMIT {int(limit) if limit else 5000};
+      ON r.section_id = s.section_id
+    WHERE b.body IS NOT NULL
+    ORDER BY r.publication_date DESC;
     """
 
-    print(f"📥 Loading new articles since {since_date} ...")
+    print(f"📥 Loading articles loaded/updated since {since_date} ...")
     with engine.connect() as conn:
         df = pd.read_sql(text(q), conn)
 
@@ -83,7 +97,7 @@ def clean_text_fields(df: pd.DataFrame) -> pd.DataFrame:
             df[col] = ""
 
     # Normalize whitespace and types
-    for col in ["title", "headline", "summary", "content", "authors", "section"]:
+    for col in ["title", "headline", "summary", "authors", "section"]:
         df[col] = (
             df[col]
             .fillna("")
@@ -91,6 +105,15 @@ def clean_text_fields(df: pd.DataFrame) -> pd.DataFrame:
             .str.replace(r"\s+", " ", regex=True)
             .str.strip()
         )
+    # Content keeps its paragraph breaks ("\n\n") for the chunker
+    df["content"] = (
+        df["content"]
+        .fillna("")
+        .astype(str)
+        .str.replace(r"[^\S\n]+", " ", regex=True)
+        .str.replace(r" *\n\s*\n\s*", "\n\n", regex=True)
+        .str.strip()
+    )
 
     # Drop rows where content is too short to be useful
     min_content_chars = int(os.getenv("MIN_CONTENT_CHARS", 200))
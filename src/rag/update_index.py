@@ -70,6 +70,21 @@ def atomic_write_index_and_meta(index, meta_df, index_path=FAISS_INDEX_PATH, met
     shutil.move(str(tmp_meta), meta_path)
     logging.info("Atomic replace done.")
 
+def replaced_article_positions(meta: pd.DataFrame, new_chunks_df: pd.DataFrame) -> np.ndarray:
+    """
+    Index positions of the chunks of articles in the batch whose chunk texts changed
+    (edited articles the loader updated): they are removed and re-embedded.
+    """
+    batch_ids = new_chunks_df["article_id"].astype(str)
+    indexed = meta[meta["article_id"].astype(str).isin(set(batch_ids))]
+    if indexed.empty:
+        return np.zeros(0, dtype="int64")
+    old = indexed.groupby(indexed["article_id"].astype(str))["chunk_fingerprint"].agg(frozenset)
+    new = new_chunks_df.groupby(batch_ids)["chunk_fingerprint"].agg(frozenset)
+    changed = [a for a in old.index if old[a] != new.get(a)]
+    return np.flatnonzero(meta["article_id"].astype(str).isin(changed)).astype("int64")
+
+
 def append_to_index(new_chunks_df: pd.DataFrame):
     if new_chunks_df.empty:
         logging.info("No new chunks to add.")
@@ -87,6 +102,13 @@ def append_to_index(new_chunks_df: pd.DataFrame):
             "chunk_id", "article_id", "title", "section", "authors", "keywords",
             "publication", "pillar", "topic_country", "published_at", "url", "chunk_fingerprint"
         ])
+    # Edited articles: drop their old chunks (IndexFlat renumbers the rest like meta)
+    replaced = replaced_article_positions(meta, new_chunks_df) if index is not None else np.zeros(0, dtype="int64")
+    if len(replaced):
+        logging.info(f"Replacing {len(replaced)} chunks of re-loaded articles whose text changed.")
+        index.remove_ids(replaced)
+        meta = meta.drop(meta.index[replaced]).reset_index(drop=True)
+
     # dedupe by chunk_id or fingerprint
     existing_chunk_ids = set(meta["chunk_id"].astype(str).tolist())
     existing_fps = set(meta["chunk_fingerprint"].astype(str).tolist())
@@ -95,25 +117,26 @@ def append_to_index(new_chunks_df: pd.DataFrame):
     # additionally drop if fingerprint present (protect against re-ingest with different chunk_id)
     to_add = to_add[~to_add["chunk_fingerprint"].isin(existing_fps)]
 
-    if to_add.empty:
+    if to_add.empty and not len(replaced):
         logging.info("No novel chunks after dedupe. Exiting.")
         return
 
-    texts = to_add["chunk_text"].tolist()
-    embeddings = compute_embeddings(model, texts, batch_size=BATCH_SIZE)
-    dim = embeddings.shape[1]
-
-    # build index if needed
-    if index is None:
-        index = create_index(dim)
-    else:
-        # check dimension matches
-        if index.d != dim:
-            raise RuntimeError(f"Existing index dim {index.d} != new embeddings dim {dim}. Rebuild required.")
-
-    # append vectors
-    logging.info(f"Adding {len(embeddings)} vectors to FAISS index.")
-    index.add(embeddings)
+    if not to_add.empty:
+        texts = to_add["chunk_text"].tolist()
+        embeddings = compute_embeddings(model, texts, batch_size=BATCH_SIZE)
+        dim = embeddings.shape[1]
+
+        # build index if needed
+        if index is None:
+            index = create_index(dim)
+        else:
+            # check dimension matches
+            if index.d != dim:
+                raise RuntimeError(f"Existing index dim {index.d} != new embeddings dim {dim}. Rebuild required.")
+
+        # append vectors
+        logging.info(f"Adding {len(embeddings)} vectors to FAISS index.")
+        index.add(embeddings)
 
     # append metadata rows (preserving order matching embeddings)
     add_meta = to_add[[
@@ -0,0 +1,308 @@
+"""
+Storage layer shared by ingestion, processing and the warehouse loader.
+
+get_object_store() returns a process-wide store for the configured backend:
+- "s3" (default): one cached boto3 client with a tuned connection pool; large uploads and
+  downloads go through the transfer manager (parallel multipart / ranged GETs)
+- "local": the same API on the local filesystem (<LOCAL_STORAGE_ROOT>/<bucket>/<key>),
+  so tests and benchmarks run without AWS
+
+Missing objects raise FileNotFoundError on every backend.
+"""
+import io
+import os
+import shutil
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "data/object_store")
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 32))
+S3_TRANSFER_CONCURRENCY = int(os.getenv("S3_TRANSFER_CONCURRENCY", 8))
+S3_TRANSFER_CHUNK_SIZE = int(os.getenv("S3_TRANSFER_CHUNK_SIZE", 8 * 1024 * 1024))
+
+
+@lru_cache(maxsize=None)
+def get_cached_s3_client():
+    """One boto3 client per process: credentials are resolved and connections pooled once."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION", "ap-southeast-2"),
+        config=Config(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            retries={"max_attempts": 5, "mode": "adaptive"},
+            tcp_keepalive=True,
+        ),
+    )
+
+
+class _StreamingBodyReader(io.RawIOBase):
+    """Adapt a botocore StreamingBody to RawIOBase so it can be buffered, gunzipped, line-iterated."""
+
+    def __init__(self, body):
+        self._body = body
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._body.read(len(b))
+        n = len(data)
+        b[:n] = data
+        return n
+
+    def close(self):
+        self._body.close()
+        super().close()
+
+
+class S3MultipartUpload:
+    def __init__(self, client, bucket_name, key, content_type=None):
+        self._client = client
+        self.bucket_name = bucket_name
+        self.key = key
+        extra = {"ContentType": content_type} if content_type else {}
+        self.upload_id = client.create_multipart_upload(Bucket=bucket_name, Key=key, **extra)["UploadId"]
+        self._parts = []
+
+    def upload_part(self, data):
+        part_number = len(self._parts) + 1
+        res = self._client.upload_part(
+            Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id,
+            PartNumber=part_number, Body=data
+        )
+        self._parts.append({"ETag": res["ETag"], "PartNumber": part_number})
+
+    def complete(self):
+        self._client.complete_multipart_upload(
+            Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id,
+            MultipartUpload={"Parts": self._parts}
+        )
+
+    def abort(self):
+        self._client.abort_multipart_upload(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id)
+
+
+class S3ObjectStore:
+    backend = "s3"
+
+    def __init__(self, client=None):
+        from boto3.s3.transfer import TransferConfig
+
+        self.client = client or get_cached_s3_client()
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_TRANSFER_CHUNK_SIZE,
+            multipart_chunksize=S3_TRANSFER_CHUNK_SIZE,
+            max_concurrency=S3_TRANSFER_CONCURRENCY,
+            use_threads=True,
+        )
+        self._arrow_fs = None
+
+    def _not_found(self, e):
+        from botocore.exceptions import ClientError
+        return isinstance(e, ClientError) and e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound")
+
+    def put_bytes(self, bucket_name, key, data, content_type=None):
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=bucket_name, Key=key, Body=data, **extra)
+        return key
+
+    def get_bytes(self, bucket_name, key):
+        buffer = io.BytesIO()
+        self.download_fileobj(bucket_name, key, buffer)
+        return buffer.getvalue()
+
+    def open_stream(self, bucket_name, key):
+        """Binary, buffered, forward-only reader over the object body."""
+        try:
+            obj = self.client.get_object(Bucket=bucket_name, Key=key)
+        except Exception as e:
+            if self._not_found(e):
+                raise FileNotFoundError(f"s3://{bucket_name}/{key}") from e
+            raise
+        return io.BufferedReader(_StreamingBodyReader(obj["Body"]), buffer_size=1024 * 1024)
+
+    def read_range(self, bucket_name, key, start, end=None):
+        """Bytes [start, end) of the object (end=None → to the end)."""
+        byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end - 1}"
+        try:
+            return self.client.get_object(Bucket=bucket_name, Key=key, Range=byte_range)["Body"].read()
+        except Exception as e:
+            if self._not_found(e):
+                raise FileNotFoundError(f"s3://{bucket_name}/{key}") from e
+            raise
+
+    def upload_fileobj(self, fileobj, bucket_name, key, content_type=None):
+        """Parallel multipart upload through the transfer manager."""
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(fileobj, bucket_name, key, ExtraArgs=extra, Config=self.transfer_config)
+        return key
+
+    def download_fileobj(self, bucket_name, key, fileobj):
+        """Parallel ranged download through the transfer manager."""
+        try:
+            self.client.download_fileobj(bucket_name, key, fileobj, Config=self.transfer_config)
+        except Exception as e:
+            if self._not_found(e):
+                raise FileNotFoundError(f"s3://{bucket_name}/{key}") from e
+            raise
+        return fileobj
+
+    def start_multipart(self, bucket_name, key, content_type=None):
+        return S3MultipartUpload(self.client, bucket_name, key, content_type)
+
+    def size(self, bucket_name, key):
+        try:
+            return self.client.head_object(Bucket=bucket_name, Key=key)["ContentLength"]
+        except Exception as e:
+            if self._not_found(e):
+                raise FileNotFoundError(f"s3://{bucket_name}/{key}") from e
+            raise
+
+    def exists(self, bucket_name, key):
+        try:
+            self.size(bucket_name, key)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def delete(self, bucket_name, key):
+        self.client.delete_object(Bucket=bucket_name, Key=key)
+
+    def arrow_filesystem(self):
+        """pyarrow filesystem over the same bucket(s), for Parquet datasets."""
+        if self._arrow_fs is None:
+            from pyarrow import fs
+
+            self._arrow_fs = fs.S3FileSystem(
+                access_key=os.getenv("AWS_ACCESS_KEY_ID"),
+                secret_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region=os.getenv("AWS_REGION", "ap-southeast-2"),
+            )
+        return self._arrow_fs
+
+    def arrow_path(self, bucket_name, key=""):
+        return f"{bucket_name}/{key}".rstrip("/")
+
+    def list_keys(self, bucket_name, prefix=""):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+
+class LocalMultipartUpload:
+    def __init__(self, path):
+        self._path = path
+        self._tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.partial")
+        self._tmp.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp, "wb")
+
+    def upload_part(self, data):
+        self._file.write(data)
+
+    def complete(self):
+        self._file.close()
+        os.replace(self._tmp, self._path)
+
+    def abort(self):
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class LocalObjectStore:
+    """Filesystem backend: <root>/<bucket>/<key>. Writes are atomic (temp file + rename)."""
+    backend = "local"
+
+    def __init__(self, root=LOCAL_STORAGE_ROOT):
+        self.root = Path(root)
+
+    def path(self, bucket_name, key):
+        return self.root / bucket_name / key
+
+    def _existing(self, bucket_name, key):
+        path = self.path(bucket_name, key)
+        if not path.is_file():
+            raise FileNotFoundError(str(path))
+        return path
+
+    def put_bytes(self, bucket_name, key, data, content_type=None):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        upload = self.start_multipart(bucket_name, key)
+        upload.upload_part(data)
+        upload.complete()
+        return key
+
+    def get_bytes(self, bucket_name, key):
+        return self._existing(bucket_name, key).read_bytes()
+
+    def open_stream(self, bucket_name, key):
+        return open(self._existing(bucket_name, key), "rb")
+
+    def read_range(self, bucket_name, key, start, end=None):
+        with open(self._existing(bucket_name, key), "rb") as f:
+            f.seek(start)
+            return f.read() if end is None else f.read(end - start)
+
+    def upload_fileobj(self, fileobj, bucket_name, key, content_type=None):
+        upload = self.start_multipart(bucket_name, key)
+        shutil.copyfileobj(fileobj, upload._file, S3_TRANSFER_CHUNK_SIZE)
+        upload.complete()
+        return key
+
+    def download_fileobj(self, bucket_name, key, fileobj):
+        with open(self._existing(bucket_name, key), "rb") as f:
+            shutil.copyfileobj(f, fileobj, S3_TRANSFER_CHUNK_SIZE)
+        return fileobj
+
+    def start_multipart(self, bucket_name, key, content_type=None):
+        return LocalMultipartUpload(self.path(bucket_name, key))
+
+    def size(self, bucket_name, key):
+        return self._existing(bucket_name, key).stat().st_size
+
+    def exists(self, bucket_name, key):
+        return self.path(bucket_name, key).is_file()
+
+    def delete(self, bucket_name, key):
+        self.path(bucket_name, key).unlink(missing_ok=True)
+
+    def arrow_filesystem(self):
+        from pyarrow import fs
+        return fs.LocalFileSystem()
+
+    def arrow_path(self, bucket_name, key=""):
+        return str(self.path(bucket_name, key)).rstrip("/")
+
+    def list_keys(self, bucket_name, prefix=""):
+        base = self.root / bucket_name
+        if not base.exists():
+            return
+        for path in sorted(base.rglob("*")):
+            if not path.is_file() or path.name.endswith(".partial"):
+                continue
+            key = path.relative_to(base).as_posix()
+            if key.startswith(prefix):
+                yield key
+
+
+@lru_cache(maxsize=None)
+def get_object_store(backend=None):
+    """Process-wide store for `backend` (default: STORAGE_BACKEND env, "s3" or "local")."""
+    backend = backend or STORAGE_BACKEND
+    if backend == "local":
+        return LocalObjectStore()
+    if backend == "s3":
+        return S3ObjectStore()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
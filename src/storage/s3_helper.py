@@ -1,49 +1,227 @@
-import boto3
+import codecs
+import gzip
 import json
 import os
 import io
+import zlib
 from datetime import datetime
 from dotenv import load_dotenv
+from src.storage.object_store import get_object_store, get_cached_s3_client
 
 load_dotenv()
 
+# S3 multipart parts must be >= 5 MB (except the last one)
+MULTIPART_PART_SIZE = int(os.getenv("S3_MULTIPART_PART_SIZE", 8 * 1024 * 1024))
+
+
 def get_s3_client():
-    return boto3.client(
-        "s3",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        region_name=os.getenv("AWS_REGION", "ap-southeast-2")
-    )
+    """Process-wide cached boto3 client (prefer get_object_store() in new code)."""
+    return get_cached_s3_client()
 
 def upload_json_to_s3(data, bucket_name, prefix="raw/guardian"):
     """Upload raw JSON data to S3 (for raw zone)."""
-    s3 = get_s3_client()
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     key = f"{prefix}/articles_{timestamp}.json"
 
-    s3.put_object(
-        Bucket=bucket_name,
-        Key=key,
-        Body=json.dumps(data, indent=2),
-        ContentType="application/json"
-    )
+    get_object_store().put_bytes(bucket_name, key, json.dumps(data, indent=2), content_type="application/json")
 
     print(f"✅ Uploaded raw data to s3://{bucket_name}/{key}")
     return key
 
+
+class NDJSONGzipS3Writer:
+    """
+    Stream records to S3 as gzip-compressed NDJSON (one JSON object per line).
+    Compressed bytes are flushed as multipart parts of `part_size`, so memory stays
+    at about one part; small outputs fall back to a single put.
+    """
+
+    def __init__(self, bucket_name, key, part_size=MULTIPART_PART_SIZE, store=None):
+        self.bucket_name = bucket_name
+        self.key = key
+        self.part_size = part_size
+        self.records_written = 0
+        self._store = store or get_object_store()
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 → gzip container
+        self._buffer = io.BytesIO()
+        self._upload = None
+
+    def copy_from(self, bucket_name, key, chunk_size=1024 * 1024):
+        """
+        Prepend an existing gzip NDJSON object (e.g. a partial run being resumed).
+        Must be called before write_records; concatenated gzip members read as one stream.
+        """
+        with self._store.open_stream(bucket_name, key) as stream:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                self._buffer.write(chunk)
+                if self._buffer.tell() >= self.part_size:
+                    self._flush_part()
+
+    def write_records(self, records):
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            self._buffer.write(self._compressor.compress(line.encode("utf-8")))
+            self.records_written += 1
+        if self._buffer.tell() >= self.part_size:
+            self._flush_part()
+
+    def _flush_part(self):
+        if self._upload is None:
+            self._upload = self._store.start_multipart(self.bucket_name, self.key, "application/x-ndjson")
+        self._upload.upload_part(self._buffer.getvalue())
+        self._buffer = io.BytesIO()
+
+    def close(self):
+        self._buffer.write(self._compressor.flush())
+        if self._upload is None:
+            self._store.put_bytes(self.bucket_name, self.key, self._buffer.getvalue(), "application/x-ndjson")
+            return self.key
+        self._flush_part()
+        self._upload.complete()
+        return self.key
+
+    def abort(self):
+        if self._upload is not None:
+            self._upload.abort()
+            self._upload = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+            return False
+        self.close()
+        return False
+
+
+def upload_ndjson_to_s3(pages, bucket_name, prefix="raw/guardian"):
+    """
+    Stream an iterable of record pages to S3 as gzip NDJSON (raw zone).
+    Returns the key, or None (nothing written) when no records were produced.
+    """
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    key = f"{prefix}/articles_{timestamp}.ndjson.gz"
+
+    writer = NDJSONGzipS3Writer(bucket_name, key)
+    try:
+        for records in pages:
+            writer.write_records(records)
+    except BaseException:
+        writer.abort()
+        raise
+
+    if writer.records_written == 0:
+        writer.abort()
+        print("⚠️ No records to upload.")
+        return None
+
+    writer.close()
+    print(f"✅ Uploaded {writer.records_written} raw records to s3://{bucket_name}/{key}")
+    return key
+
+
+def write_json_to_s3(data, bucket_name, key):
+    """Write a small JSON document (state / manifest files) to S3 in one put."""
+    get_object_store().put_bytes(
+        bucket_name, key, json.dumps(data, indent=2, default=str), content_type="application/json"
+    )
+    return key
+
+
+def delete_s3_object(bucket_name, key):
+    get_object_store().delete(bucket_name, key)
+
+
+def is_ndjson_key(key):
+    return key.endswith(".ndjson") or key.endswith(".ndjson.gz")
+
+
 def read_json_from_s3(bucket_name, key):
-    """Read JSON file from S3 and return parsed data."""
-    s3 = get_s3_client()
-    obj = s3.get_object(Bucket=bucket_name, Key=key)
-    data = json.loads(obj["Body"].read().decode("utf-8"))
+    """
+    Read JSON (array) or NDJSON(.gz) file from S3 and return parsed data.
+    Raises FileNotFoundError when the object does not exist.
+    """
+    store = get_object_store()
+    if is_ndjson_key(key):
+        with store.open_stream(bucket_name, key) as stream:
+            lines = gzip.GzipFile(fileobj=stream) if key.endswith(".gz") else stream
+            return [json.loads(line) for line in lines if line.strip()]
+    data = json.loads(store.get_bytes(bucket_name, key).decode("utf-8"))
     return data
 
+
+def _iter_json_array(stream, chunk_size=1024 * 1024):
+    """Incrementally parse a top-level JSON array, yielding one element at a time."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, started, eof = "", 0, False, False
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array at top level")
+                started, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                break  # element spans the next chunk
+            if buf[pos] not in '{["':
+                # A number can end at the chunk boundary and go on in the next chunk:
+                # only take a scalar once the "," or "]" after it is in the buffer
+                after = end
+                while after < len(buf) and buf[after] in " \t\r\n":
+                    after += 1
+                if not eof and (after >= len(buf) or buf[after] not in ",]"):
+                    break
+            pos = end
+            yield item
+    if started:
+        raise ValueError("Unterminated JSON array")
+
+
+def iter_json_records_from_s3(bucket_name, key, batch_size=5000):
+    """
+    Stream records of a raw object in lists of at most `batch_size`, parsing the body
+    incrementally (NDJSON(.gz) line by line, JSON arrays element by element), so memory
+    is bounded by one batch instead of raw bytes + decoded text + parsed list.
+    """
+    with get_object_store().open_stream(bucket_name, key) as stream:
+        if is_ndjson_key(key):
+            lines = gzip.GzipFile(fileobj=stream) if key.endswith(".gz") else stream
+            records = (json.loads(line) for line in lines if line.strip())
+        else:
+            records = _iter_json_array(stream)
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
 def upload_dataframe_to_s3(df, bucket_name, key):
     """Upload pandas DataFrame as Parquet directly to S3."""
     import pandas as pd
     buffer = io.BytesIO()
     df.to_parquet(buffer, index=False)
     buffer.seek(0)
-    s3 = get_s3_client()
-    s3.put_object(Bucket=bucket_name, Key=key, Body=buffer.getvalue())
-    print(f"✅ Uploaded parquet to s3://{bucket_name}/{key}")
\ No newline at end of file
+    get_object_store().upload_fileobj(buffer, bucket_name, key)
+    print(f"✅ Uploaded parquet to s3://{bucket_name}/{key}")